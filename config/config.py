@@ -10,6 +10,16 @@ class DatabaseConfig:
     database: str = "voice_assistant"
     user: str = "admin"
     password: str = "password"  # In production, use environment variables
+    echo: bool = False
+    url: str = None  # full SQLAlchemy URL, e.g. sqlite:///assistant.db; overrides the fields above
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0  # seconds to wait for a free connection
+    pool_recycle: int = 3600
+    sqlite_synchronous: str = "NORMAL"  # safe with WAL, far fewer fsyncs than FULL
+    sqlite_cache_size: int = -20000  # negative = KiB of page cache per connection
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout: int = 5000  # ms a writer waits on a locked database
     
 @dataclass 
 class AudioConfig:
@@ -17,22 +27,113 @@ class AudioConfig:
     sample_rate: int = 16000
     channels: int = 1
     format: str = "int16"
+    window_size: int = 16000  # samples handed to the wake word stage
+    hop_size: int = 4000  # samples between consecutive windows
+    ring_buffer_seconds: float = 4.0
     
 @dataclass
 class WakeWordConfig:
     wake_words: list = None
     sensitivity: float = 0.5
     min_confidence: float = 0.7
+    default_sensitivity: int = 5  # detector scale, 1-10
+    model_dir: str = str(Path(__file__).parent.parent / "models")
+    audio_features: int = 40
+    sample_rate: int = 16000
+    training_epochs: int = 10
+    batch_size: int = 32
+    backend: str = "tensorflow"  # "tensorflow", "numpy" or "int8"
+    calibration_features: str = None  # .npy of held-out real feature vectors; int8 accuracy report
+    cascade: bool = False  # cheap first-stage scorer in front of the full model
+    cascade_margin: float = 0.2  # first-stage threshold sits this far below the main one
+    execution_mode: str = "thread"  # "thread" or "process" (worker pool over shared memory)
+    worker_processes: int = 0  # 0 = one per CPU
+    warm_up_batch_sizes: list = None  # batch sizes scored once at load; empty disables warm-up
+    cache_inference_artifact: bool = True  # keep a traced SavedModel next to the .h5
+    validation_split: float = 0.2  # share of update data held out when none is given
+    max_accuracy_drop: float = 0.0  # held-out accuracy an update may lose and still be served
     
     def __post_init__(self):
         if self.wake_words is None:
             self.wake_words = ["hey assistant", "wake up"]
+        if self.warm_up_batch_sizes is None:
+            self.warm_up_batch_sizes = [1, 4, 16]
+
+@dataclass
+class VadConfig:
+    enabled: bool = True
+    threshold_ratio: float = 3.0  # energy above noise floor that counts as speech
+    min_energy: float = 1e-4
+    floor_rise_rate: float = 0.01  # slow, so speech does not pull the floor up
+    floor_fall_rate: float = 0.5
+    hangover_windows: int = 4
+    use_spectral_flux: bool = False
+    flux_threshold: float = 0.5
+
+@dataclass
+class StreamServiceConfig:
+    devices: list = None  # input device indices; more than one enables multi-stream mode
+    score_smoothing: float = 0.6  # weight of the newest score in each stream's average
+    refractory_windows: int = 4  # windows ignored after a detection
+    max_batch: int = 256
+
+@dataclass
+class PipelineConfig:
+    recognition_workers: int = 4  # network-bound, so several in flight
+    partial_workers: int = 1  # matches partial hypotheses off the capture thread
+    intent_workers: int = 1
+    action_workers: int = 2
+    logging_workers: int = 1
+    queue_size: int = 32  # per stage; full queues push back on submitters
+    submit_timeout: float = 0.5
+    request_timeout: float = 10.0
+
+@dataclass
+class RecognizerConfig:
+    backend: str = "google"  # "google" or "offline" (local stand-in for tests)
+    act_on_partials: bool = True
+    partial_stability: int = 2  # consecutive partials agreeing on an intent
+    max_utterance_seconds: float = 4.0
+
+@dataclass
+class HistoryConfig:
+    batch_size: int = 100  # rows per bulk insert
+    flush_interval: float = 1.0  # seconds a row may wait before being written
+    max_pending: int = 10000  # rows buffered before new ones are dropped
+
+@dataclass
+class RetentionConfig:
+    enabled: bool = True
+    retention_days: int = 30
+    batch_size: int = 1000  # rows deleted per transaction
+    max_rows_per_second: float = 5000.0  # deletion rate limit
+    pause_seconds: float = 0.05  # minimum yield between batches
+    interval_seconds: float = 3600.0  # between background runs
+    archive: bool = True  # write expired rows to gzip JSONL before deleting
+    archive_dir: str = None  # defaults to <project>/archive
+
+@dataclass
+class FeatureStoreConfig:
+    enabled: bool = False  # opt-in: keeps up to capacity feature vectors on disk
+    store_dir: str = None  # defaults to <project>/feature_store
+    capacity: int = 50000  # feature vectors kept on disk
+    positive_fraction: float = 0.25  # share of capacity reserved for confirmed triggers
+    near_threshold_margin: float = 0.15  # non-triggering scores this close to the threshold are kept
+    flush_every: int = 256  # records written between metadata flushes
 
 @dataclass
 class NotificationConfig:
     visual_enabled: bool = True
     audio_enabled: bool = True
     notification_sound: str = "notification.wav"
+    processing_repeat_seconds: float = 1.0  # interval of the processing sound
+    shutdown_drain_seconds: float = 2.0  # longest wait for the completion sound on shutdown
+
+@dataclass
+class StartupConfig:
+    lazy: bool = True  # defer model loading and sound decoding past construction
+    warm_up: bool = True  # load deferred components on a background thread at start
+    report: bool = True  # log per-component startup timings
 
 class Config:
     def __init__(self):
@@ -47,22 +148,49 @@ class Config:
         # Wake word detection settings
         self.wake_word = WakeWordConfig()
         
+        # Voice activity gate settings
+        self.vad = VadConfig()
+        
+        # Multi-stream service settings
+        self.streams = StreamServiceConfig()
+        
+        # Command pipeline settings
+        self.pipeline = PipelineConfig()
+        
+        # Speech-to-text settings
+        self.recognizer = RecognizerConfig()
+        
+        # Command history writer settings
+        self.history = HistoryConfig()
+        
+        # Command history retention settings
+        self.retention = RetentionConfig()
+        
+        # On-device training corpus settings
+        self.feature_store = FeatureStoreConfig()
+        
         # Notification settings
         self.notification = NotificationConfig()
         
+        # Startup settings
+        self.startup = StartupConfig()
+        
         # Paths
         self.paths = {
             'models': self.project_root / 'models',
             'audio': self.project_root / 'audio',
             'logs': self.project_root / 'logs'
         }
-        
-        # Create directories if they don't exist
+            
+    def ensure_directories(self) -> None:
+        """Create the data directories; kept out of __init__ so importing config touches no disk"""
         for path in self.paths.values():
             path.mkdir(parents=True, exist_ok=True)
             
     def get_db_url(self) -> str:
         """Generate SQLAlchemy database URL"""
+        if self.db.url:
+            return self.db.url
         return f"postgresql://{self.db.user}:{self.db.password}@{self.db.host}:{self.db.port}/{self.db.database}"
     
     def update_wake_word_sensitivity(self, sensitivity: float) -> None:
@@ -78,7 +206,15 @@ class Config:
             'database': self.db.__dict__,
             'audio': self.audio.__dict__,
             'wake_word': self.wake_word.__dict__,
+            'vad': self.vad.__dict__,
+            'streams': self.streams.__dict__,
+            'pipeline': self.pipeline.__dict__,
+            'recognizer': self.recognizer.__dict__,
+            'history': self.history.__dict__,
+            'retention': self.retention.__dict__,
+            'feature_store': self.feature_store.__dict__,
             'notification': self.notification.__dict__,
+            'startup': self.startup.__dict__,
             'paths': {k: str(v) for k, v in self.paths.items()}
         }
 
@@ -2,55 +2,136 @@ import logging
 import threading
 from config.config import Config
 from modules.speech_listener import SpeechListener
+from modules.multi_stream_detector import MultiStreamDetector
 from modules.command_processor import CommandProcessor
+from modules.command_pipeline import CommandPipeline
 from modules.wake_word_detector import WakeWordDetector
 from modules.notification_manager import NotificationManager
 from modules.database_manager import DatabaseManager
-from utils.db_utils import init_db
+from modules.feature_store import FeatureStore
+from utils.audio_utils import AudioUtils
+from utils.db_utils import DatabaseUtils, init_db
+from utils.metrics import StartupTimer
 
 class VoiceAssistant:
     def __init__(self):
         # Initialize logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
-        
+        self.startup_timer = StartupTimer()
+        timer = self.startup_timer
+
         # Load configuration
-        self.config = Config()
-        
+        with timer.measure('config'):
+            self.config = Config()
+            self.config.ensure_directories()
+        lazy = self.config.startup.lazy
+
         # Initialize database
-        self.db = DatabaseManager()
-        init_db()
-        
-        # Initialize core components
-        self.notification_manager = NotificationManager()
-        self.wake_word_detector = WakeWordDetector(
-            sensitivity=self.config.wake_word_sensitivity
-        )
-        self.command_processor = CommandProcessor(
-            notification_manager=self.notification_manager,
-            db_manager=self.db
-        )
-        self.speech_listener = SpeechListener(
-            wake_word_detector=self.wake_word_detector,
-            command_processor=self.command_processor
-        )
-        
+        with timer.measure('database'):
+            self.db = DatabaseManager()
+            init_db()
+
+        # Initialize core components; in lazy mode the wake word model and the
+        # notification sounds load later, so capture can start first
+        with timer.measure('notification_manager'):
+            self.notification_manager = NotificationManager(self.config.notification)
+            if not lazy:
+                self.notification_manager.wait_ready()
+        with timer.measure('wake_word_detector'):
+            self.wake_word_detector = WakeWordDetector(self.config.wake_word, lazy=lazy)
+        with timer.measure('command_processor'):
+            self.command_processor = CommandProcessor(
+                notification_manager=self.notification_manager,
+                history_writer=self.db.history_writer,
+                preferences=self.db.preferences
+            )
+            self.command_pipeline = CommandPipeline(self.command_processor, self.config.pipeline)
+        with timer.measure('feature_store'):
+            # Training corpus for on-device model updates
+            self.feature_store = (FeatureStore(self.config.wake_word.audio_features,
+                                               self.config.feature_store)
+                                  if self.config.feature_store.enabled else None)
+        with timer.measure('speech_listener'):
+            devices = self.config.streams.devices or []
+            if len(devices) > 1:
+                # One process serves every microphone from the shared model
+                self.speech_listener = MultiStreamDetector(
+                    self.config, self.wake_word_detector,
+                    command_pipeline=self.command_pipeline,
+                    feature_store=self.feature_store
+                )
+                for device_index in devices:
+                    self.speech_listener.add_stream(f"device-{device_index}",
+                                                    self._on_wake_word,
+                                                    device_index=device_index)
+            else:
+                self.speech_listener = SpeechListener(
+                    wake_word_callback=self._on_wake_word,
+                    config=self.config,
+                    audio_utils=AudioUtils(),
+                    wake_word_detector=self.wake_word_detector,
+                    command_pipeline=self.command_pipeline,
+                    feature_store=self.feature_store
+                )
+
         # Initialize thread control
         self.is_running = False
         self.listener_thread = None
+        self.warm_up_thread = None
+
+    def _on_wake_word(self, stream_id: str = "default", score: float = None):
+        """Wake word heard on the default input or one of the multi-stream inputs"""
+        if score is None:
+            self.logger.info(f"Wake word detected on {stream_id}")
+        else:
+            self.logger.info(f"Wake word detected on {stream_id} (score {score:.2f})")
+        self.notification_manager.start_notification("activation")
+
+    def _warm_up(self):
+        """Load deferred components while the listener is already capturing"""
+        timer = self.startup_timer
+        try:
+            with timer.measure('wake_word_model'):
+                self.wake_word_detector.load()
+            with timer.measure('notification_sounds'):
+                self.notification_manager.wait_ready()
+        except Exception as e:
+            self.logger.error(f"Error warming up components: {str(e)}")
+        timer.mark('ready')
+        if self.config.startup.report:
+            self.logger.info(timer.report())
 
     def start(self):
         """Start the voice assistant"""
         self.logger.info("Starting voice assistant...")
         self.is_running = True
-        
+        timer = self.startup_timer
+        # Preferences are read from memory on the command path
+        with timer.measure('preferences'):
+            self.command_processor.preferences.load()
+        if self.config.retention.enabled:
+            self.db.retention.start()
+        self.command_pipeline.start()
+
         # Start speech listener in separate thread
         self.listener_thread = threading.Thread(
             target=self.speech_listener.start_listening
         )
         self.listener_thread.daemon = True
         self.listener_thread.start()
-        
+        timer.mark('listening')
+
+        if self.config.startup.lazy and self.config.startup.warm_up:
+            # Audio buffers in the ring buffer until the model is ready to score it
+            self.warm_up_thread = threading.Thread(target=self._warm_up, name="warm-up")
+            self.warm_up_thread.daemon = True
+            self.warm_up_thread.start()
+        else:
+            # Without warm-up, deferred components load on first use
+            if self.config.startup.report:
+                self.logger.info(timer.report())
+
         self.notification_manager.notify_startup()
         self.logger.info("Voice assistant started successfully")
 
@@ -58,20 +139,26 @@ class VoiceAssistant:
         """Stop the voice assistant"""
         self.logger.info("Stopping voice assistant...")
         self.is_running = False
-        
+
         if self.listener_thread:
             self.speech_listener.stop_listening()
             self.listener_thread.join()
-            
+
+        self.command_pipeline.stop()
+        self.command_processor.close()
+        if self.feature_store is not None:
+            self.feature_store.close()
         self.notification_manager.notify_shutdown()
         self.db.close()
+        # Last user of the process-wide engine
+        DatabaseUtils.cleanup()
         self.logger.info("Voice assistant stopped successfully")
 
 def main():
     assistant = VoiceAssistant()
     try:
         assistant.start()
-        
+
         # Keep main thread alive
         while assistant.is_running:
             try:
@@ -80,7 +167,7 @@ def main():
                     break
             except KeyboardInterrupt:
                 break
-                
+
     finally:
         assistant.stop()
 
@@ -0,0 +1,4 @@
+from sqlalchemy.orm import declarative_base
+
+# One metadata for every model, so a single create_all covers all tables
+Base = declarative_base()
@@ -1,17 +1,19 @@
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
-from sqlalchemy.ext.declarative import declarative_base
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Integer, String, DateTime, Index, case, func
 
-Base = declarative_base()
+from models.base import Base
 
 class CommandHistory(Base):
     __tablename__ = 'command_history'
+    # Keyset pagination walks (timestamp, id) in index order
+    __table_args__ = (Index('ix_command_history_timestamp_id', 'timestamp', 'id'),)
 
     id = Column(Integer, primary_key=True)
     command = Column(String(255), nullable=False)
+    # Indexed through ix_command_history_timestamp_id, which leads with it
     timestamp = Column(DateTime, default=datetime.utcnow)
     wake_word = Column(String(50))
-    success = Column(Integer, default=1)  # 1 = success, 0 = failure
+    success = Column(Integer, default=1, index=True)  # 1 = success, 0 = failure
     sensitivity_level = Column(Integer)
     execution_time_ms = Column(Integer)
     error_message = Column(String(255))
@@ -48,14 +50,49 @@ class CommandHistory(Base):
                                .limit(limit).all()
 
     @classmethod
-    def get_stats(cls, session):
-        total = session.query(cls).count()
-        successful = session.query(cls).filter(cls.success == 1).count()
-        failed = session.query(cls).filter(cls.success == 0).count()
-        
+    def get_stats(cls, session, since=None):
+        """
+        Command counts from the rollup table: the all-time row, or the hourly
+        rows after since plus an index range scan over its partial first hour.
+        The history table is aggregated only while nothing is rolled up yet.
+        """
+        from models.command_rollup import CommandRollup, bucket_start
+
+        if since is None:
+            total, failed = session.query(CommandRollup.total, CommandRollup.failures)\
+                                   .filter(CommandRollup.period == 'all').first() or (None, None)
+            if total is None:
+                total, failed = cls._count(session)
+        else:
+            first_hour = bucket_start(since, 'hour')
+            if first_hour < since:
+                first_hour += timedelta(hours=1)
+            total, failed = cls._count(session, since, first_hour)
+            hourly_total, hourly_failed = session.query(
+                func.coalesce(func.sum(CommandRollup.total), 0),
+                func.coalesce(func.sum(CommandRollup.failures), 0)
+            ).filter(CommandRollup.period == 'hour',
+                     CommandRollup.bucket_start >= first_hour).one()
+            total += hourly_total
+            failed += hourly_failed
+
+        successful = total - failed
         return {
             'total_commands': total,
             'successful_commands': successful,
             'failed_commands': failed,
             'success_rate': (successful / total * 100) if total > 0 else 0
         }
+
+    @classmethod
+    def _count(cls, session, start=None, end=None):
+        """(total, failed) history rows with start <= timestamp < end, in one aggregate pass"""
+        query = session.query(
+            func.count(cls.id),
+            func.coalesce(func.sum(case((cls.success == 0, 1), else_=0)), 0)
+        )
+        if start is not None:
+            query = query.filter(cls.timestamp >= start)
+        if end is not None:
+            query = query.filter(cls.timestamp < end)
+        return query.one()
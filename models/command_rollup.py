@@ -0,0 +1,221 @@
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from models.base import Base
+from models.command_history import CommandHistory
+
+# Upper bounds of the execution time histogram; the last bucket is open-ended
+HISTOGRAM_BOUNDS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PERIODS = ('hour', 'day', 'all')
+ALL_TIME = datetime(1970, 1, 1)
+
+
+def bucket_start(timestamp: datetime, period: str) -> datetime:
+    """Start of the rollup bucket a timestamp falls into"""
+    if period == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if period == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'all':
+        return ALL_TIME
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+class CommandRollup(Base):
+    """
+    Command history aggregated per hour, per day and over all time.
+    Rows are updated in the same transaction that inserts the history rows,
+    so summaries stay current without ever scanning the history table.
+    Execution times are kept as a fixed histogram, which gives the mean
+    exactly and the p95 to within one histogram bucket.
+    """
+    __tablename__ = 'command_history_rollup'
+    __table_args__ = (UniqueConstraint('period', 'bucket_start'),)
+
+    id = Column(Integer, primary_key=True)
+    period = Column(String(8), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    total = Column(Integer, nullable=False)
+    failures = Column(Integer, nullable=False)
+    timed = Column(Integer, nullable=False)  # rows with an execution time
+    time_sum_ms = Column(Float, nullable=False)
+    time_max_ms = Column(Integer)
+    histogram = Column(String(255), nullable=False)  # comma-separated bucket counts
+
+    def __init__(self, period, bucket_start):
+        self.period = period
+        self.bucket_start = bucket_start
+        self.total = 0
+        self.failures = 0
+        self.timed = 0
+        self.time_sum_ms = 0.0
+        self.time_max_ms = None
+        self.histogram = ','.join(['0'] * (len(HISTOGRAM_BOUNDS_MS) + 1))
+
+    def merge(self, other: "_Accumulator") -> None:
+        self.total += other.total
+        self.failures += other.failures
+        self.timed += other.timed
+        self.time_sum_ms += other.time_sum_ms
+        if other.time_max_ms is not None:
+            self.time_max_ms = max(self.time_max_ms or 0, other.time_max_ms)
+        counts = [int(c) for c in self.histogram.split(',')]
+        self.histogram = ','.join(str(a + b) for a, b in zip(counts, other.histogram))
+
+    def unmerge(self, other: "_Accumulator") -> None:
+        self.total -= other.total
+        self.failures -= other.failures
+        self.timed -= other.timed
+        self.time_sum_ms -= other.time_sum_ms
+        if self.timed <= 0:
+            self.time_sum_ms = 0.0
+            self.time_max_ms = None
+        counts = [int(c) for c in self.histogram.split(',')]
+        self.histogram = ','.join(str(a - b) for a, b in zip(counts, other.histogram))
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.time_sum_ms / self.timed if self.timed else None
+
+    @property
+    def p95_ms(self) -> Optional[float]:
+        if not self.timed:
+            return None
+        rank = 0.95 * self.timed
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS + (None,), self.histogram.split(',')):
+            seen += int(count)
+            if seen >= rank:
+                return float(min(bound, self.time_max_ms) if bound is not None else self.time_max_ms)
+        return float(self.time_max_ms)
+
+    def to_dict(self):
+        return {
+            'period': self.period,
+            'bucket_start': self.bucket_start.isoformat(),
+            'total_commands': self.total,
+            'failed_commands': self.failures,
+            'success_rate': ((self.total - self.failures) / self.total * 100) if self.total > 0 else 0,
+            'mean_execution_time_ms': self.mean_ms,
+            'p95_execution_time_ms': self.p95_ms
+        }
+
+    @classmethod
+    def apply(cls, session, rows: Iterable[Dict]) -> None:
+        """Fold newly inserted history rows (as insert mappings) into the rollups"""
+        pending = cls._accumulate(rows)
+        for period in PERIODS:
+            starts = [start for p, start in pending if p == period]
+            if not starts:
+                continue
+            existing = cls._existing(session, period, starts)
+            for start in starts:
+                rollup = existing.get(start)
+                if rollup is None:
+                    rollup = cls(period, start)
+                    session.add(rollup)
+                rollup.merge(pending[(period, start)])
+
+    @classmethod
+    def remove(cls, session, rows: Iterable[Dict]) -> None:
+        """
+        Take purged history rows back out of the rollups, so they keep
+        describing the history table; emptied hour and day buckets are
+        deleted. time_max_ms cannot be undone and stays an upper bound.
+        """
+        pending = cls._accumulate(rows)
+        for period in PERIODS:
+            starts = [start for p, start in pending if p == period]
+            if not starts:
+                continue
+            for start, rollup in cls._existing(session, period, starts).items():
+                rollup.unmerge(pending[(period, start)])
+                if rollup.total <= 0 and period != 'all':
+                    session.delete(rollup)
+
+    @staticmethod
+    def _accumulate(rows: Iterable[Dict]) -> Dict[Tuple[str, datetime], "_Accumulator"]:
+        """Per-(period, bucket) partial rollups of a batch of history rows"""
+        pending: Dict[Tuple[str, datetime], _Accumulator] = {}
+        for row in rows:
+            timestamp = row.get('timestamp') or datetime.utcnow()
+            for period in PERIODS:
+                key = (period, bucket_start(timestamp, period))
+                pending.setdefault(key, _Accumulator()).add(
+                    row.get('success', 1), row.get('execution_time_ms'))
+        return pending
+
+    @classmethod
+    def _existing(cls, session, period: str, starts: List[datetime]) -> Dict[datetime, "CommandRollup"]:
+        return {
+            rollup.bucket_start: rollup
+            for rollup in session.query(cls).filter(
+                cls.period == period, cls.bucket_start.in_(starts))
+        }
+
+    @classmethod
+    def get_stats(cls, session) -> Optional[Dict]:
+        """All-time totals from a single row; None until anything was rolled up"""
+        rollup = session.query(cls).filter(cls.period == 'all').first()
+        if rollup is None:
+            return None
+        stats = rollup.to_dict()
+        del stats['period'], stats['bucket_start']
+        stats['successful_commands'] = rollup.total - rollup.failures
+        return stats
+
+    @classmethod
+    def series(cls, session, period: str = 'hour', start: datetime = None,
+               end: datetime = None) -> List[Dict]:
+        """Per-bucket summaries for dashboards, oldest first"""
+        query = session.query(cls).filter(cls.period == period)
+        if start is not None:
+            query = query.filter(cls.bucket_start >= bucket_start(start, period))
+        if end is not None:
+            query = query.filter(cls.bucket_start < end)
+        return [rollup.to_dict() for rollup in query.order_by(cls.bucket_start)]
+
+    @classmethod
+    def rebuild(cls, session, chunk_size: int = 10000) -> None:
+        """Recompute every rollup from the history table, e.g. for a pre-existing database"""
+        session.query(cls).delete()
+        columns = (CommandHistory.id, CommandHistory.timestamp, CommandHistory.success,
+                   CommandHistory.execution_time_ms)
+        last_id = 0
+        while True:
+            chunk = session.query(*columns).filter(CommandHistory.id > last_id)\
+                                          .order_by(CommandHistory.id)\
+                                          .limit(chunk_size).all()
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            cls.apply(session, ({'timestamp': row.timestamp, 'success': row.success,
+                                 'execution_time_ms': row.execution_time_ms}
+                                for row in chunk))
+            session.flush()
+        session.commit()
+
+
+class _Accumulator:
+    """In-memory partial rollup for one bucket of a write batch"""
+
+    def __init__(self):
+        self.total = 0
+        self.failures = 0
+        self.timed = 0
+        self.time_sum_ms = 0.0
+        self.time_max_ms = None
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, success, execution_time_ms) -> None:
+        self.total += 1
+        if not success:
+            self.failures += 1
+        if execution_time_ms is not None:
+            self.timed += 1
+            self.time_sum_ms += execution_time_ms
+            self.time_max_ms = max(self.time_max_ms or 0, execution_time_ms)
+            self.histogram[bisect_left(HISTOGRAM_BOUNDS_MS, execution_time_ms)] += 1
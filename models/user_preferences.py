@@ -1,8 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, Boolean
-from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
-Base = declarative_base()
+from models.base import Base
 
 class UserPreferences(Base):
     __tablename__ = 'user_preferences'
@@ -0,0 +1,101 @@
+import numpy as np
+from typing import List, Tuple
+
+from config.config import Config
+from modules.voice_activity_detector import VoiceActivityGate
+from utils.audio_utils import StreamingFeatureExtractor
+from utils.metrics import LatencyRecorder
+from utils.ring_buffer import AudioRingBuffer
+
+
+class AudioFrontEnd:
+    """
+    Per-stream audio front end: ring buffer, voice activity gate and
+    streaming feature extraction. Turns captured samples into feature
+    vectors for the windows that need scoring.
+    """
+
+    def __init__(self, config: Config, feature_stream: StreamingFeatureExtractor,
+                 latency_recorder: LatencyRecorder = None):
+        self.ring_buffer = AudioRingBuffer(
+            capacity=int(config.audio.sample_rate * config.audio.ring_buffer_seconds),
+            window_size=config.audio.window_size,
+            hop_size=config.audio.hop_size
+        )
+        self.feature_stream = feature_stream
+        self.vad_gate = VoiceActivityGate(config.vad)
+        self.latency = latency_recorder or LatencyRecorder()
+        self._feature_stream_primed = False
+        self._overruns_seen = 0
+
+    def feed(self, samples: np.ndarray) -> None:
+        """Copy float32 samples into the ring buffer"""
+        self.ring_buffer.write(samples)
+
+    def _gate_windows(self) -> List[Tuple[np.ndarray, int, bool]]:
+        """Pending windows with the overrun count at read time and the gate decision"""
+        windows = [(window, self.ring_buffer.overruns)
+                   for window in self.ring_buffer.windows()]
+        if not windows:
+            return []
+
+        # Gate on the newest hop of each window in one vectorized pass
+        with self.latency.measure('vad'):
+            hop = self.ring_buffer.hop_size
+            active = self.vad_gate.update(np.stack([w[-hop:] for w, _ in windows]))
+        return [(window, overruns, bool(is_active))
+                for (window, overruns), is_active in zip(windows, active)]
+
+    def collect_windows(self) -> List[np.ndarray]:
+        """Raw views of every pending window that passes the gate"""
+        return [window for window, _, is_active in self._gate_windows() if is_active]
+
+    def collect_features(self, with_breaks: bool = False):
+        """
+        Feature vectors for every pending window that passes the gate.
+        With with_breaks, also returns a bool per vector that is True where
+        the window follows skipped or overrun audio (or is the first one),
+        so per-stream state carried across windows can be reset there.
+        """
+        windows = self._gate_windows()
+        features = []
+        breaks = []
+        if windows:
+            with self.latency.measure('features'):
+                for window, overruns, is_active in windows:
+                    if overruns != self._overruns_seen:
+                        self._overruns_seen = overruns
+                        self._feature_stream_primed = False
+                    if not is_active:
+                        # Skipped audio breaks the feature stream's continuity
+                        self._feature_stream_primed = False
+                        continue
+                    breaks.append(not self._feature_stream_primed)
+                    features.append(self._window_features(window))
+
+        if features:
+            features = np.stack(features)
+        else:
+            features = np.zeros((0, self.feature_stream.n_features), dtype=np.float32)
+        if with_breaks:
+            return features, np.array(breaks, dtype=bool)
+        return features
+
+    def _window_features(self, window: np.ndarray) -> np.ndarray:
+        """Features for a window, computing STFT frames only for its newest hop"""
+        if not self._feature_stream_primed:
+            # First window or skipped audio: rebuild context from the full window
+            self.feature_stream.reset()
+            self.feature_stream.process(window)
+            self._feature_stream_primed = True
+        else:
+            self.feature_stream.process(window[-self.ring_buffer.hop_size:])
+        return self.feature_stream.context_features()
+
+    def reset(self) -> None:
+        """Drop buffered audio and per-stream state"""
+        self.ring_buffer.reset()
+        self.feature_stream.reset()
+        self._feature_stream_primed = False
+        self._overruns_seen = 0
+        self.vad_gate.reset()
@@ -0,0 +1,254 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config.config import PipelineConfig
+from modules.intent_matcher import IntentMatch
+from utils.metrics import LatencyRecorder
+
+if TYPE_CHECKING:
+    from modules.command_processor import StreamingCommand
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CommandRequest:
+    deadline: float
+    audio_data: Optional[bytes] = None
+    # Set for utterances whose audio was streamed while being captured
+    utterance: Optional["StreamingCommand"] = None
+    stream_id: Optional[str] = None
+    future: Future = field(default_factory=Future)
+    submitted_at: float = field(default_factory=time.monotonic)
+    text: Optional[str] = None
+    intent: Optional[IntentMatch] = None
+    success: bool = False
+    latency: Optional[float] = None  # seconds from submit to result
+
+
+class CommandPipeline:
+    """
+    Staged command processing: recognition -> intent -> action -> logging.
+    Each stage has a bounded queue and its own worker threads, so a slow
+    transcription only occupies one recognition worker instead of blocking
+    every other command. Full queues push back on the previous stage, and
+    requests past their deadline are dropped at the next stage boundary.
+    Partial hypotheses of streamed utterances are matched and acted on in
+    a separate partials stage, never on the thread that captures audio.
+    """
+
+    STAGES = ('recognition', 'partials', 'intent', 'action', 'logging')
+    # Work that carries no result of its own; never finished or timed out
+    BACKGROUND_STAGES = ('partials', 'logging')
+
+    def __init__(self, command_processor, config: PipelineConfig = None,
+                 latency_recorder: LatencyRecorder = None):
+        self.command_processor = command_processor
+        self.config = config or PipelineConfig()
+        self.latency = latency_recorder or LatencyRecorder()
+        self.lock = Lock()
+        self.stats = {'submitted': 0, 'completed': 0, 'succeeded': 0,
+                      'rejected': 0, 'timed_out': 0, 'errors': 0, 'log_dropped': 0}
+
+        self._queues: Dict[str, queue.Queue] = {
+            stage: queue.Queue(maxsize=self.config.queue_size) for stage in self.STAGES
+        }
+        self._handlers = {
+            'recognition': self._recognition_stage,
+            'partials': self._partials_stage,
+            'intent': self._intent_stage,
+            'action': self._action_stage,
+            'logging': self._logging_stage
+        }
+        self._workers: List[threading.Thread] = []
+        self.is_running = False
+
+    def start(self) -> None:
+        """Start the worker threads of every stage"""
+        if self.is_running:
+            return
+        self.is_running = True
+
+        counts = {
+            'recognition': self.config.recognition_workers,
+            'partials': self.config.partial_workers,
+            'intent': self.config.intent_workers,
+            'action': self.config.action_workers,
+            'logging': self.config.logging_workers
+        }
+        for stage in self.STAGES:
+            for i in range(max(1, counts[stage])):
+                worker = threading.Thread(target=self._run_stage, args=(stage,),
+                                          name=f"command-{stage}-{i}")
+                worker.daemon = True
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Let queued work drain, then stop all workers"""
+        if not self.is_running:
+            return
+        self.is_running = False
+
+        # Stop stage by stage so requests forwarded downstream are still handled
+        for stage in self.STAGES:
+            workers = [w for w in self._workers if w.name.startswith(f"command-{stage}-")]
+            for _ in workers:
+                self._queues[stage].put(None)
+            for worker in workers:
+                worker.join(timeout)
+        self._workers = []
+
+    def submit(self, audio_data: bytes, stream_id: str = None,
+               timeout: float = None) -> Future:
+        """
+        Queue an utterance for processing.
+        Returns: a Future resolving to the command's success flag; it
+        resolves to False at once if the pipeline is saturated.
+        """
+        return self._submit(CommandRequest(
+            deadline=time.monotonic() + (timeout or self.config.request_timeout),
+            audio_data=audio_data,
+            stream_id=stream_id
+        ))
+
+    def start_utterance(self) -> "StreamingCommand":
+        """Open a command whose audio is pushed while it is captured; close it with submit_utterance"""
+        return self.command_processor.start_utterance(schedule=self._schedule_partials)
+
+    def _schedule_partials(self, utterance: "StreamingCommand") -> bool:
+        """Queue an utterance's partials for a worker; called on the capture thread, so never waits"""
+        try:
+            self._queues['partials'].put_nowait(CommandRequest(
+                deadline=time.monotonic() + self.config.request_timeout,
+                utterance=utterance
+            ))
+            return True
+        except queue.Full:
+            return False
+
+    def submit_utterance(self, utterance: "StreamingCommand", stream_id: str = None,
+                         timeout: float = None) -> Future:
+        """
+        Queue a streamed utterance whose audio is complete; its final
+        transcription runs on a recognition worker. Never blocks, since it is
+        called from the audio capture callback: a full queue rejects at once.
+        Returns: a Future like submit's
+        """
+        return self._submit(CommandRequest(
+            deadline=time.monotonic() + (timeout or self.config.request_timeout),
+            utterance=utterance,
+            stream_id=stream_id
+        ), wait=False)
+
+    def _submit(self, request: CommandRequest, wait: bool = True) -> Future:
+        with self.lock:
+            self.stats['submitted'] += 1
+
+        try:
+            if wait:
+                self._queues['recognition'].put(request, timeout=self.config.submit_timeout)
+            else:
+                self._queues['recognition'].put_nowait(request)
+        except queue.Full:
+            logger.warning("Command pipeline saturated; rejecting request")
+            self._finish(request, False, 'rejected')
+        return request.future
+
+    def _run_stage(self, stage: str) -> None:
+        handler = self._handlers[stage]
+        stage_queue = self._queues[stage]
+        while True:
+            request = stage_queue.get()
+            if request is None:
+                break
+
+            if stage not in self.BACKGROUND_STAGES and time.monotonic() > request.deadline:
+                self._finish(request, False, 'timed_out')
+                continue
+
+            try:
+                with self.latency.measure(stage):
+                    handler(request)
+            except Exception as e:
+                logger.error(f"Error in {stage} stage: {str(e)}")
+                if stage not in self.BACKGROUND_STAGES:
+                    self._finish(request, False, 'errors')
+
+    def _forward(self, request: CommandRequest, stage: str) -> None:
+        """Hand a request to the next stage, waiting at most until its deadline"""
+        remaining = request.deadline - time.monotonic()
+        try:
+            self._queues[stage].put(request, timeout=max(0.0, remaining))
+        except queue.Full:
+            self._finish(request, False, 'timed_out')
+
+    def _recognition_stage(self, request: CommandRequest) -> None:
+        if request.utterance is None:
+            request.text = self.command_processor.recognize(request.audio_data)
+        else:
+            request.text = request.utterance.finish_recognition()
+        if request.text is None:
+            self._finish(request, False)
+            return
+        if request.utterance is not None and request.utterance.executed:
+            # A stable partial hypothesis already ran the command
+            self._finish(request, request.utterance.success)
+            self._enqueue_log(request)
+            return
+        self._forward(request, 'intent')
+
+    def _partials_stage(self, request: CommandRequest) -> None:
+        request.utterance.process_partials()
+
+    def _intent_stage(self, request: CommandRequest) -> None:
+        request.intent = self.command_processor.match_intent(request.text)
+        if request.intent is None:
+            self._finish(request, False)
+            self._enqueue_log(request)
+            return
+        self._forward(request, 'action')
+
+    def _action_stage(self, request: CommandRequest) -> None:
+        success = self.command_processor.execute(request.intent)
+        self._finish(request, success)
+        self._enqueue_log(request)
+
+    def _logging_stage(self, request: CommandRequest) -> None:
+        self.command_processor._log_command(request.text, request.success,
+                                            request.latency * 1000)
+
+    def _enqueue_log(self, request: CommandRequest) -> None:
+        """History logging never holds up the caller; drop it when the queue is full"""
+        try:
+            self._queues['logging'].put_nowait(request)
+        except queue.Full:
+            with self.lock:
+                self.stats['log_dropped'] += 1
+
+    def _finish(self, request: CommandRequest, success: bool, outcome: str = None) -> None:
+        request.success = success
+        with self.lock:
+            self.stats['completed'] += 1
+            if success:
+                self.stats['succeeded'] += 1
+            if outcome:
+                self.stats[outcome] += 1
+        request.latency = time.monotonic() - request.submitted_at
+        self.latency.record('end_to_end', request.latency)
+        if not request.future.done():
+            request.future.set_result(success)
+
+    def get_stats(self) -> Dict:
+        """Request counters, queue depths and per-stage latency"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats['queue_depths'] = {stage: q.qsize() for stage, q in self._queues.items()}
+        stats['latency'] = self.latency.summary()
+        return stats
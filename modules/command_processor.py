@@ -1,89 +1,145 @@
+import time
 import logging
-from typing import Dict, Optional
-import speech_recognition as sr
-from datetime import datetime
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
 from threading import Lock
 
-from ..models.command_history import CommandHistory
-from ..models.user_preferences import UserPreferences
-from ..utils.db_utils import get_db_session
-from ..config.config import Config
+from modules.history_writer import HistoryWriter
+from modules.intent_matcher import Intent, IntentMatch, IntentMatcher
+from modules.preferences_cache import DEFAULT_USER_ID, PreferencesCache, get_preferences_cache
+from modules.recognizer_backends import (GoogleRecognizerBackend, Hypothesis,
+                                         OfflineRecognizerBackend, RecognizerBackend)
+from utils.db_utils import get_db_session
+from config.config import config
 
 class CommandProcessor:
-    def __init__(self, notification_manager):
+    def __init__(self, notification_manager, recognizer_backend: RecognizerBackend = None,
+                 history_writer: HistoryWriter = None,
+                 preferences: PreferencesCache = None):
         self.logger = logging.getLogger(__name__)
-        self.recognizer = sr.Recognizer()
+        self.recognizer_backend = recognizer_backend or self._create_recognizer_backend()
         self.notification_manager = notification_manager
-        self.command_lock = Lock()
-        self.command_patterns = {
-            'lights': self._handle_lights_command,
-            'music': self._handle_music_command,
-            'volume': self._handle_volume_command,
-            'sensitivity': self._handle_sensitivity_command
-        }
-        
+        # History rows are written behind the command path in batches
+        self.history_writer = history_writer or HistoryWriter(get_db_session, config.history)
+        self.history_writer.start()
+        # Preference reads are served from memory; changes are written through
+        self.preferences = preferences or get_preferences_cache()
+        # Guards read-modify-write of stored preferences; commands otherwise run concurrently
+        self.preferences_lock = Lock()
+        # Compiled once; matching cost does not grow with the number of commands
+        self.intent_matcher = IntentMatcher(self._build_intents())
+
+    def _build_intents(self):
+        """Command vocabulary: keywords select the intent, slot phrases fill its arguments"""
+        return [
+            Intent('sensitivity', self._handle_sensitivity_command,
+                   keywords=['sensitivity', 'sensitive'],
+                   slots={'direction': {'increase': 'increase', 'raise': 'increase',
+                                        'more': 'increase', 'up': 'increase',
+                                        'decrease': 'decrease', 'lower': 'decrease',
+                                        'less': 'decrease', 'down': 'decrease'}},
+                   priority=3),
+            Intent('volume', self._handle_volume_command,
+                   keywords=['volume', 'louder', 'quieter'],
+                   slots={'direction': {'up': 'up', 'louder': 'up', 'increase': 'up',
+                                        'raise': 'up', 'down': 'down', 'quieter': 'down',
+                                        'decrease': 'down', 'lower': 'down'}},
+                   priority=2),
+            Intent('lights', self._handle_lights_command,
+                   keywords=['lights', 'light', 'lamp', 'lamps'],
+                   slots={'state': {'on': 'on', 'off': 'off',
+                                    'switch on': 'on', 'switch off': 'off'}},
+                   priority=1),
+            Intent('music', self._handle_music_command,
+                   keywords=['music', 'song', 'songs'],
+                   slots={'action': {'play': 'play', 'start': 'play', 'resume': 'play',
+                                     'stop': 'stop', 'pause': 'pause'}}),
+        ]
+
+    def _create_recognizer_backend(self) -> RecognizerBackend:
+        """Speech-to-text backend selected in RecognizerConfig"""
+        if config.recognizer.backend == "offline":
+            return OfflineRecognizerBackend(sample_rate=config.audio.sample_rate)
+        # Bounded so a stalled request cannot hold a pipeline recognition worker
+        return GoogleRecognizerBackend(config.audio.sample_rate,
+                                       operation_timeout=config.pipeline.request_timeout)
+
     def process_command(self, audio_data: bytes) -> bool:
         """Process the audio command and execute appropriate action"""
-        with self.command_lock:
-            try:
-                # Convert audio to text
-                audio = sr.AudioData(audio_data, Config.SAMPLE_RATE, Config.SAMPLE_WIDTH)
-                text = self.recognizer.recognize_google(audio).lower()
-                
-                # Log the command
-                self._log_command(text)
-                
-                # Notify processing started
-                self.notification_manager.show_processing()
-                
-                # Find matching command pattern
-                for keyword, handler in self.command_patterns.items():
-                    if keyword in text:
-                        return handler(text)
-                        
-                self.logger.info(f"No matching command found for: {text}")
-                return False
-                
-            except sr.UnknownValueError:
-                self.logger.warning("Could not understand audio")
-                return False
-            except Exception as e:
-                self.logger.error(f"Error processing command: {str(e)}")
+        started = time.perf_counter()
+        try:
+            text = self.recognize(audio_data)
+            if text is None:
                 return False
-            finally:
-                self.notification_manager.hide_processing()
 
-    def _log_command(self, command_text: str) -> None:
-        """Log command to database"""
-        try:
-            session = get_db_session()
-            command_history = CommandHistory(
-                command=command_text,
-                timestamp=datetime.now()
-            )
-            session.add(command_history)
-            session.commit()
+            success = self.execute(self.match_intent(text))
+            # Log the command with its outcome
+            self._log_command(text, success, (time.perf_counter() - started) * 1000)
+            return success
+
         except Exception as e:
-            self.logger.error(f"Error logging command: {str(e)}")
+            self.logger.error(f"Error processing command: {str(e)}")
+            return False
+
+    def recognize(self, audio_data: bytes) -> Optional[str]:
+        """Convert fully buffered audio to lower-case text; None if not understood"""
+        return self.recognizer_backend.transcribe(audio_data)
+
+    def start_utterance(self, schedule: Callable[["StreamingCommand"], bool] = None
+                        ) -> "StreamingCommand":
+        """
+        Begin a command whose audio is pushed while it is being captured.
+        schedule hands partial results to a worker; see StreamingCommand.
+        """
+        return StreamingCommand(self, config.recognizer.partial_stability
+                                if config.recognizer.act_on_partials else None, schedule)
+
+    def match_intent(self, text: str, log_miss: bool = True) -> Optional[IntentMatch]:
+        """Intent and slot values for a transcript in one pass over its words"""
+        match = self.intent_matcher.match(text)
+        if match is None and log_miss:
+            self.logger.info(f"No matching command found for: {text}")
+        return match
+
+    def execute(self, match: Optional[IntentMatch]) -> bool:
+        """Run an intent's handler while the processing notification is shown"""
+        if match is None:
+            return False
+
+        # Notify processing started
+        self.notification_manager.show_processing()
+        try:
+            return match.handler(match.slots)
+        finally:
+            self.notification_manager.hide_processing()
+
+    def _log_command(self, command_text: str, success: bool = True,
+                     execution_time_ms: float = None) -> None:
+        """Queue the command for the history writer; never waits on the database"""
+        self.history_writer.log(command_text, success=success,
+                                execution_time_ms=(int(round(execution_time_ms))
+                                                   if execution_time_ms is not None else None))
+
+    def close(self) -> None:
+        """Flush buffered command history"""
+        self.history_writer.close()
 
     def _get_user_preferences(self) -> Optional[Dict]:
-        """Get current user preferences from database"""
+        """Get current user preferences from the preferences cache"""
         try:
-            session = get_db_session()
-            prefs = session.query(UserPreferences).first()
-            return prefs.to_dict() if prefs else None
+            return self.preferences.get(DEFAULT_USER_ID)
         except Exception as e:
             self.logger.error(f"Error getting preferences: {str(e)}")
             return None
 
-    def _handle_lights_command(self, command_text: str) -> bool:
+    def _handle_lights_command(self, slots: Dict[str, str]) -> bool:
         """Handle light-related commands"""
         try:
-            if "on" in command_text:
+            if slots.get('state') == 'on':
                 # Implementation for turning lights on
                 self.logger.info("Turning lights on")
                 return True
-            elif "off" in command_text:
+            elif slots.get('state') == 'off':
                 # Implementation for turning lights off
                 self.logger.info("Turning lights off")
                 return True
@@ -92,18 +148,18 @@ class CommandProcessor:
             self.logger.error(f"Error handling lights command: {str(e)}")
             return False
 
-    def _handle_music_command(self, command_text: str) -> bool:
+    def _handle_music_command(self, slots: Dict[str, str]) -> bool:
         """Handle music-related commands"""
         try:
-            if "play" in command_text:
+            if slots.get('action') == 'play':
                 # Implementation for playing music
                 self.logger.info("Playing music")
                 return True
-            elif "stop" in command_text:
+            elif slots.get('action') == 'stop':
                 # Implementation for stopping music
                 self.logger.info("Stopping music")
                 return True
-            elif "pause" in command_text:
+            elif slots.get('action') == 'pause':
                 # Implementation for pausing music
                 self.logger.info("Pausing music")
                 return True
@@ -112,14 +168,14 @@ class CommandProcessor:
             self.logger.error(f"Error handling music command: {str(e)}")
             return False
 
-    def _handle_volume_command(self, command_text: str) -> bool:
+    def _handle_volume_command(self, slots: Dict[str, str]) -> bool:
         """Handle volume-related commands"""
         try:
-            if "up" in command_text:
+            if slots.get('direction') == 'up':
                 # Implementation for volume up
                 self.logger.info("Increasing volume")
                 return True
-            elif "down" in command_text:
+            elif slots.get('direction') == 'down':
                 # Implementation for volume down
                 self.logger.info("Decreasing volume")
                 return True
@@ -128,21 +184,134 @@ class CommandProcessor:
             self.logger.error(f"Error handling volume command: {str(e)}")
             return False
 
-    def _handle_sensitivity_command(self, command_text: str) -> bool:
+    def _handle_sensitivity_command(self, slots: Dict[str, str]) -> bool:
         """Handle sensitivity adjustment commands"""
         try:
-            session = get_db_session()
-            prefs = session.query(UserPreferences).first()
-            
-            if "increase" in command_text:
-                prefs.wake_word_sensitivity += 0.1
-                self.logger.info("Increasing sensitivity")
-            elif "decrease" in command_text:
-                prefs.wake_word_sensitivity -= 0.1
-                self.logger.info("Decreasing sensitivity")
-            
-            session.commit()
+            with self.preferences_lock:
+                prefs = self.preferences.get(DEFAULT_USER_ID) or {}
+                sensitivity = prefs.get('wake_word_sensitivity', 0.5)
+                
+                if slots.get('direction') == 'increase':
+                    sensitivity += 0.1
+                    self.logger.info("Increasing sensitivity")
+                elif slots.get('direction') == 'decrease':
+                    sensitivity -= 0.1
+                    self.logger.info("Decreasing sensitivity")
+                else:
+                    return False
+                
+                # Write-through: database first, then the cached entry
+                self.preferences.update(DEFAULT_USER_ID, wake_word_sensitivity=sensitivity)
             return True
         except Exception as e:
             self.logger.error(f"Error handling sensitivity command: {str(e)}")
             return False
+
+
+class StreamingCommand:
+    """
+    A command whose audio is still arriving. Intent matching runs on every
+    partial hypothesis; once the same intent and slot values have matched for
+    ``stability`` consecutive partials its handler is tried without waiting
+    for the end of the utterance. A handler returning False (e.g. "turn the
+    lights" with no on/off yet) leaves the command open for later hypotheses.
+
+    Partials arrive on whichever thread pushes audio, live the capture
+    callback, so they are only queued there. With ``schedule`` set, it is
+    called (and must not block) to have process_partials run on a worker;
+    returning False drops the hand-off and the final hypothesis decides.
+    Without it, partials are processed on the pushing thread (offline replay).
+    """
+
+    def __init__(self, processor: CommandProcessor, stability: Optional[int],
+                 schedule: Callable[["StreamingCommand"], bool] = None):
+        self.processor = processor
+        self.stability = stability
+        self.schedule = schedule
+        self.lock = Lock()
+        self.executed = False
+        self.success = False
+        self.text: Optional[str] = None
+        # Set once the recognizer has returned its final hypothesis
+        self.finished = False
+        self._last_match = None
+        self._stable_count = 0
+        self._pending: Deque[Hypothesis] = deque()
+        self._scheduled = False
+        self.session = processor.recognizer_backend.start_session(self._on_hypothesis)
+
+    def push(self, audio_chunk: bytes) -> None:
+        """Add captured 16-bit PCM audio"""
+        self.session.push(audio_chunk)
+
+    def _on_hypothesis(self, hypothesis: Hypothesis) -> None:
+        if hypothesis.is_final or self.stability is None:
+            return
+
+        with self.lock:
+            if self.executed or self.finished:
+                return
+            self._pending.append(hypothesis)
+            if self._scheduled:
+                return
+            self._scheduled = self.schedule is not None
+
+        if self.schedule is None:
+            self.process_partials()
+        elif not self.schedule(self):
+            with self.lock:
+                self._scheduled = False
+
+    def process_partials(self) -> None:
+        """Match queued partials in order; run the command once its intent is stable"""
+        with self.lock:
+            self._scheduled = False
+            while self._pending and not (self.executed or self.finished):
+                hypothesis = self._pending.popleft()
+                match = self.processor.match_intent(hypothesis.text, log_miss=False)
+                key = (match.name, match.slots) if match is not None else None
+                if key is not None and key == self._last_match:
+                    self._stable_count += 1
+                else:
+                    self._stable_count = 1 if key is not None else 0
+                self._last_match = key
+
+                if key is not None and self._stable_count >= self.stability:
+                    if self.processor.execute(match):
+                        self.executed = True
+                        self.success = True
+                        self.text = hypothesis.text
+            if self.executed or self.finished:
+                self._pending.clear()
+
+    def finish_recognition(self) -> Optional[str]:
+        """
+        End of utterance: the final transcript, else the partial that already
+        ran the command. Partials still queued afterwards are never run.
+        """
+        final = self.session.finish()
+        with self.lock:
+            if final is not None:
+                self.text = final.text
+            self.finished = True
+            return self.text
+
+    def finish(self) -> bool:
+        """End of utterance; runs the command now unless a partial already did"""
+        started = time.perf_counter()
+        try:
+            text = self.finish_recognition()
+            if text is None:
+                return False
+            with self.lock:
+                if not self.executed:
+                    self.success = self.processor.execute(self.processor.match_intent(text))
+                    self.executed = True
+                # Log the command with its outcome
+                self.processor._log_command(text, self.success,
+                                            (time.perf_counter() - started) * 1000)
+                return self.success
+
+        except Exception as e:
+            self.processor.logger.error(f"Error processing command: {str(e)}")
+            return False
@@ -1,32 +1,37 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import scoped_session
 from contextlib import contextmanager
 import logging
-from typing import Generator
+from itertools import islice
+from typing import Dict, Generator, Optional
 
-from models.user_preferences import UserPreferences
 from models.command_history import CommandHistory
-from config.config import DatabaseConfig
+from models.command_rollup import CommandRollup
+from config.config import HistoryConfig, RetentionConfig
+from modules.history_retention import HistoryRetention
+from modules.history_writer import HistoryWriter
+from modules.preferences_cache import DEFAULT_USER_ID, get_preferences_cache
+from utils.db_utils import DatabaseUtils, init_db
+from utils.history_export import iter_history
 
 logger = logging.getLogger(__name__)
 
-Base = declarative_base()
-
 class DatabaseManager:
-    def __init__(self, config: DatabaseConfig):
-        self.engine = create_engine(
-            config.database_url,
-            echo=config.echo_queries,
-            pool_pre_ping=True
-        )
-        self.session_factory = sessionmaker(bind=self.engine)
+    def __init__(self, database_url: str = None, history_config: HistoryConfig = None,
+                 retention_config: RetentionConfig = None):
+        # Shared engine and pool; database_url only applies if none exists yet
+        DatabaseUtils.initialize_db(database_url)
+        self.engine = DatabaseUtils.get_engine()
+        self.session_factory = DatabaseUtils.session_factory()
         self.Session = scoped_session(self.session_factory)
+        self.history_writer = HistoryWriter(self.session_factory, history_config)
+        self.history_writer.start()
+        self.preferences = get_preferences_cache()
+        self.retention = HistoryRetention(self.session_factory, retention_config)
         
     def init_db(self) -> None:
         """Initialize database tables"""
         try:
-            Base.metadata.create_all(self.engine)
+            init_db()
             logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database: {str(e)}")
@@ -46,57 +51,50 @@ class DatabaseManager:
         finally:
             session.close()
 
-    def save_user_preferences(self, sensitivity: float, wake_word: str) -> None:
-        """Save user preferences to database"""
-        with self.session_scope() as session:
-            prefs = UserPreferences(
-                sensitivity=sensitivity,
-                wake_word=wake_word
-            )
-            session.add(prefs)
+    def save_user_preferences(self, sensitivity: float,
+                              user_id: str = DEFAULT_USER_ID) -> None:
+        """Save user preferences to database and the preferences cache"""
+        self.preferences.update(user_id, wake_word_sensitivity=sensitivity)
 
-    def get_user_preferences(self) -> UserPreferences:
-        """Retrieve latest user preferences"""
-        with self.session_scope() as session:
-            return session.query(UserPreferences).order_by(
-                UserPreferences.created_at.desc()
-            ).first()
+    def get_user_preferences(self, user_id: str = DEFAULT_USER_ID) -> Optional[Dict]:
+        """Cached preferences of a user; no query after the initial bulk load"""
+        return self.preferences.get(user_id)
 
     def log_command(self, command: str, success: bool) -> None:
-        """Log command execution to history"""
-        with self.session_scope() as session:
-            history = CommandHistory(
-                command=command,
-                success=success
-            )
-            session.add(history)
+        """Queue command execution for the batched history writer"""
+        self.history_writer.log(command, success=success)
+
+    def close(self) -> None:
+        """
+        Stop retention, flush queued history and release this manager's
+        sessions; the shared engine stays up for other users until the
+        application disposes it with DatabaseUtils.cleanup()
+        """
+        self.retention.stop()
+        self.history_writer.close()
+        self.Session.remove()
+
+    def get_pool_stats(self) -> Dict:
+        """Connection and checkout-wait metrics of the shared pool"""
+        return DatabaseUtils.get_pool_stats()
 
     def get_command_history(self, limit: int = 100) -> list:
-        """Retrieve command execution history"""
-        with self.session_scope() as session:
-            return session.query(CommandHistory).order_by(
-                CommandHistory.executed_at.desc()
-            ).limit(limit).all()
+        """Most recent command history as plain dicts, newest first"""
+        rows = iter_history(self.session_factory, page_size=min(limit, 1000), descending=True)
+        return [row._asdict() for row in islice(rows, limit)]
 
-    def cleanup_old_history(self, days: int = 30) -> None:
-        """Remove command history older than specified days"""
-        from datetime import datetime, timedelta
-        cutoff = datetime.now() - timedelta(days=days)
-        
-        with self.session_scope() as session:
-            session.query(CommandHistory).filter(
-                CommandHistory.executed_at < cutoff
-            ).delete()
+    def cleanup_old_history(self, days: int = 30) -> int:
+        """Remove command history older than specified days, in batches"""
+        return self.retention.run_once(retention_days=days)
 
     def get_success_rate(self) -> float:
         """Calculate command success rate"""
         with self.session_scope() as session:
-            total = session.query(CommandHistory).count()
-            if total == 0:
-                return 0.0
-                
-            successful = session.query(CommandHistory).filter(
-                CommandHistory.success == True
-            ).count()
-            
-            return (successful / total) * 100
+            # Constant time from the all-time rollup; one aggregate query without it
+            stats = CommandRollup.get_stats(session) or CommandHistory.get_stats(session)
+            return float(stats['success_rate'])
+
+    def get_usage_series(self, period: str = 'hour', start=None, end=None) -> list:
+        """Per-hour or per-day totals, failures and execution times for dashboards"""
+        with self.session_scope() as session:
+            return CommandRollup.series(session, period, start, end)
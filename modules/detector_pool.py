@@ -0,0 +1,244 @@
+import os
+import queue
+import logging
+import threading
+import itertools
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.config import WakeWordConfig
+
+logger = logging.getLogger(__name__)
+
+
+class SharedWindowSlots:
+    """Fixed number of float32 audio window slots in one shared memory block"""
+
+    def __init__(self, n_slots: int, window_size: int, name: str = None):
+        self.n_slots = n_slots
+        self.window_size = window_size
+        size = n_slots * window_size * np.dtype(np.float32).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.array = np.ndarray((n_slots, window_size), dtype=np.float32, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also unlinks it"""
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(shm_name: str, n_slots: int, window_size: int, hop_size: Optional[int],
+                 wake_word_config: WakeWordConfig, model_version: int, tasks, results,
+                 index: int, current) -> None:
+    """
+    Worker process: score windows straight out of shared memory.
+    Each task carries the parent's sensitivity and model version; the worker
+    follows sensitivity changes and reloads the persisted model when the
+    parent has promoted or rolled back to another version. current[index]
+    holds the batch being scored (-1 when idle), so the parent can reclaim
+    it should this process die.
+    """
+    from modules.wake_word_detector import WakeWordDetector
+
+    slots = SharedWindowSlots(n_slots, window_size, name=shm_name)
+    detector = WakeWordDetector(wake_word_config)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            batch_id, slot_ids, sensitivity, version = task
+            current[index] = batch_id
+            try:
+                if version != model_version:
+                    detector = WakeWordDetector(wake_word_config)
+                    model_version = version
+                if sensitivity != detector.get_current_sensitivity():
+                    detector.set_sensitivity(sensitivity)
+                detections, scores = detector.detect_batch(slots.array[list(slot_ids)], hop_size=hop_size)
+                results.put((batch_id, slot_ids, detections.tolist(), scores.tolist(), None))
+            except Exception as e:
+                results.put((batch_id, slot_ids, None, None, str(e)))
+            current[index] = -1
+    finally:
+        slots.close()
+
+
+class DetectorPool:
+    """
+    Wake word scoring on a pool of worker processes.
+    Windows are copied once into shared memory slots; only slot indices go
+    over the task queue and only scores come back, so no audio is pickled.
+    Workers load the model the parent has persisted under wake_word_config;
+    model_version is the version they start with. With hop_size, consecutive
+    windows of a batch share their STFT frames (see preprocess_audio).
+    A worker that dies is noticed on the next submit or get_stats: its batch
+    is dropped and counted, its slots are freed and it is restarted, up to
+    max_restarts times, after which submit raises.
+    """
+
+    def __init__(self, wake_word_config: WakeWordConfig, window_size: int,
+                 on_result: Callable[[List[bool], List[float]], None],
+                 n_workers: int = None, n_slots: int = 256, model_version: int = 1,
+                 hop_size: int = None, max_restarts: int = 3):
+        self.on_result = on_result
+        self.default_sensitivity = wake_word_config.default_sensitivity
+        self.model_version = model_version
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.slots = SharedWindowSlots(n_slots, window_size)
+        self.lock = Lock()
+        self.dropped_windows = 0
+        self.batches_in_flight = 0
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self._closed = False
+        # batch id -> slots, until its result arrives or its worker is found dead
+        self._pending: Dict[int, Tuple[int, ...]] = {}
+
+        self._free_slots = queue.Queue()
+        for slot in range(n_slots):
+            self._free_slots.put(slot)
+        self._batch_ids = itertools.count()
+
+        # Spawn, not fork: the parent runs audio and scheduler threads
+        self._ctx = multiprocessing.get_context("spawn")
+        self._tasks = self._ctx.SimpleQueue()
+        self._results = self._ctx.SimpleQueue()
+        self._current = self._ctx.Array('q', [-1] * self.n_workers, lock=False)
+        self._worker_args = (self.slots.name, n_slots, window_size, hop_size, wake_word_config)
+        self.workers = [self._start_worker(index) for index in range(self.n_workers)]
+
+        self._result_thread = threading.Thread(target=self._collect_results)
+        self._result_thread.daemon = True
+        self._result_thread.start()
+
+    def _start_worker(self, index: int) -> multiprocessing.Process:
+        self._current[index] = -1
+        worker = self._ctx.Process(
+            target=_worker_main,
+            args=self._worker_args + (self.model_version, self._tasks, self._results,
+                                      index, self._current),
+            daemon=True
+        )
+        worker.start()
+        return worker
+
+    def check_workers(self) -> None:
+        """Reclaim the batch of every dead worker and restart it; raises once restarts run out"""
+        if self._closed:
+            return
+        for index, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+            batch_id = self._current[index]
+            slot_ids = self._release(batch_id) if batch_id >= 0 else None
+            lost = len(slot_ids) if slot_ids else 0
+            with self.lock:
+                self.dropped_windows += lost
+            logger.error(f"Detector worker {index} died (exit code {worker.exitcode}); "
+                         f"dropped {lost} windows")
+            if self.restarts >= self.max_restarts:
+                raise RuntimeError(f"Detector workers died {self.restarts + 1} times; "
+                                   f"giving up after {self.max_restarts} restarts")
+            self.restarts += 1
+            self.workers[index] = self._start_worker(index)
+
+    def _release(self, batch_id: int) -> Optional[Tuple[int, ...]]:
+        """Forget a pending batch and free its slots; None if it was already released"""
+        with self.lock:
+            slot_ids = self._pending.pop(batch_id, None)
+            if slot_ids is None:
+                return None
+            self.batches_in_flight -= 1
+        for slot in slot_ids:
+            self._free_slots.put(slot)
+        return slot_ids
+
+    def submit(self, windows: Sequence[np.ndarray], sensitivity: int = None,
+               model_version: int = None) -> int:
+        """
+        Copy windows into free slots and queue them as one batch, to be scored
+        at the given sensitivity with the given model version (the pool's
+        defaults when omitted). Windows that find no free slot are dropped
+        rather than blocking capture.
+        Returns: number of windows queued
+        """
+        self.check_workers()
+        sensitivity = sensitivity or self.default_sensitivity
+        if model_version is not None:
+            self.model_version = model_version
+        slot_ids = []
+        for window in windows:
+            try:
+                slot = self._free_slots.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    self.dropped_windows += len(windows) - len(slot_ids)
+                break
+            self.slots.array[slot] = window
+            slot_ids.append(slot)
+
+        if slot_ids:
+            batch_id = next(self._batch_ids)
+            with self.lock:
+                self.batches_in_flight += 1
+                self._pending[batch_id] = tuple(slot_ids)
+            self._tasks.put((batch_id, tuple(slot_ids), sensitivity, self.model_version))
+        return len(slot_ids)
+
+    def _collect_results(self):
+        """Return slots to the free list and hand scores to the listener"""
+        while True:
+            result = self._results.get()
+            if result is None:
+                break
+            batch_id, slot_ids, detections, scores, error = result
+            self._release(batch_id)
+
+            if error:
+                logger.error(f"Detector worker failed on batch {batch_id}: {error}")
+                continue
+            try:
+                self.on_result(detections, scores)
+            except Exception as e:
+                logger.error(f"Error handling detector result: {e}")
+
+    def get_stats(self) -> dict:
+        """Pool occupancy, drop and restart counters"""
+        self.check_workers()
+        with self.lock:
+            return {
+                'workers': self.n_workers,
+                'restarts': self.restarts,
+                'free_slots': self._free_slots.qsize(),
+                'batches_in_flight': self.batches_in_flight,
+                'dropped_windows': self.dropped_windows
+            }
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop workers, the result thread and release shared memory"""
+        self._closed = True
+        for _ in self.workers:
+            self._tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+
+        self._results.put(None)
+        self._result_thread.join(timeout)
+        self.slots.close()
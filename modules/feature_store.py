@@ -0,0 +1,199 @@
+import os
+import json
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from config.config import FeatureStoreConfig
+
+logger = logging.getLogger(__name__)
+
+# How a stored window was obtained; kept alongside the label for filtering
+KINDS = {'near_threshold': 0, 'confirmed': 1, 'rejected': 2}
+
+
+class FeatureStore:
+    """
+    On-disk training corpus for wake word adaptation.
+    Feature vectors, labels and kinds live in fixed-size memory-mapped .npy
+    files; records are written in place and never compacted. Positives and
+    negatives each have their own reservoir of slots: until a reservoir is
+    full new records are appended, afterwards each one replaces a random slot
+    with probability capacity / seen, so the kept records stay a uniform
+    sample of everything collected while disk use stays bounded and rare
+    positives are never crowded out by negatives.
+    """
+
+    def __init__(self, n_features: int, config: FeatureStoreConfig = None,
+                 store_dir: str = None):
+        self.config = config or FeatureStoreConfig()
+        self.n_features = n_features
+        self.store_dir = Path(store_dir or self.config.store_dir
+                              or Path(__file__).parent.parent / 'feature_store')
+        self.lock = Lock()
+        self._rng = np.random.default_rng()  # reservoir draws; used under the lock
+
+        capacity = self.config.capacity
+        n_positive = max(1, int(capacity * self.config.positive_fraction))
+        # reservoir -> (first slot, slot count)
+        self._regions = {'positive': (0, n_positive),
+                         'negative': (n_positive, capacity - n_positive)}
+        self._counts = {name: {'filled': 0, 'seen': 0} for name in self._regions}
+        self._appends_since_flush = 0
+
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self._meta_path = self.store_dir / 'meta.json'
+        self._open(capacity)
+
+    def _open(self, capacity: int) -> None:
+        """Map the existing store, or create an empty one"""
+        paths = {name: self.store_dir / f'{name}.npy' for name in ('features', 'labels', 'kinds')}
+        meta = None
+        if self._meta_path.exists() and all(path.exists() for path in paths.values()):
+            with open(self._meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if (meta.get('capacity') != capacity or meta.get('n_features') != self.n_features
+                    or meta.get('regions') != {k: list(v) for k, v in self._regions.items()}):
+                logger.warning(f"Feature store layout changed; starting a new store in {self.store_dir}")
+                meta = None
+
+        mode = 'r+' if meta is not None else 'w+'
+        self.features = np.lib.format.open_memmap(paths['features'], mode=mode, dtype=np.float32,
+                                                  shape=(capacity, self.n_features))
+        self.labels = np.lib.format.open_memmap(paths['labels'], mode=mode, dtype=np.float32,
+                                                shape=(capacity,))
+        self.kinds = np.lib.format.open_memmap(paths['kinds'], mode=mode, dtype=np.int8,
+                                               shape=(capacity,))
+        if meta is not None:
+            self._counts = meta['counts']
+        else:
+            self._write_meta()
+
+    def add(self, features: np.ndarray, label: float, kind: str) -> int:
+        """
+        Offer feature vectors with one label to the store
+        Returns: number of vectors written (the reservoir may skip some)
+        """
+        features = np.asarray(features, dtype=np.float32).reshape(-1, self.n_features)
+        reservoir = 'positive' if label >= 0.5 else 'negative'
+        first, size = self._regions[reservoir]
+        written = 0
+        with self.lock:
+            counts = self._counts[reservoir]
+            for vector in features:
+                counts['seen'] += 1
+                if counts['filled'] < size:
+                    slot = counts['filled']
+                    counts['filled'] += 1
+                else:
+                    slot = int(self._rng.integers(counts['seen']))
+                    if slot >= size:
+                        continue
+                self.features[first + slot] = vector
+                self.labels[first + slot] = label
+                self.kinds[first + slot] = KINDS[kind]
+                written += 1
+
+            self._appends_since_flush += len(features)
+            if self._appends_since_flush >= self.config.flush_every:
+                self._flush_locked()
+        return written
+
+    def add_near_threshold(self, features: np.ndarray, scores: np.ndarray,
+                           threshold: float) -> int:
+        """Keep windows that scored just below the threshold as hard negatives"""
+        scores = np.asarray(scores)
+        near = (scores < threshold) & (scores >= threshold - self.config.near_threshold_margin)
+        if not near.any():
+            return 0
+        return self.add(np.asarray(features)[near], 0.0, 'near_threshold')
+
+    def add_trigger(self, features: np.ndarray, confirmed: bool) -> int:
+        """A detection the user followed up with a command (confirmed) or not (rejected)"""
+        if confirmed:
+            return self.add(features, 1.0, 'confirmed')
+        return self.add(features, 0.0, 'rejected')
+
+    def indices(self) -> np.ndarray:
+        """Slots currently holding a record"""
+        with self.lock:
+            return np.concatenate([
+                np.arange(first, first + self._counts[name]['filled'])
+                for name, (first, _) in self._regions.items()
+            ])
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(counts['filled'] for counts in self._counts.values())
+
+    def read(self, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Copy the given records into memory as (features, labels)"""
+        # Sorted access keeps reads sequential within the mapped files
+        indices = np.sort(np.asarray(indices))
+        with self.lock:
+            return np.array(self.features[indices]), np.array(self.labels[indices])
+
+    def batches(self, batch_size: int, indices: np.ndarray = None,
+                shuffle: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Endless (features, labels) batches over the given records, reshuffled
+        on every pass; only one batch is in memory at a time. For Keras, pass
+        steps_per_epoch = ceil(len(indices) / batch_size).
+        """
+        indices = self.indices() if indices is None else np.asarray(indices)
+        if len(indices) == 0:
+            raise ValueError("The feature store has no records to train on")
+        rng = np.random.default_rng()  # the store's generator belongs to writers
+        while True:
+            order = rng.permutation(indices) if shuffle else indices
+            for start in range(0, len(order), batch_size):
+                yield self.read(order[start:start + batch_size])
+
+    def split(self, validation_split: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Random (training, validation) partition of the current records"""
+        indices = np.random.default_rng().permutation(self.indices())
+        n_validation = int(len(indices) * validation_split)
+        return indices[n_validation:], indices[:n_validation]
+
+    def flush(self) -> None:
+        """Write mapped pages and record counts to disk"""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        self.features.flush()
+        self.labels.flush()
+        self.kinds.flush()
+        self._write_meta()
+        self._appends_since_flush = 0
+
+    def _write_meta(self) -> None:
+        """Written after the pages are flushed, so counts never cover unwritten records"""
+        meta = {
+            'capacity': self.config.capacity,
+            'n_features': self.n_features,
+            'regions': {k: list(v) for k, v in self._regions.items()},
+            'counts': self._counts
+        }
+        staging = self._meta_path.with_suffix('.tmp')
+        with open(staging, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(staging, self._meta_path)
+
+    def close(self) -> None:
+        """Flush and release the memory maps"""
+        self.flush()
+        with self.lock:
+            # The maps are unmapped once the last reference goes away
+            self.features = self.labels = self.kinds = None
+
+    def get_stats(self) -> Dict:
+        """Records kept and offered per reservoir, and counts per kind"""
+        with self.lock:
+            stats = {name: dict(counts) for name, counts in self._counts.items()}
+        kinds = self.kinds[self.indices()]
+        stats['kinds'] = {name: int((kinds == code).sum()) for name, code in KINDS.items()}
+        return stats
@@ -0,0 +1,175 @@
+import gzip
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from config.config import RetentionConfig
+from models.command_history import CommandHistory
+from models.command_rollup import CommandRollup
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PATTERN = 'command_history-*.jsonl.gz'
+
+
+def _archive_path(archive_dir: Path, timestamp: datetime) -> Path:
+    """One archive file per month of command time"""
+    return archive_dir / f"command_history-{timestamp:%Y-%m}.jsonl.gz"
+
+
+def iter_archive(archive_dir: str, start: datetime = None,
+                 end: datetime = None) -> Iterator[Dict]:
+    """
+    Read archived history rows back, oldest file first.
+    A run interrupted between archiving and deleting archives its batch
+    again on the next run, so consumers should de-duplicate on ``id``.
+    """
+    for path in sorted(Path(archive_dir).glob(ARCHIVE_PATTERN)):
+        # Appended gzip members read back as one stream
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                timestamp = datetime.fromisoformat(row['timestamp']) if row['timestamp'] else None
+                if start is not None and (timestamp is None or timestamp < start):
+                    continue
+                if end is not None and (timestamp is None or timestamp >= end):
+                    continue
+                yield row
+
+
+class HistoryRetention:
+    """
+    Removes command history older than the retention period.
+    Expired rows are deleted in bounded batches walked along the timestamp
+    index, each batch in its own short transaction, with a pause between
+    batches so live logging is never locked out for long. Before a batch is
+    deleted it can be appended to monthly gzip JSONL archives. Deleted rows
+    are taken out of the rollups too, all-time totals included.
+    """
+
+    def __init__(self, session_factory: Callable, config: RetentionConfig = None,
+                 archive_dir: str = None):
+        self.session_factory = session_factory
+        self.config = config or RetentionConfig()
+        self.archive_dir = Path(archive_dir or self.config.archive_dir
+                                or Path(__file__).parent.parent / 'archive')
+        self.lock = Lock()
+        self.stats = {'runs': 0, 'deleted': 0, 'archived': 0, 'batches': 0, 'errors': 0}
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Run retention periodically on a background thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-retention")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background job; an ongoing run ends after its current batch"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._stop.clear()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"History retention run failed: {str(e)}")
+                with self.lock:
+                    self.stats['errors'] += 1
+            self._stop.wait(self.config.interval_seconds)
+
+    def run_once(self, retention_days: int = None) -> int:
+        """
+        Delete (and optionally archive) every expired row, batch by batch.
+        Returns: number of rows deleted
+        """
+        days = self.config.retention_days if retention_days is None else retention_days
+        cutoff = datetime.now() - timedelta(days=days)
+        deleted = 0
+
+        while not self._stop.is_set():
+            started = time.monotonic()
+            count = self._delete_batch(cutoff)
+            deleted += count
+            if count < self.config.batch_size:
+                break
+
+            # Yield to live writers and hold the deletion rate limit
+            elapsed = time.monotonic() - started
+            budget = count / self.config.max_rows_per_second if self.config.max_rows_per_second else 0.0
+            time.sleep(max(self.config.pause_seconds, budget - elapsed))
+
+        with self.lock:
+            self.stats['runs'] += 1
+        if deleted:
+            logger.info(f"Removed {deleted} command history rows older than {days} days")
+        return deleted
+
+    def _delete_batch(self, cutoff: datetime) -> int:
+        table = CommandHistory.__table__
+        session = self.session_factory()
+        try:
+            rows = session.execute(
+                select(table)
+                .where(table.c.timestamp < cutoff)
+                .order_by(table.c.timestamp, table.c.id)
+                .limit(self.config.batch_size)
+            ).mappings().all()
+            if not rows:
+                return 0
+
+            if self.config.archive:
+                self._archive(rows)
+            session.execute(table.delete().where(table.c.id.in_([row['id'] for row in rows])))
+            # Same transaction, so rollup totals keep matching the history table
+            CommandRollup.remove(session, rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        with self.lock:
+            self.stats['deleted'] += len(rows)
+            self.stats['batches'] += 1
+            if self.config.archive:
+                self.stats['archived'] += len(rows)
+        return len(rows)
+
+    def _archive(self, rows: List) -> None:
+        """Append rows to their monthly archive; written before the delete commits"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        by_file: Dict[Path, List[str]] = {}
+        for row in rows:
+            record = dict(row)
+            timestamp = record['timestamp']
+            record['timestamp'] = timestamp.isoformat() if timestamp else None
+            by_file.setdefault(_archive_path(self.archive_dir, timestamp or datetime.now()), []).append(
+                json.dumps(record))
+
+        for path, lines in by_file.items():
+            # Each append is a new gzip member; earlier data is never rewritten
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+
+    def get_stats(self) -> Dict:
+        """Rows deleted and archived, batches and runs so far"""
+        with self.lock:
+            return dict(self.stats)
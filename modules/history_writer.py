@@ -0,0 +1,161 @@
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+from threading import Lock
+from typing import Callable, Dict, List, Optional
+
+from config.config import HistoryConfig
+from models.command_history import CommandHistory
+from models.command_rollup import CommandRollup
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """
+    Write-behind logger for command history.
+    Rows are buffered in a bounded in-memory queue and a background thread
+    writes them with one bulk INSERT and one commit per batch, either when
+    ``batch_size`` rows are waiting or ``flush_interval`` has passed. Callers
+    never wait on the database; when the buffer is full new rows are
+    dropped and counted rather than blocking a command. The hourly, daily
+    and all-time rollups are updated in the same transaction as the insert.
+    """
+
+    # Rollup rows are read-modify-write; one batch at a time across all writers
+    _rollup_lock = Lock()
+
+    def __init__(self, session_factory: Callable, config: HistoryConfig = None):
+        self.session_factory = session_factory
+        self.config = config or HistoryConfig()
+        self.lock = Lock()
+        self.stats = {'queued': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.config.max_pending)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background writer thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="history-writer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def log(self, command: str, success: bool = True, wake_word: str = None,
+            sensitivity_level: int = None, execution_time_ms: int = None,
+            error_message: str = None) -> bool:
+        """
+        Queue one history row; the timestamp is taken now, not at write time.
+        Returns: False if the buffer was full and the row was dropped
+        """
+        row = {
+            'command': command,
+            'timestamp': datetime.now(),
+            'wake_word': wake_word,
+            'success': int(success),
+            'sensitivity_level': sensitivity_level,
+            'execution_time_ms': execution_time_ms,
+            'error_message': error_message
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self.lock:
+                self.stats['dropped'] += 1
+            return False
+
+        with self.lock:
+            self.stats['queued'] += 1
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every row queued so far has been written"""
+        if self._thread is None:
+            # No writer thread: drain synchronously on the caller
+            self._write(self._drain())
+            return True
+
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write everything still buffered and stop the writer thread"""
+        if self._thread is None:
+            self._write(self._drain())
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        batch: List[Dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # flush interval elapsed
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.config.flush_interval
+                if len(batch) < self.config.batch_size:
+                    continue
+
+            # Size or time threshold, explicit flush or shutdown
+            self._write(batch)
+            batch = []
+            deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                break
+
+    def _drain(self) -> List[Dict]:
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if isinstance(item, dict):
+                rows.append(item)
+            elif isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, rows: List[Dict]) -> None:
+        """One bulk INSERT, rollup update and commit for a batch of rows"""
+        if not rows:
+            return
+        session = self.session_factory()
+        try:
+            with self._rollup_lock:
+                session.execute(CommandHistory.__table__.insert(), rows)
+                CommandRollup.apply(session, rows)
+                session.commit()
+            with self.lock:
+                self.stats['written'] += len(rows)
+                self.stats['batches'] += 1
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error writing {len(rows)} history rows: {str(e)}")
+            with self.lock:
+                self.stats['failed'] += len(rows)
+        finally:
+            session.close()
+
+    def get_stats(self) -> Dict:
+        """Row counters and current buffer depth"""
+        with self.lock:
+            stats = dict(self.stats)
+        stats['pending'] = self._queue.qsize()
+        return stats
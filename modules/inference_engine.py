@@ -0,0 +1,250 @@
+import numpy as np
+from typing import Dict, List
+
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0, out=x)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # tanh form avoids overflow warnings for large negative inputs
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)
+
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+
+class NumpyWakeWordModel:
+    """Pure-NumPy forward pass for the Dense wake word model"""
+
+    ACTIVATIONS = {
+        'relu': _relu,
+        'sigmoid': _sigmoid,
+        'linear': _linear
+    }
+
+    def __init__(self, kernels: List[np.ndarray], biases: List[np.ndarray],
+                 activations: List[str]):
+        if not (len(kernels) == len(biases) == len(activations)):
+            raise ValueError("Kernels, biases and activations must have the same length")
+
+        for name in activations:
+            if name not in self.ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {name}")
+
+        self.kernels = [np.ascontiguousarray(k, dtype=np.float32) for k in kernels]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self._fns = [self.ACTIVATIONS[name] for name in self.activations]
+
+    @property
+    def input_size(self) -> int:
+        return self.kernels[0].shape[0]
+
+    @classmethod
+    def from_keras(cls, model) -> "NumpyWakeWordModel":
+        """Extract Dense layer weights from a Keras model; Dropout is skipped"""
+        kernels, biases, activations = [], [], []
+        for layer in model.layers:
+            weights = layer.get_weights()
+            if not weights:
+                continue
+            kernel, bias = weights
+            kernels.append(kernel)
+            biases.append(bias)
+            activations.append(layer.get_config().get('activation', 'linear'))
+        return cls(kernels, biases, activations)
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyWakeWordModel":
+        """Load weights written by ``save``"""
+        with np.load(path) as data:
+            n_layers = int(data['n_layers'])
+            kernels = [data[f'kernel_{i}'] for i in range(n_layers)]
+            biases = [data[f'bias_{i}'] for i in range(n_layers)]
+            activations = [str(a) for a in data['activations']]
+        return cls(kernels, biases, activations)
+
+    def save(self, path: str) -> None:
+        """Write weights to a compact .npz file"""
+        arrays: Dict[str, np.ndarray] = {
+            'n_layers': np.array(len(self.kernels)),
+            'activations': np.array(self.activations)
+        }
+        for i, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays[f'kernel_{i}'] = kernel
+            arrays[f'bias_{i}'] = bias
+        np.savez(path, **arrays)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Score a (batch, features) array; returns one score per row"""
+        x = np.asarray(features, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        for kernel, bias, fn in zip(self.kernels, self.biases, self._fns):
+            x = fn(x @ kernel + bias)
+        return x[:, 0]
+
+
+def export_weights(model, path: str) -> NumpyWakeWordModel:
+    """Export a trained Keras wake word model for the NumPy backend"""
+    engine = NumpyWakeWordModel.from_keras(model)
+    engine.save(path)
+    return engine
+
+
+class QuantizedWakeWordModel:
+    """
+    Int8 version of the Dense wake word model.
+    Weights are stored as int8 with one float scale per layer, a quarter of
+    the float file size. They are dequantized once at load, with the scale
+    folded in, so scoring is the float forward pass: NumPy has no BLAS
+    kernel for integer matmuls, and re-quantizing on every call made this
+    backend several times slower than the float one.
+    """
+
+    QMAX = 127
+
+    def __init__(self, kernels: List[np.ndarray], kernel_scales: List[float],
+                 biases: List[np.ndarray], activations: List[str],
+                 report: Dict[str, float] = None):
+        self.kernels = [np.ascontiguousarray(k, dtype=np.int8) for k in kernels]
+        self.kernel_scales = [float(s) for s in kernel_scales]
+        self.biases = [np.ascontiguousarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self._fns = [NumpyWakeWordModel.ACTIVATIONS[name] for name in self.activations]
+        self._dequantized = [k.astype(np.float32) * np.float32(scale)
+                             for k, scale in zip(self.kernels, self.kernel_scales)]
+        self.report = report or {}
+
+    @classmethod
+    def from_float(cls, model: NumpyWakeWordModel,
+                   evaluation_features: np.ndarray = None,
+                   threshold: float = 0.5) -> "QuantizedWakeWordModel":
+        """
+        Quantize a float model's weights. With evaluation_features (held-out
+        real feature vectors; none are used to fit the quantization) the
+        report holds the accuracy change at the given detection threshold.
+        """
+        kernels, kernel_scales = [], []
+        for kernel in model.kernels:
+            # Symmetric per-layer range; guard against all-zero tensors
+            w_scale = max(float(np.abs(kernel).max()), 1e-8) / cls.QMAX
+            kernel_scales.append(w_scale)
+            kernels.append(np.clip(np.round(kernel / w_scale), -cls.QMAX, cls.QMAX))
+
+        quantized = cls(kernels, kernel_scales, model.biases, model.activations)
+        if evaluation_features is not None:
+            features = np.asarray(evaluation_features, dtype=np.float32)
+            if features.ndim != 2 or len(features) == 0:
+                raise ValueError("Evaluation features must be a non-empty 2D array")
+            quantized.report = quantized.compare(model, features, threshold)
+        return quantized
+
+    @classmethod
+    def load(cls, path: str) -> "QuantizedWakeWordModel":
+        """Load a model written by ``save``"""
+        with np.load(path) as data:
+            n_layers = int(data['n_layers'])
+            report = {str(k): float(v) for k, v in zip(data['report_keys'],
+                                                       data['report_values'])}
+            return cls([data[f'kernel_{i}'] for i in range(n_layers)],
+                       data['kernel_scales'].tolist(),
+                       [data[f'bias_{i}'] for i in range(n_layers)],
+                       [str(a) for a in data['activations']],
+                       report)
+
+    def save(self, path: str) -> None:
+        """Write int8 weights, scales and the accuracy report to .npz"""
+        arrays: Dict[str, np.ndarray] = {
+            'n_layers': np.array(len(self.kernels)),
+            'activations': np.array(self.activations),
+            'kernel_scales': np.array(self.kernel_scales, dtype=np.float32),
+            'report_keys': np.array(list(self.report.keys()), dtype=str),
+            'report_values': np.array(list(self.report.values()), dtype=np.float64)
+        }
+        for i, (kernel, bias) in enumerate(zip(self.kernels, self.biases)):
+            arrays[f'kernel_{i}'] = kernel
+            arrays[f'bias_{i}'] = bias
+        np.savez(path, **arrays)
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Score a (batch, features) array; returns one score per row"""
+        x = np.asarray(features, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        for kernel, bias, fn in zip(self._dequantized, self.biases, self._fns):
+            x = x @ kernel
+            x += bias
+            x = fn(x)
+        return x[:, 0]
+
+    def compare(self, reference: NumpyWakeWordModel, features: np.ndarray,
+                threshold: float = 0.5) -> Dict[str, float]:
+        """Accuracy delta of this model against the float reference at a detection threshold"""
+        expected = reference.predict(features)
+        actual = self.predict(features)
+        error = np.abs(expected - actual)
+        return {
+            'samples': float(len(expected)),
+            'threshold': float(threshold),
+            'mean_abs_error': float(error.mean()),
+            'max_abs_error': float(error.max()),
+            'decision_agreement': float(np.mean((expected >= threshold) == (actual >= threshold)))
+        }
+
+
+class LinearWakeWordScorer:
+    """
+    Logistic regression over the feature vector.
+    Costs one dot product per frame, which makes it the cheap first stage of
+    the detector cascade.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.float32(bias)
+
+    @classmethod
+    def fit(cls, features: np.ndarray, targets: np.ndarray, epochs: int = 300,
+            learning_rate: float = 0.5, l2: float = 1e-4) -> "LinearWakeWordScorer":
+        """
+        Fit on hard labels or on soft targets such as full-model scores.
+        Inputs are standardized for training and the scaling is folded back
+        into the weights, so prediction needs no extra pass.
+        """
+        x = np.asarray(features, dtype=np.float64)
+        y = np.asarray(targets, dtype=np.float64).reshape(-1)
+        if x.ndim != 2 or len(x) != len(y) or len(x) == 0:
+            raise ValueError("Features must be 2D with one target per row")
+
+        mean = x.mean(axis=0)
+        std = x.std(axis=0) + 1e-8
+        xs = (x - mean) / std
+
+        w = np.zeros(x.shape[1])
+        b = 0.0
+        for _ in range(epochs):
+            error = _sigmoid(xs @ w + b) - y
+            w -= learning_rate * (xs.T @ error / len(y) + l2 * w)
+            b -= learning_rate * error.mean()
+
+        return cls(w / std, b - float((mean / std) @ w))
+
+    @classmethod
+    def load(cls, path: str) -> "LinearWakeWordScorer":
+        """Load a scorer written by ``save``"""
+        with np.load(path) as data:
+            return cls(data['weights'], float(data['bias']))
+
+    def save(self, path: str) -> None:
+        """Write weights to .npz"""
+        np.savez(path, weights=self.weights, bias=np.array(self.bias))
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Score a (batch, features) array; returns one score per row"""
+        x = np.asarray(features, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[np.newaxis, :]
+        return _sigmoid(x @ self.weights + self.bias)
@@ -0,0 +1,124 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+IntentHandler = Callable[[Dict[str, str]], bool]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens; matching never sees partial words"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass
+class Intent:
+    name: str
+    handler: IntentHandler
+    keywords: List[str]
+    slots: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    priority: int = 0
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    slots: Dict[str, str]
+    position: int  # token index of the keyword that selected the intent
+
+    @property
+    def name(self) -> str:
+        return self.intent.name
+
+    @property
+    def handler(self) -> IntentHandler:
+        return self.intent.handler
+
+
+class _TrieNode:
+    __slots__ = ('children', 'outputs')
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # (intent name, None, None) for a keyword, (intent name, slot, value) for a slot phrase
+        self.outputs: List[Tuple[str, Optional[str], Optional[str]]] = []
+
+
+class IntentMatcher:
+    """
+    Keyword and slot phrases of every intent compiled into one token trie.
+    A transcript is tokenized once and each token position walks the trie,
+    so matching cost depends on the transcript and the longest phrase, not
+    on the number of commands. Phrases only match whole words; at a given
+    position the longest phrase wins, and among the intents whose keywords
+    appear the highest priority wins, then the earliest keyword.
+    """
+
+    def __init__(self, intents: Iterable[Intent] = ()):
+        self.intents: Dict[str, Intent] = {}
+        self._root = _TrieNode()
+        self._max_phrase = 0
+        for intent in intents:
+            self.add_intent(intent)
+
+    def add_intent(self, intent: Intent) -> None:
+        """Compile an intent's keywords and slot phrases into the trie"""
+        if intent.name in self.intents:
+            raise ValueError(f"Duplicate intent: {intent.name}")
+        self.intents[intent.name] = intent
+
+        for keyword in intent.keywords:
+            self._insert(keyword, (intent.name, None, None))
+        for slot, phrases in intent.slots.items():
+            for phrase, value in phrases.items():
+                self._insert(phrase, (intent.name, slot, value))
+
+    def _insert(self, phrase: str, output: Tuple[str, Optional[str], Optional[str]]) -> None:
+        tokens = tokenize(phrase)
+        if not tokens:
+            raise ValueError(f"Phrase has no words: {phrase!r}")
+
+        node = self._root
+        for token in tokens:
+            node = node.children.setdefault(token, _TrieNode())
+        node.outputs.append(output)
+        self._max_phrase = max(self._max_phrase, len(tokens))
+
+    def _scan(self, tokens: List[str]):
+        """Longest phrase starting at each token: yields (position, length, outputs)"""
+        position = 0
+        while position < len(tokens):
+            node = self._root
+            longest = None
+            for offset in range(position, min(len(tokens), position + self._max_phrase)):
+                node = node.children.get(tokens[offset])
+                if node is None:
+                    break
+                if node.outputs:
+                    longest = (offset - position + 1, node.outputs)
+
+            if longest is None:
+                position += 1
+                continue
+            yield position, longest[0], longest[1]
+            # Matched words are consumed, so "switch on" is never also "on"
+            position += longest[0]
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Best intent and its slot values for a transcript, or None"""
+        keywords: Dict[str, int] = {}
+        slot_values: Dict[str, Dict[str, str]] = {}
+        for position, _, outputs in self._scan(tokenize(text)):
+            for name, slot, value in outputs:
+                if slot is None:
+                    keywords.setdefault(name, position)
+                else:
+                    # The first phrase heard fills the slot
+                    slot_values.setdefault(name, {}).setdefault(slot, value)
+
+        if not keywords:
+            return None
+
+        name = min(keywords, key=lambda n: (-self.intents[n].priority, keywords[n]))
+        return IntentMatch(self.intents[name], slot_values.get(name, {}), keywords[name])
@@ -0,0 +1,265 @@
+import threading
+import logging
+import numpy as np
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.config import Config
+from modules.audio_front_end import AudioFrontEnd
+from modules.command_pipeline import CommandPipeline
+from modules.feature_store import FeatureStore
+from modules.utterance_capture import UtteranceCapture
+from modules.wake_word_detector import WakeWordDetector
+from utils.audio_utils import import_pyaudio
+from utils.metrics import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class StreamState:
+    """Front end, utterance capture plus threshold, smoothing and refractory state of one stream"""
+
+    def __init__(self, stream_id: str, front_end: AudioFrontEnd,
+                 callback: Callable[[str, float], None], threshold: float,
+                 smoothing: float, refractory_windows: int,
+                 device_index: Optional[int] = None,
+                 capture: UtteranceCapture = None):
+        self.stream_id = stream_id
+        self.front_end = front_end
+        self.capture = capture
+        self.callback = callback
+        self.threshold = threshold
+        self.smoothing = smoothing
+        self.refractory_windows = refractory_windows
+        self.device_index = device_index
+
+        self.smoothed_score = 0.0
+        self._cooldown = 0
+        self.windows_scored = 0
+        self.detections = 0
+
+    def update(self, score: float, after_gap: bool = False) -> bool:
+        """
+        Fold one window score into the stream; True on a new detection.
+        after_gap: the window follows audio the gate skipped, so the average
+        restarts instead of carrying a score from before the silence
+        """
+        if after_gap:
+            self.smoothed_score = 0.0
+        self.smoothed_score = (self.smoothing * score
+                               + (1.0 - self.smoothing) * self.smoothed_score)
+        self.windows_scored += 1
+
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return False
+        if self.smoothed_score >= self.threshold:
+            self._cooldown = self.refractory_windows
+            self.detections += 1
+            return True
+        return False
+
+
+class MultiStreamDetector:
+    """
+    Serves many audio streams (rooms/microphones) from one shared
+    WakeWordDetector. Each scheduling round gathers the ready windows of
+    every stream and scores them in one batched forward pass; thresholds,
+    smoothing and refractory periods are tracked per stream. With a command
+    pipeline, a detection opens an utterance on its own stream, and the
+    command is submitted with that stream's id.
+    """
+
+    def __init__(self, config: Config, wake_word_detector: WakeWordDetector,
+                 latency_recorder: LatencyRecorder = None,
+                 command_pipeline: CommandPipeline = None,
+                 feature_store: FeatureStore = None):
+        self.config = config
+        self.wake_word_detector = wake_word_detector
+        self.latency = latency_recorder or LatencyRecorder()
+        self.command_pipeline = command_pipeline
+        self.feature_store = feature_store
+        self.lock = Lock()
+        self.streams: Dict[str, StreamState] = {}
+
+        self._data_ready = threading.Event()
+        self.is_listening = False
+        self.scheduler_thread: Optional[threading.Thread] = None
+        # PyAudio is only imported and opened once a capture stream starts
+        self._pyaudio = None
+        self.audio = None
+        self._audio_streams = []
+
+    def add_stream(self, stream_id: str, callback: Callable[[str, float], None],
+                   sensitivity: int = None, device_index: int = None) -> StreamState:
+        """Register a stream; callback(stream_id, score) fires on detection"""
+        level = sensitivity or self.wake_word_detector.get_current_sensitivity()
+        front_end = AudioFrontEnd(
+            self.config,
+            self.wake_word_detector.create_feature_stream(self.config.audio.window_size),
+            self.latency
+        )
+        state = StreamState(
+            stream_id, front_end, callback,
+            threshold=self.wake_word_detector.threshold_for(level),
+            smoothing=self.config.streams.score_smoothing,
+            refractory_windows=self.config.streams.refractory_windows,
+            device_index=device_index,
+            capture=UtteranceCapture(self.config, self.command_pipeline,
+                                     self.feature_store, stream_id=stream_id)
+        )
+        with self.lock:
+            if stream_id in self.streams:
+                raise ValueError(f"Stream already registered: {stream_id}")
+            self.streams[stream_id] = state
+        return state
+
+    def remove_stream(self, stream_id: str) -> None:
+        """Stop scoring a stream"""
+        with self.lock:
+            self.streams.pop(stream_id, None)
+
+    def set_sensitivity(self, stream_id: str, level: int) -> None:
+        """Set one stream's sensitivity (1-10)"""
+        with self.lock:
+            self.streams[stream_id].threshold = self.wake_word_detector.threshold_for(level)
+
+    def feed(self, stream_id: str, samples: np.ndarray) -> None:
+        """Push float32 samples captured on a stream"""
+        state = self.streams[stream_id]
+        state.front_end.feed(samples)
+        if state.capture.is_open:
+            state.capture.feed(samples)
+        self._data_ready.set()
+
+    def process_pending(self) -> List[Tuple[str, float]]:
+        """
+        Score every stream's ready windows in shared batches
+        Returns: [(stream_id, smoothed_score)] for new detections
+        """
+        with self.lock:
+            states = list(self.streams.values())
+
+        owners = []
+        batches = []
+        for state in states:
+            features, breaks = state.front_end.collect_features(with_breaks=True)
+            if len(features):
+                owners.append((state, breaks))
+                batches.append(features)
+        if not batches:
+            return []
+
+        features = np.concatenate(batches)
+        max_batch = self.config.streams.max_batch
+        with self.latency.measure('inference'):
+            scores = np.concatenate([
+                self.wake_word_detector.detect_features(features[start:start + max_batch])[1]
+                for start in range(0, len(features), max_batch)
+            ])
+
+        detections = []
+        offset = 0
+        with self.lock:
+            for (state, breaks), stream_features in zip(owners, batches):
+                count = len(breaks)
+                stream_scores = scores[offset:offset + count]
+                triggered = False
+                for score, after_gap in zip(stream_scores, breaks):
+                    if state.update(float(score), bool(after_gap)):
+                        triggered = True
+                        detections.append((state.stream_id, state.smoothed_score))
+                state.capture.collect_training_windows(
+                    stream_features, stream_scores, state.threshold, triggered)
+                offset += count
+        return detections
+
+    def _on_detection(self, stream_id: str, score: float) -> None:
+        """Open the stream's utterance, then tell its callback"""
+        state = self.streams[stream_id]
+        state.capture.begin()
+        state.callback(stream_id, score)
+
+    def start_listening(self):
+        """Open one input stream per device and start the scheduler"""
+        if self.is_listening:
+            return
+
+        self.is_listening = True
+        with self.lock:
+            capture = [s for s in self.streams.values() if s.device_index is not None]
+
+        if capture:
+            self._pyaudio = import_pyaudio()
+            self.audio = self._pyaudio.PyAudio()
+            for state in capture:
+                self._audio_streams.append(self.audio.open(
+                    format=self._pyaudio.paFloat32,
+                    channels=self.config.audio.channels,
+                    rate=self.config.audio.sample_rate,
+                    input=True,
+                    input_device_index=state.device_index,
+                    frames_per_buffer=self.config.audio.chunk_size,
+                    stream_callback=self._make_callback(state.stream_id)
+                ))
+
+        self.scheduler_thread = threading.Thread(target=self._schedule)
+        self.scheduler_thread.daemon = True
+        self.scheduler_thread.start()
+
+    def stop_listening(self):
+        """Close capture streams and stop the scheduler"""
+        if not self.is_listening:
+            return
+
+        self.is_listening = False
+        for stream in self._audio_streams:
+            stream.stop_stream()
+            stream.close()
+        self._audio_streams = []
+
+        if self.scheduler_thread:
+            self.scheduler_thread.join()
+        if self.audio:
+            self.audio.terminate()
+            self.audio = None
+
+        with self.lock:
+            for state in self.streams.values():
+                state.front_end.reset()
+                state.capture.reset()
+
+    def _make_callback(self, stream_id: str):
+        def callback(in_data, frame_count, time_info, status):
+            self.feed(stream_id, np.frombuffer(in_data, dtype=np.float32))
+            return (in_data, self._pyaudio.paContinue)
+        return callback
+
+    def _schedule(self):
+        """Scheduler loop: one batched scoring round per wake-up"""
+        while self.is_listening:
+            try:
+                if not self._data_ready.wait(timeout=1.0):
+                    continue
+                self._data_ready.clear()
+
+                for stream_id, score in self.process_pending():
+                    self._on_detection(stream_id, score)
+
+            except Exception as e:
+                logger.error(f"Error in stream scheduler: {e}")
+                continue
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-stream scoring and gating counters"""
+        with self.lock:
+            return {
+                stream_id: {
+                    'threshold': state.threshold,
+                    'smoothed_score': state.smoothed_score,
+                    'windows_scored': state.windows_scored,
+                    'detections': state.detections,
+                    'vad': state.front_end.vad_gate.get_stats()
+                }
+                for stream_id, state in self.streams.items()
+            }
@@ -1,76 +1,178 @@
+import queue
 import threading
 import time
-import pygame
 import logging
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 
+from config.config import NotificationConfig
+
+# Each sound plays on its own reserved channel, so the mixer never steals it
+SOUND_CHANNELS = {'activation': 0, 'processing': 1, 'completion': 2}
+
 class NotificationManager:
-    def __init__(self):
-        self._active = False
-        self._notification_thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
-        
-        # Initialize pygame for audio notifications
-        pygame.mixer.init()
-        
+    """
+    Audio notifications. Sounds are decoded once at startup and played on
+    reserved mixer channels by a single long-lived scheduler thread; the
+    public methods only post events to it, so they never block and never
+    touch the disk on the command path. pygame is imported and the mixer
+    opened on that thread too, so construction returns immediately; events
+    posted meanwhile are handled once the sounds are ready.
+    """
+
+    def __init__(self, config: NotificationConfig = None):
+        self.config = config or NotificationConfig()
+        self._processing_count = 0
+        self._events: queue.Queue = queue.Queue()
+
+        # Configure logging
+        self.logger = logging.getLogger(__name__)
+
         # Get sound file paths
         self.sound_dir = Path(__file__).parent.parent / "assets" / "sounds"
         self.activation_sound = str(self.sound_dir / "activation.wav")
         self.processing_sound = str(self.sound_dir / "processing.wav")
         self.completion_sound = str(self.sound_dir / "completion.wav")
-        
-        # Configure logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        # Filled in by the scheduler thread before it handles any event
+        self._channels: Dict[str, object] = {}
+        self._sounds: Dict[str, object] = {}
+        self._ready = threading.Event()
+
+        self._scheduler = threading.Thread(target=self._run_scheduler, name="notifications")
+        self._scheduler.daemon = True
+        self._scheduler.start()
+
+    def _init_mixer(self) -> None:
+        """Open the mixer, reserve one channel per sound and decode the sounds"""
+        try:
+            import pygame
+
+            # Initialize pygame for audio notifications
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), len(SOUND_CHANNELS)))
+            pygame.mixer.set_reserved(len(SOUND_CHANNELS))
+            self._channels = {name: pygame.mixer.Channel(index)
+                              for name, index in SOUND_CHANNELS.items()}
+            self._sounds = self._load_sounds(pygame, {
+                'activation': self.activation_sound,
+                'processing': self.processing_sound,
+                'completion': self.completion_sound
+            })
+        except Exception as e:
+            # Notifications stay silent; commands still run
+            self.logger.error(f"Error initializing audio notifications: {e}")
+        finally:
+            self._ready.set()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """Wait until the mixer is open and the sounds are decoded"""
+        return self._ready.wait(timeout)
+
+    def _load_sounds(self, pygame, paths: Dict[str, str]) -> Dict[str, Optional[object]]:
+        """Decode every notification sound once"""
+        sounds = {}
+        for name, path in paths.items():
+            try:
+                sounds[name] = pygame.mixer.Sound(path)
+            except Exception as e:
+                self.logger.error(f"Error loading notification sound {path}: {e}")
+                sounds[name] = None
+        return sounds
 
     def start_notification(self, notification_type: str):
         """Start showing a notification of the specified type"""
-        if self._active:
+        if notification_type not in SOUND_CHANNELS:
+            self.logger.warning(f"Unknown notification type: {notification_type}")
             return
-            
-        self._active = True
-        self._stop_event.clear()
-        
-        if notification_type == "activation":
-            self._play_sound(self.activation_sound)
-        elif notification_type == "processing":
-            self._notification_thread = threading.Thread(
-                target=self._show_processing_notification
-            )
-            self._notification_thread.start()
-        elif notification_type == "completion":
-            self._play_sound(self.completion_sound)
-            
-        self.logger.info(f"Started {notification_type} notification")
+        self._events.put(('start', notification_type))
 
     def stop_notification(self):
-        """Stop showing the current notification"""
-        if not self._active:
+        """Stop the repeating processing notification once every request has ended"""
+        self._events.put(('stop', 'processing'))
+
+    def show_processing(self):
+        """Processing notification while a command runs"""
+        self.start_notification("processing")
+
+    def hide_processing(self):
+        """End of the command's processing notification"""
+        self.stop_notification()
+
+    def notify_startup(self):
+        """Play the activation sound once the assistant is listening"""
+        self.start_notification("activation")
+
+    def notify_shutdown(self):
+        """Play the completion sound, then stop the scheduler once it has finished"""
+        self.start_notification("completion")
+        self.close(timeout=self.config.shutdown_drain_seconds + 1.0)
+
+    def close(self, timeout: float = 2.0):
+        """Stop the scheduler thread after the queued events"""
+        self._events.put(('shutdown', None))
+        self._scheduler.join(timeout)
+
+    def _run_scheduler(self):
+        """Single thread handling start/stop events and the processing repeat"""
+        self._init_mixer()
+        next_repeat = None
+        while True:
+            timeout = None if next_repeat is None else max(0.0, next_repeat - time.monotonic())
+            try:
+                action, name = self._events.get(timeout=timeout)
+            except queue.Empty:
+                action, name = 'repeat', 'processing'
+
+            if action == 'shutdown':
+                self._drain('completion', self.config.shutdown_drain_seconds)
+                for channel in self._channels.values():
+                    channel.stop()
+                break
+
+            if action == 'start':
+                if name == 'processing':
+                    # Overlapping commands share one repeating sound
+                    self._processing_count += 1
+                    if self._processing_count > 1:
+                        continue
+                    next_repeat = time.monotonic() + self.config.processing_repeat_seconds
+                self._play(name)
+                self.logger.debug(f"Started {name} notification")
+            elif action == 'stop':
+                self._processing_count = max(0, self._processing_count - 1)
+                if self._processing_count == 0:
+                    next_repeat = None
+                    if 'processing' in self._channels:
+                        self._channels['processing'].stop()
+            elif action == 'repeat' and self._processing_count:
+                self._play('processing')
+                next_repeat = time.monotonic() + self.config.processing_repeat_seconds
+
+    def _drain(self, name: str, timeout: float):
+        """Wait, at most timeout seconds, for a sound already playing to finish"""
+        channel = self._channels.get(name)
+        if channel is None:
+            return
+        for other, other_channel in self._channels.items():
+            if other != name:
+                other_channel.stop()
+        deadline = time.monotonic() + timeout
+        try:
+            while channel.get_busy() and time.monotonic() < deadline:
+                time.sleep(0.02)
+        except Exception as e:
+            self.logger.error(f"Error waiting for {name} notification: {e}")
+
+    def _play(self, name: str):
+        """Play a cached sound on its reserved channel"""
+        sound = self._sounds.get(name)
+        if sound is None or not self.config.audio_enabled:
             return
-            
-        self._stop_event.set()
-        if self._notification_thread:
-            self._notification_thread.join()
-            self._notification_thread = None
-            
-        self._active = False
-        self.logger.info("Stopped notification")
-
-    def _show_processing_notification(self):
-        """Show an ongoing processing notification"""
-        while not self._stop_event.is_set():
-            self._play_sound(self.processing_sound)
-            time.sleep(1.0)
-
-    def _play_sound(self, sound_file: str):
-        """Play a notification sound"""
         try:
-            sound = pygame.mixer.Sound(sound_file)
-            sound.play()
+            self._channels[name].play(sound)
         except Exception as e:
             self.logger.error(f"Error playing notification sound: {e}")
 
     def is_active(self) -> bool:
         """Check if a notification is currently active"""
-        return self._active
+        return self._processing_count > 0
@@ -0,0 +1,112 @@
+import logging
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from models.user_preferences import UserPreferences
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_ID = 'default'
+
+
+class PreferencesCache:
+    """
+    Process-wide copy of every user's preferences, keyed by user_id.
+    All rows are loaded in one query the first time the cache is used;
+    after that reads are served from memory and never touch the database.
+    Updates go to the database first and refresh the cached entry only
+    once the commit succeeded (write-through).
+    """
+
+    def __init__(self, session_factory: Callable):
+        self.session_factory = session_factory
+        self.lock = Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'loads': 0, 'writes': 0}
+        self._prefs: Dict[str, Dict] = {}
+        self._loaded = False
+
+    def load(self) -> None:
+        """(Re)load every user's preferences in one query"""
+        session = self.session_factory()
+        try:
+            prefs = {row.user_id: row.to_dict() for row in session.query(UserPreferences).all()}
+        finally:
+            session.close()
+
+        with self.lock:
+            self._prefs = prefs
+            self._loaded = True
+            self.stats['loads'] += 1
+        logger.info(f"Loaded preferences for {len(prefs)} users")
+
+    def get(self, user_id: str = DEFAULT_USER_ID) -> Optional[Dict]:
+        """Cached preferences for a user, or None if the user has none stored"""
+        if not self._loaded:
+            self.load()
+
+        with self.lock:
+            prefs = self._prefs.get(user_id)
+            self.stats['hits' if prefs is not None else 'misses'] += 1
+            return dict(prefs) if prefs is not None else None
+
+    def update(self, user_id: str = DEFAULT_USER_ID, **changes) -> Dict:
+        """
+        Write changed values to the database, creating the user's row if
+        needed, then refresh the cache entry. Raises ValueError for fields
+        the preferences table does not have, rather than dropping them.
+        Returns: the user's preferences after the update
+        """
+        unknown = set(changes) - set(UserPreferences.__table__.columns.keys())
+        if unknown:
+            raise ValueError(f"Unknown preference fields: {', '.join(sorted(unknown))}")
+
+        session = self.session_factory()
+        try:
+            row = session.query(UserPreferences).filter(
+                UserPreferences.user_id == user_id
+            ).first()
+            if row is None:
+                row = UserPreferences(user_id=user_id)
+                session.add(row)
+            row.update_preferences(**changes)
+            session.commit()
+            prefs = row.to_dict()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        with self.lock:
+            self._prefs[user_id] = prefs
+            self.stats['writes'] += 1
+        return dict(prefs)
+
+    def invalidate(self) -> None:
+        """Drop cached entries; the next read reloads them in bulk"""
+        with self.lock:
+            self._prefs = {}
+            self._loaded = False
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters, hit rate and number of cached users"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['users'] = len(self._prefs)
+        reads = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / reads if reads else 0.0
+        return stats
+
+
+_default_cache: Optional[PreferencesCache] = None
+_default_cache_lock = Lock()
+
+
+def get_preferences_cache() -> PreferencesCache:
+    """Shared cache over the default database session"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            from utils.db_utils import get_db_session
+            _default_cache = PreferencesCache(get_db_session)
+        return _default_cache
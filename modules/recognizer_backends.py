@@ -0,0 +1,145 @@
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # bytes per sample of 16-bit PCM command audio
+
+
+@dataclass
+class Hypothesis:
+    text: str
+    is_final: bool = False
+
+
+HypothesisCallback = Callable[[Hypothesis], None]
+
+
+class RecognitionSession(ABC):
+    """
+    One utterance being transcribed. Audio is pushed as it is captured and
+    hypotheses are reported through the callback: any number of partials,
+    then one final from ``finish``.
+    """
+
+    def __init__(self, on_hypothesis: HypothesisCallback = None):
+        self.on_hypothesis = on_hypothesis
+        self.partials: List[Hypothesis] = []
+
+    @abstractmethod
+    def push(self, audio_chunk: bytes) -> None:
+        """Add captured 16-bit PCM audio"""
+
+    @abstractmethod
+    def finish(self) -> Optional[Hypothesis]:
+        """End of utterance; returns the final hypothesis or None if nothing was understood"""
+
+    def _emit(self, hypothesis: Hypothesis) -> None:
+        if not hypothesis.is_final:
+            self.partials.append(hypothesis)
+        if self.on_hypothesis:
+            self.on_hypothesis(hypothesis)
+
+
+class RecognizerBackend(ABC):
+    """Factory for recognition sessions; one session per utterance"""
+
+    @abstractmethod
+    def start_session(self, on_hypothesis: HypothesisCallback = None) -> RecognitionSession:
+        """New session reporting hypotheses through on_hypothesis"""
+
+    def transcribe(self, audio_data: bytes) -> Optional[str]:
+        """Convenience for fully buffered audio"""
+        session = self.start_session()
+        session.push(audio_data)
+        final = session.finish()
+        return final.text if final else None
+
+
+class GoogleRecognitionSession(RecognitionSession):
+    """Buffers the utterance and sends it to the Google Web Speech API on finish"""
+
+    def __init__(self, recognizer, sample_rate: int, on_hypothesis: HypothesisCallback = None):
+        super().__init__(on_hypothesis)
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self._chunks: List[bytes] = []
+
+    def push(self, audio_chunk: bytes) -> None:
+        self._chunks.append(audio_chunk)
+
+    def finish(self) -> Optional[Hypothesis]:
+        import speech_recognition as sr
+
+        audio = sr.AudioData(b''.join(self._chunks), self.sample_rate, SAMPLE_WIDTH)
+        try:
+            text = self.recognizer.recognize_google(audio).lower()
+        except sr.UnknownValueError:
+            logger.warning("Could not understand audio")
+            return None
+
+        final = Hypothesis(text, is_final=True)
+        self._emit(final)
+        return final
+
+
+class GoogleRecognizerBackend(RecognizerBackend):
+    """Batch backend on speech_recognition; emits no partial results"""
+
+    def __init__(self, sample_rate: int, recognizer=None, operation_timeout: float = None):
+        import speech_recognition as sr
+
+        self.sample_rate = sample_rate
+        self.recognizer = recognizer or sr.Recognizer()
+        if operation_timeout is not None:
+            # Seconds before a request to the API gives up; unbounded by default
+            self.recognizer.operation_timeout = operation_timeout
+
+    def start_session(self, on_hypothesis: HypothesisCallback = None) -> RecognitionSession:
+        return GoogleRecognitionSession(self.recognizer, self.sample_rate, on_hypothesis)
+
+
+class OfflineRecognitionSession(RecognitionSession):
+    def __init__(self, transcript: Optional[str], bytes_per_word: int,
+                 on_hypothesis: HypothesisCallback = None):
+        super().__init__(on_hypothesis)
+        self.words = transcript.lower().split() if transcript else []
+        self.bytes_per_word = bytes_per_word
+        self._received = 0
+        self._revealed = 0
+
+    def push(self, audio_chunk: bytes) -> None:
+        self._received += len(audio_chunk)
+        revealed = min(len(self.words), self._received // self.bytes_per_word)
+        if revealed > self._revealed:
+            self._revealed = revealed
+            self._emit(Hypothesis(' '.join(self.words[:revealed])))
+
+    def finish(self) -> Optional[Hypothesis]:
+        if not self.words:
+            return None
+        final = Hypothesis(' '.join(self.words), is_final=True)
+        self._emit(final)
+        return final
+
+
+class OfflineRecognizerBackend(RecognizerBackend):
+    """
+    Local stand-in for tests and offline replay. Reveals a known transcript
+    word by word as audio arrives, at ``words_per_second`` of pushed audio,
+    so partial-result handling can be exercised without a network.
+    """
+
+    def __init__(self, transcript: str = None, sample_rate: int = 16000,
+                 words_per_second: float = 2.5):
+        self.transcript = transcript
+        self.bytes_per_word = max(1, int(sample_rate * SAMPLE_WIDTH / words_per_second))
+        self.lock = Lock()
+
+    def start_session(self, on_hypothesis: HypothesisCallback = None) -> RecognitionSession:
+        with self.lock:
+            transcript = self.transcript
+        return OfflineRecognitionSession(transcript, self.bytes_per_word, on_hypothesis)
@@ -1,28 +1,57 @@
-import pyaudio
+import logging
 import threading
-import queue
 import numpy as np
-from typing import Optional, Callable
+from typing import TYPE_CHECKING, Optional, Callable
 
-from ..utils.audio_utils import AudioUtils
-from ..modules.wake_word_detector import WakeWordDetector
-from ..config.config import Config
+if TYPE_CHECKING:
+    import pyaudio
+
+from utils.audio_utils import AudioUtils, import_pyaudio
+from utils.metrics import LatencyRecorder
+from modules.audio_front_end import AudioFrontEnd
+from modules.command_pipeline import CommandPipeline
+from modules.detector_pool import DetectorPool
+from modules.feature_store import FeatureStore
+from modules.utterance_capture import UtteranceCapture
+from modules.wake_word_detector import WakeWordDetector
+from config.config import Config
+
+logger = logging.getLogger(__name__)
 
 class SpeechListener:
     def __init__(self, 
                  wake_word_callback: Callable,
                  config: Config,
                  audio_utils: AudioUtils,
-                 wake_word_detector: WakeWordDetector):
+                 wake_word_detector: WakeWordDetector,
+                 latency_recorder: LatencyRecorder = None,
+                 command_pipeline: CommandPipeline = None,
+                 feature_store: FeatureStore = None):
         
         self.wake_word_callback = wake_word_callback
         self.config = config
         self.audio_utils = audio_utils
         self.wake_word_detector = wake_word_detector
+        self.latency = latency_recorder or LatencyRecorder()
+        # When set, audio after the wake word is streamed to its recognizer and
+        # the finished utterance is processed on the pipeline's workers
+        self.command_pipeline = command_pipeline
+        # When set, near-threshold windows and triggers are kept for model updates
+        self.feature_store = feature_store
+        self.capture = UtteranceCapture(config, command_pipeline, feature_store)
         
-        self.audio = pyaudio.PyAudio()
-        self.stream: Optional[pyaudio.Stream] = None
-        self.audio_queue = queue.Queue()
+        # PyAudio is only imported and opened once live capture starts
+        self._pyaudio = None
+        self.audio = None
+        self.stream: Optional["pyaudio.Stream"] = None
+        self.front_end = AudioFrontEnd(
+            config,
+            wake_word_detector.create_feature_stream(config.audio.window_size),
+            self.latency
+        )
+        self.ring_buffer = self.front_end.ring_buffer
+        self.vad_gate = self.front_end.vad_gate
+        self.detector_pool: Optional[DetectorPool] = None
         self.is_listening = False
         self.listen_thread: Optional[threading.Thread] = None
 
@@ -31,15 +60,29 @@ class SpeechListener:
         if self.is_listening:
             return
 
+        self._pyaudio = import_pyaudio()
         self.is_listening = True
+
+        if self.config.wake_word.execution_mode == "process":
+            # Score on worker processes; windows travel through shared memory
+            self.detector_pool = DetectorPool(
+                self.wake_word_detector.config,
+                self.config.audio.window_size,
+                on_result=self._on_pool_result,
+                n_workers=self.config.wake_word.worker_processes or None,
+                model_version=self.wake_word_detector.model_version,
+                hop_size=self.config.audio.hop_size
+            )
         
         # Open audio stream
+        if self.audio is None:
+            self.audio = self._pyaudio.PyAudio()
         self.stream = self.audio.open(
-            format=pyaudio.paFloat32,
-            channels=self.config.AUDIO_CHANNELS,
-            rate=self.config.SAMPLE_RATE,
+            format=self._pyaudio.paFloat32,
+            channels=self.config.audio.channels,
+            rate=self.config.audio.sample_rate,
             input=True,
-            frames_per_buffer=self.config.CHUNK_SIZE,
+            frames_per_buffer=self.config.audio.chunk_size,
             stream_callback=self._audio_callback
         )
 
@@ -61,35 +104,83 @@ class SpeechListener:
         
         if self.listen_thread:
             self.listen_thread.join()
+
+        if self.detector_pool:
+            self.detector_pool.close()
+            self.detector_pool = None
             
-        # Clear queue
-        while not self.audio_queue.empty():
-            self.audio_queue.get()
+        self.reset()
+
+    def reset(self):
+        """Drop buffered audio and per-stream state"""
+        self.front_end.reset()
+        self.capture.reset()
 
     def _audio_callback(self, in_data, frame_count, time_info, status):
-        """Callback for audio stream to add data to queue"""
-        audio_data = np.frombuffer(in_data, dtype=np.float32)
-        self.audio_queue.put(audio_data)
-        return (in_data, pyaudio.paContinue)
+        """Callback for audio stream to copy data into the ring buffer"""
+        self.feed(np.frombuffer(in_data, dtype=np.float32))
+        return (in_data, self._pyaudio.paContinue)
+
+    def feed(self, samples: np.ndarray) -> None:
+        """Push float32 samples into the pipeline (live callback or offline replay)"""
+        self.front_end.feed(samples)
+        if self.capture.is_open:
+            self.capture.feed(samples)
 
     def _process_audio(self):
-        """Process audio data from queue and detect wake word"""
+        """Process windows from the ring buffer and detect wake word"""
         while self.is_listening:
             try:
-                # Get audio chunk from queue
-                audio_data = self.audio_queue.get(timeout=1.0)
-                
-                # Process audio through wake word detector
-                if self.wake_word_detector.detect(audio_data):
+                if not self.ring_buffer.wait(timeout=1.0):
+                    continue
+
+                if self.process_pending():
                     # Wake word detected - trigger callback
-                    self.wake_word_callback()
+                    self._on_wake_word()
                     
-            except queue.Empty:
-                continue
             except Exception as e:
-                print(f"Error processing audio: {e}")
+                logger.error(f"Error processing audio: {e}")
                 continue
 
+    def process_pending(self) -> bool:
+        """Run every complete window through gate, features and detector"""
+        if self.detector_pool is not None:
+            # Results arrive asynchronously through _on_pool_result; workers
+            # follow this detector's sensitivity and serving model version
+            self.detector_pool.submit(self.front_end.collect_windows(),
+                                      sensitivity=self.wake_word_detector.get_current_sensitivity(),
+                                      model_version=self.wake_word_detector.model_version)
+            return False
+
+        features = self.front_end.collect_features()
+        if len(features) == 0:
+            return False
+
+        # Score every pending window in one pass
+        with self.latency.measure('inference'):
+            detections, scores = self.wake_word_detector.detect_features(features)
+        self.capture.collect_training_windows(
+            features, scores, self.wake_word_detector.get_detection_threshold(),
+            bool(detections.any()))
+        return bool(detections.any())
+
+    def _on_pool_result(self, detections, scores):
+        """Scores returned by a detector worker process"""
+        if any(detections):
+            self._on_wake_word()
+
+    def _on_wake_word(self):
+        self.begin_utterance()
+        self.wake_word_callback()
+
+    def begin_utterance(self) -> None:
+        """Start streaming captured audio to the command recognizer"""
+        self.capture.begin()
+
+    def get_vad_stats(self) -> dict:
+        """Voice activity gate counters, including the skipped-frame ratio"""
+        return self.vad_gate.get_stats()
+
     def __del__(self):
         """Cleanup on deletion"""
         self.stop_listening()
@@ -0,0 +1,106 @@
+import logging
+import threading
+import numpy as np
+from typing import Optional
+
+from config.config import Config
+from modules.command_pipeline import CommandPipeline
+from modules.feature_store import FeatureStore
+from utils.audio_utils import float_to_pcm16
+
+logger = logging.getLogger(__name__)
+
+
+class UtteranceCapture:
+    """
+    Audio after a wake word on one input. Once opened, captured samples are
+    streamed to the command recognizer and the finished utterance is handed
+    to the pipeline's workers, tagged with the stream it came from. With a
+    feature store, near-threshold windows are kept and the trigger window is
+    labelled by the outcome of its command.
+    """
+
+    def __init__(self, config: Config, command_pipeline: CommandPipeline = None,
+                 feature_store: FeatureStore = None, stream_id: str = None):
+        self.config = config
+        self.command_pipeline = command_pipeline
+        self.feature_store = feature_store
+        self.stream_id = stream_id
+        self.lock = threading.Lock()
+        self._utterance = None
+        self._samples = 0
+        self._last_trigger: Optional[np.ndarray] = None
+        self._utterance_trigger: Optional[np.ndarray] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._utterance is not None
+
+    def collect_training_windows(self, features: np.ndarray, scores: np.ndarray,
+                                 threshold: float, triggered: bool) -> None:
+        """Hand near misses to the feature store; hold on to a trigger until its outcome is known"""
+        if self.feature_store is None or len(features) == 0:
+            return
+        try:
+            self.feature_store.add_near_threshold(features, scores, threshold)
+        except Exception as e:
+            logger.error(f"Error storing training windows: {e}")
+        if triggered:
+            # The strongest window stands for the trigger
+            self._last_trigger = np.array(features[int(np.argmax(scores))])
+
+    def begin(self) -> None:
+        """Start streaming captured audio to the command recognizer"""
+        if self.command_pipeline is None:
+            return
+        with self.lock:
+            if self._utterance is None:
+                self._utterance = self.command_pipeline.start_utterance()
+                self._samples = 0
+                self._utterance_trigger, self._last_trigger = self._last_trigger, None
+
+    def feed(self, samples: np.ndarray) -> None:
+        """Forward 16-bit PCM to the open utterance; close it after max_utterance_seconds"""
+        with self.lock:
+            utterance = self._utterance
+            if utterance is None:
+                return
+            limit = int(self.config.recognizer.max_utterance_seconds * self.config.audio.sample_rate)
+            samples = samples[:limit - self._samples]
+            self._samples += len(samples)
+            done = self._samples >= limit
+            if done:
+                self._utterance = None
+                trigger, self._utterance_trigger = self._utterance_trigger, None
+
+        utterance.push(float_to_pcm16(samples))
+        if done:
+            # The final transcription may hit the network; the pipeline's
+            # recognition workers run it, bounded by its queues and timeout
+            future = self.command_pipeline.submit_utterance(utterance, stream_id=self.stream_id)
+            future.add_done_callback(
+                lambda f: self._finish(utterance, trigger, f.result()))
+
+    def _finish(self, utterance, trigger: Optional[np.ndarray], success: bool) -> None:
+        """
+        Label the trigger of a processed command: a command that ran confirms
+        the wake word, silence after it marks a false trigger. Speech that
+        matched no command is ambiguous, and a request the pipeline rejected
+        or timed out before recognition is unknown; neither is stored.
+        """
+        if self.feature_store is None or trigger is None:
+            return
+        try:
+            if success:
+                self.feature_store.add_trigger(trigger, confirmed=True)
+            elif utterance.finished and utterance.text is None:
+                self.feature_store.add_trigger(trigger, confirmed=False)
+        except Exception as e:
+            logger.error(f"Error storing trigger window: {e}")
+
+    def reset(self) -> None:
+        """Drop the open utterance and any held trigger"""
+        with self.lock:
+            self._utterance = None
+            self._utterance_trigger = None
+        self._last_trigger = None
@@ -0,0 +1,102 @@
+import numpy as np
+from threading import Lock
+from typing import Dict, Optional
+
+from config.config import VadConfig
+from utils.audio_utils import frame_rms
+
+
+class VoiceActivityGate:
+    """
+    Energy-based voice activity gate placed in front of the wake word model.
+    Tracks an adaptive noise floor (falls quickly, rises slowly) and passes
+    frames whose RMS clears it by ``threshold_ratio``, optionally also frames
+    with high positive spectral flux. A hangover keeps the gate open for a
+    few frames after speech so word endings are not clipped. The floor
+    starts at min_energy, so a stream that opens with speech is not gated
+    against that speech; it then settles on the background level.
+    """
+
+    def __init__(self, config: VadConfig = None):
+        self.config = config or VadConfig()
+        self.lock = Lock()
+        self._noise_floor = self.config.min_energy
+        self._hangover = 0
+        self._prev_spectrum: Optional[np.ndarray] = None
+        self.frames_total = 0
+        self.frames_skipped = 0
+
+    def update(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Classify a (batch, samples) array of consecutive frames
+        Returns: boolean mask, True where the frame should reach the model
+        """
+        frames = np.atleast_2d(np.asarray(frames, dtype=np.float32))
+        if not self.config.enabled:
+            return np.ones(len(frames), dtype=bool)
+
+        energies = frame_rms(frames)
+        flux = self._spectral_flux(frames) if self.config.use_spectral_flux else None
+
+        with self.lock:
+            active = np.zeros(len(frames), dtype=bool)
+            for i, energy in enumerate(energies):
+                active[i] = self._step(float(energy), None if flux is None else float(flux[i]))
+
+            self.frames_total += len(frames)
+            self.frames_skipped += int(len(frames) - active.sum())
+            return active
+
+    def _step(self, energy: float, flux: Optional[float]) -> bool:
+        threshold = max(self.config.min_energy, self._noise_floor * self.config.threshold_ratio)
+        speech = energy > threshold
+        if flux is not None and energy > self.config.min_energy:
+            speech = speech or flux > self.config.flux_threshold
+
+        if speech:
+            self._hangover = self.config.hangover_windows
+            rate = self.config.floor_rise_rate
+        else:
+            rate = self.config.floor_fall_rate if energy < self._noise_floor \
+                else self.config.floor_rise_rate
+        self._noise_floor += rate * (energy - self._noise_floor)
+
+        if speech:
+            return True
+        if self._hangover > 0:
+            self._hangover -= 1
+            return True
+        return False
+
+    def _spectral_flux(self, frames: np.ndarray) -> np.ndarray:
+        """Normalized positive spectral change against the previous frame"""
+        spectra = np.abs(np.fft.rfft(frames, axis=-1))
+        previous = np.empty_like(spectra)
+        previous[1:] = spectra[:-1]
+        previous[0] = spectra[0] if self._prev_spectrum is None else self._prev_spectrum
+        self._prev_spectrum = spectra[-1]
+
+        increase = np.maximum(spectra - previous, 0.0).sum(axis=-1)
+        return increase / (previous.sum(axis=-1) + 1e-10)
+
+    def skip_ratio(self) -> float:
+        """Fraction of frames kept away from the wake word model"""
+        with self.lock:
+            return self.frames_skipped / self.frames_total if self.frames_total else 0.0
+
+    def get_stats(self) -> Dict[str, float]:
+        """Gate counters and current noise floor"""
+        with self.lock:
+            return {
+                'frames_total': self.frames_total,
+                'frames_skipped': self.frames_skipped,
+                'skip_ratio': self.frames_skipped / self.frames_total if self.frames_total else 0.0,
+                'noise_floor': self._noise_floor
+            }
+
+    def reset(self) -> None:
+        """Forget the noise floor estimate and hangover state"""
+        with self.lock:
+            self._noise_floor = self.config.min_energy
+            self._hangover = 0
+            self._prev_spectrum = None
@@ -1,30 +1,219 @@
 import os
+import time
+import shutil
+import logging
+import threading
 import numpy as np
-import tensorflow as tf
-from threading import Lock
-from typing import Optional, Tuple
-from tensorflow.keras import layers, models
-from utils.audio_utils import preprocess_audio
+from concurrent.futures import Future
+from dataclasses import dataclass
+from threading import Event, Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Tuple
+from utils.audio_utils import (FRAME_LENGTH, HOP_LENGTH, StreamingFeatureExtractor,
+                               preprocess_audio)
 from config.config import WakeWordConfig
+from modules.inference_engine import (LinearWakeWordScorer, NumpyWakeWordModel,
+                                      QuantizedWakeWordModel, export_weights)
+
+if TYPE_CHECKING:
+    from tensorflow.keras import models
+    from modules.feature_store import FeatureStore
+
+logger = logging.getLogger(__name__)
+
+
+def _versioned_path(path: str, version: int) -> str:
+    """wake_word_model.int8.npz -> wake_word_model.v3.int8.npz"""
+    directory, name = os.path.split(path)
+    stem, _, suffix = name.partition('.')
+    return os.path.join(directory, f"{stem}.v{version}.{suffix}")
+
+
+@dataclass
+class _ServingModel:
+    """Everything needed to serve, persist or restore one model version"""
+    version: int
+    model: Any  # Keras model
+    score: Callable[[np.ndarray], np.ndarray]
+    engine: Any  # backend artifact: traced function, NumPy or int8 model
+
 
 class WakeWordDetector:
-    def __init__(self):
-        self.config = WakeWordConfig()
-        self.model = self._load_model()
-        self.sensitivity = self.config.DEFAULT_SENSITIVITY
+    def __init__(self, config: WakeWordConfig = None, lazy: bool = False):
+        """
+        With lazy=True the inference backend (and TensorFlow, if it needs it)
+        is not loaded here but by load(), either from a warm-up thread or on
+        the first detection, which waits for it.
+        """
+        self.config = config or WakeWordConfig()
+        self.model_path = os.path.join(self.config.model_dir, "wake_word_model.h5")
+        self.weights_path = os.path.join(self.config.model_dir, "wake_word_model.npz")
+        self.quantized_path = os.path.join(self.config.model_dir, "wake_word_model.int8.npz")
+        self.first_stage_path = os.path.join(self.config.model_dir, "wake_word_model.stage1.npz")
+        # Traced inference graph cached next to the .h5 so restarts skip tracing
+        self.saved_model_path = os.path.join(self.config.model_dir, "wake_word_model.savedmodel")
+        # Keeps the restored SavedModel's variables alive while its function is in use
+        self._saved_model = None
+        # Keras model; stays None on the NumPy backend until update_model needs it
+        self.model = None
+        self._score: Optional[Callable[[np.ndarray], np.ndarray]] = None
+        self._load_lock = Lock()
+        self._ready = Event()
+        self.sensitivity = self.config.default_sensitivity
         self.lock = Lock()
         self._threshold = self._calculate_threshold()
+        self._first_stage = self._load_first_stage()
+        self._first_stage_threshold = self._calculate_first_stage_threshold()
+        self._cascade_stats = {'frames': 0, 'first_stage_hits': 0, 'second_stage_hits': 0}
+        # Serving model version; update_model swaps in a new one, rollback the previous
+        self.model_version = 1
+        self._previous: Optional[_ServingModel] = None
+        self._update_lock = Lock()  # one training run at a time
+        self._last_update: Optional[Dict] = None
+        if not lazy:
+            self.load()
+
+    def load(self) -> None:
+        """Load the inference backend once; concurrent callers wait for the first"""
+        if self._ready.is_set():
+            return
+        with self._load_lock:
+            if self._ready.is_set():
+                return
+            score = self._load_backend()
+            self._warm_up(score)
+            with self.lock:
+                self._score = score
+            self._ready.set()
+
+    def is_ready(self) -> bool:
+        """Whether the inference backend has been loaded"""
+        return self._ready.is_set()
+
+    def _load_backend(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Set up the inference backend selected in WakeWordConfig"""
+        if self.config.backend == "numpy":
+            if not os.path.exists(self.weights_path):
+                # One-off export; later starts skip TensorFlow entirely
+                self.model = self._load_model()
+                export_weights(self.model, self.weights_path)
+            return NumpyWakeWordModel.load(self.weights_path).predict
+
+        if self.config.backend == "int8":
+            if os.path.exists(self.quantized_path):
+                quantized = QuantizedWakeWordModel.load(self.quantized_path)
+            elif self.config.calibration_features:
+                quantized = self._quantize(np.load(self.config.calibration_features))
+            else:
+                raise ValueError("The int8 backend needs calibration_features "
+                                 "or an existing quantized model")
+            logger.info(f"Int8 wake word model accuracy delta: {quantized.report}")
+            return quantized.predict
+
+        if self.config.backend != "tensorflow":
+            raise ValueError(f"Unknown wake word backend: {self.config.backend}")
+
+        if self.config.cache_inference_artifact and self._artifact_is_current():
+            try:
+                return self._load_inference_artifact()
+            except Exception as e:
+                logger.warning(f"Could not load cached inference graph, re-tracing: {e}")
+
+        self.model = self._load_model()
+        infer = self._build_inference_fn(self.model)
+        if self.config.cache_inference_artifact:
+            self._export_inference_artifact(infer, self.model)
+        return lambda features: infer(features).numpy()[:, 0]
+
+    def _warm_up(self, score: Callable[[np.ndarray], np.ndarray]) -> None:
+        """
+        Score silence once per production batch size, so graph tracing and
+        buffer allocation happen now rather than on the first wake word
+        """
+        if not self.config.warm_up_batch_sizes:
+            return
+        start = time.perf_counter()
+        for batch_size in self.config.warm_up_batch_sizes:
+            features = np.zeros((batch_size, self.config.audio_features), dtype=np.float32)
+            score(features)
+            if self._first_stage is not None:
+                self._first_stage.predict(features)
+        logger.info(f"Wake word model warmed up in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def _artifact_is_current(self) -> bool:
+        """Whether the cached inference graph exists and is not older than the .h5"""
+        marker = os.path.join(self.saved_model_path, "saved_model.pb")
+        if not os.path.exists(marker):
+            return False
+        return (not os.path.exists(self.model_path)
+                or os.path.getmtime(marker) >= os.path.getmtime(self.model_path))
+
+    def _load_inference_artifact(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Restore the traced inference function without rebuilding the Keras model"""
+        import tensorflow as tf
+
+        loaded = tf.saved_model.load(self.saved_model_path)
+        infer = loaded.infer
+        self._saved_model = loaded
+        logger.info(f"Loaded cached wake word inference graph from {self.saved_model_path}")
+        return lambda features: infer(features).numpy()[:, 0]
 
-    def _load_model(self) -> models.Model:
+    def _export_inference_artifact(self, infer, model) -> None:
+        """Serialize the traced inference function next to the .h5 model"""
+        import tensorflow as tf
+
+        module = tf.Module()
+        module.model = model  # tracks the weights the function reads
+        module.infer = infer
+        staging = self.saved_model_path + ".tmp"
+        try:
+            shutil.rmtree(staging, ignore_errors=True)
+            tf.saved_model.save(module, staging)
+            # Readers only ever see a complete artifact or none at all
+            shutil.rmtree(self.saved_model_path, ignore_errors=True)
+            os.replace(staging, self.saved_model_path)
+        except Exception as e:
+            # Not fatal: the next start traces again
+            logger.warning(f"Could not cache inference graph: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _float_engine(self) -> NumpyWakeWordModel:
+        """Float NumPy copy of the current weights"""
+        if self.model is not None:
+            return NumpyWakeWordModel.from_keras(self.model)
+        if not os.path.exists(self.weights_path):
+            self.model = self._load_model()
+            return export_weights(self.model, self.weights_path)
+        return NumpyWakeWordModel.load(self.weights_path)
+
+    def _quantize(self, calibration_features: np.ndarray) -> QuantizedWakeWordModel:
+        """Build and save the int8 model; real feature vectors measure its accuracy delta"""
+        quantized = QuantizedWakeWordModel.from_float(self._float_engine(), calibration_features,
+                                                      self.get_detection_threshold())
+        quantized.save(self.quantized_path)
+        return quantized
+
+    def quantize(self, calibration_features: np.ndarray) -> dict:
+        """
+        Re-quantize the int8 model and measure it on held-out real audio features
+        Returns: accuracy delta against the float model at the detection threshold
+        """
+        self.load()
+        quantized = self._quantize(calibration_features)
+        if self.config.backend == "int8":
+            with self.lock:
+                self._score = quantized.predict
+        return quantized.report
+
+    def _load_model(self) -> "models.Model":
         """Loads or creates the wake word detection model"""
-        model_path = os.path.join(self.config.MODEL_DIR, "wake_word_model.h5")
-        
-        if os.path.exists(model_path):
-            return models.load_model(model_path)
+        from tensorflow.keras import layers, models
+
+        if os.path.exists(self.model_path):
+            return models.load_model(self.model_path)
         else:
             # Create simple wake word detection model
             model = models.Sequential([
-                layers.Input(shape=(self.config.AUDIO_FEATURES,)),
+                layers.Input(shape=(self.config.audio_features,)),
                 layers.Dense(256, activation='relu'),
                 layers.Dropout(0.3),
                 layers.Dense(128, activation='relu'),
@@ -37,51 +226,398 @@ class WakeWordDetector:
                         metrics=['accuracy'])
             return model
 
+    def _build_inference_fn(self, model):
+        """Trace the model once with a fixed input signature"""
+        import tensorflow as tf
+
+        @tf.function(input_signature=[
+            tf.TensorSpec(shape=[None, self.config.audio_features], dtype=tf.float32)
+        ])
+        def infer(features):
+            return model(features, training=False)
+
+        return infer
+
     def _calculate_threshold(self) -> float:
         """Calculate detection threshold based on sensitivity"""
+        return self.threshold_for(self.sensitivity)
+
+    @staticmethod
+    def threshold_for(level: int) -> float:
+        """Detection threshold for a sensitivity level (1-10)"""
         base_threshold = 0.5
-        sensitivity_factor = (self.sensitivity - 5) / 10.0
+        sensitivity_factor = (max(1, min(10, level)) - 5) / 10.0
         return base_threshold + (sensitivity_factor * 0.3)
 
+    def _calculate_first_stage_threshold(self) -> float:
+        """Recall-oriented cascade threshold, kept below the main threshold"""
+        return max(0.0, self._threshold - self.config.cascade_margin)
+
+    def _load_first_stage(self) -> Optional[LinearWakeWordScorer]:
+        """Load the cheap cascade scorer when cascade mode is enabled"""
+        if not self.config.cascade:
+            return None
+        if not os.path.exists(self.first_stage_path):
+            logger.warning("Cascade enabled but no first-stage model; "
+                           "every frame goes to the full model until fit_first_stage runs")
+            return None
+        return LinearWakeWordScorer.load(self.first_stage_path)
+
+    def fit_first_stage(self, features: np.ndarray,
+                        labels: Optional[np.ndarray] = None) -> None:
+        """
+        Train the cascade's first stage on real feature vectors.
+        Without labels it is distilled from the full model's scores.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        if labels is None:
+            self.load()
+            with self.lock:
+                labels = self._score(features)
+
+        scorer = LinearWakeWordScorer.fit(features, labels)
+        scorer.save(self.first_stage_path)
+        if self.config.cascade:
+            with self.lock:
+                self._first_stage = scorer
+
     def set_sensitivity(self, level: int) -> None:
         """Set wake word detection sensitivity (1-10)"""
         with self.lock:
             self.sensitivity = max(1, min(10, level))
             self._threshold = self._calculate_threshold()
+            self._first_stage_threshold = self._calculate_first_stage_threshold()
 
     def detect_wake_word(self, audio_data: np.ndarray) -> Tuple[bool, float]:
         """
         Detect wake word in audio data
         Returns: (detection_result, confidence_score)
         """
+        detections, scores = self.detect_batch([audio_data])
+        return bool(detections[0]), float(scores[0])
+
+    def detect_batch(self, frames: Sequence[np.ndarray],
+                     hop_size: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Detect wake word in many audio windows with one forward pass.
+        hop_size: stride of windows read consecutively from a stream, whose
+        overlapping STFT frames are then computed once
+        Returns: (detection_results, confidence_scores)
+        """
+        # Preprocess all windows at once, outside the lock
+        features = preprocess_audio(np.stack(frames),
+                                    sample_rate=self.config.sample_rate,
+                                    n_features=self.config.audio_features,
+                                    hop_size=hop_size)
+        return self.detect_features(features)
+
+    def detect_features(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Detect wake word from precomputed (batch, features) vectors
+        Returns: (detection_results, confidence_scores)
+        """
+        features = np.asarray(features, dtype=np.float32)
+        # No-op once loaded; the first detection of a lazy detector waits here
+        self.load()
         with self.lock:
-            # Preprocess audio data
-            features = preprocess_audio(audio_data, 
-                                     sample_rate=self.config.SAMPLE_RATE,
-                                     n_features=self.config.AUDIO_FEATURES)
-            
-            # Get model prediction
-            prediction = self.model.predict(np.expand_dims(features, axis=0),
-                                         verbose=0)[0][0]
-            
-            # Compare against threshold
-            is_wake_word = prediction >= self._threshold
-            
-            return is_wake_word, float(prediction)
-
-    def update_model(self, training_data: np.ndarray, 
-                    labels: np.ndarray) -> None:
-        """Update wake word model with new training data"""
+            if self._first_stage is not None:
+                return self._detect_cascade(features)
+
+            # Get model predictions
+            scores = self._score(features)
+            threshold = self._threshold
+
+        # Compare against threshold
+        return scores >= threshold, scores
+
+    def _detect_cascade(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the full model only on frames the first stage lets through.
+        Frames the first stage rejects score 0.0, so every returned score is
+        a full-model score or a definite non-detection, never a first-stage one.
+        """
+        passed = self._first_stage.predict(features) >= self._first_stage_threshold
+        scores = np.zeros(len(features), dtype=np.float32)
+        if passed.any():
+            scores[passed] = self._score(features[passed])
+
+        detections = passed & (scores >= self._threshold)
+        self._cascade_stats['frames'] += len(features)
+        self._cascade_stats['first_stage_hits'] += int(passed.sum())
+        self._cascade_stats['second_stage_hits'] += int(detections.sum())
+        return detections, scores
+
+    def get_cascade_stats(self) -> dict:
+        """Per-stage hit counts and the fraction of frames reaching the full model"""
+        with self.lock:
+            stats = dict(self._cascade_stats)
+        stats['pass_through_rate'] = (stats['first_stage_hits'] / stats['frames']
+                                      if stats['frames'] else 0.0)
+        return stats
+
+    def create_feature_stream(self, window_size: int) -> StreamingFeatureExtractor:
+        """Streaming extractor whose context matches preprocess_audio on window_size samples"""
+        return StreamingFeatureExtractor(sample_rate=self.config.sample_rate,
+                                         n_features=self.config.audio_features,
+                                         context_frames=1 + (window_size - FRAME_LENGTH) // HOP_LENGTH)
+
+    def update_model(self, training_data: np.ndarray, labels: np.ndarray,
+                     validation_data: np.ndarray = None,
+                     validation_labels: np.ndarray = None) -> Future:
+        """
+        Retrain a copy of the model on a background thread and swap it in
+        only if it scores at least as well on held-out data as the model
+        being served. Detection keeps running on the current model the whole
+        time; the swap itself is a reference exchange under the lock.
+        Without validation data, validation_split of the training data is held out.
+        Returns: a Future resolving to the update report
+        """
+        def prepare():
+            features = np.asarray(training_data, dtype=np.float32)
+            targets = np.asarray(labels, dtype=np.float32)
+            if validation_data is None:
+                features, targets, held_out, held_out_labels = self._hold_out(features, targets)
+            else:
+                held_out, held_out_labels = validation_data, validation_labels
+
+            def fit(model):
+                model.fit(features, targets,
+                          epochs=self.config.training_epochs,
+                          batch_size=self.config.batch_size,
+                          verbose=0)
+            return fit, held_out, held_out_labels
+
+        return self._start_update(prepare)
+
+    def update_model_from_store(self, store: "FeatureStore",
+                                validation_data: np.ndarray = None,
+                                validation_labels: np.ndarray = None) -> Future:
+        """
+        Like update_model, but trains on a FeatureStore corpus. Batches are
+        read from the memory-mapped files as fit consumes them, so the corpus
+        is never loaded into memory as a whole; only the held-out share is.
+        Returns: a Future resolving to the update report
+        """
+        def prepare():
+            if validation_data is None:
+                training, held_out = store.split(self.config.validation_split)
+                if len(training) == 0 or len(held_out) == 0:
+                    raise ValueError("Not enough stored samples to hold out validation data")
+                held_out, held_out_labels = store.read(held_out)
+            else:
+                training = store.indices()
+                held_out, held_out_labels = validation_data, validation_labels
+
+            def fit(model):
+                model.fit(store.batches(self.config.batch_size, training),
+                          steps_per_epoch=-(-len(training) // self.config.batch_size),
+                          epochs=self.config.training_epochs,
+                          verbose=0)
+            return fit, held_out, held_out_labels
+
+        return self._start_update(prepare)
+
+    def _start_update(self, prepare: Callable) -> Future:
+        """Run an update on its own thread; prepare() returns (fit, validation data, labels)"""
+        future = Future()
+        thread = threading.Thread(target=self._run_update, args=(future, prepare),
+                                  name="model-update")
+        thread.daemon = True
+        thread.start()
+        return future
+
+    def _run_update(self, future: Future, prepare: Callable) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            with self._update_lock:
+                report = self._train_and_swap(*prepare())
+                self._last_update = report
+            future.set_result(report)
+        except Exception as e:
+            logger.error(f"Wake word model update failed: {str(e)}")
+            future.set_exception(e)
+
+    def _train_and_swap(self, fit: Callable, validation_data,
+                        validation_labels) -> Dict:
+        """Train, validate and promote a candidate model; runs on the update thread"""
+        self.load()
+        validation_data = np.asarray(validation_data, dtype=np.float32)
+        validation_labels = np.asarray(validation_labels, dtype=np.float32)
+
+        with self.lock:
+            serving = self.model
+            serving_score = self._score
+            version = self.model_version
+        if serving is None:
+            # Served from exported weights; the Keras model is the training base
+            serving = self._load_training_base()
+            with self.lock:
+                if self.model_version == version:
+                    self.model = serving
+
+        started = time.perf_counter()
+        candidate = self._clone_model(serving)
+        fit(candidate)
+        candidate_score, engine = self._prepare_serving(candidate)
+
+        report = {
+            'version': version + 1,
+            'train_seconds': time.perf_counter() - started,
+            'serving_accuracy': self._accuracy(serving_score, validation_data, validation_labels),
+            'candidate_accuracy': self._accuracy(candidate_score, validation_data, validation_labels)
+        }
+        report['accepted'] = (report['candidate_accuracy'] + self.config.max_accuracy_drop
+                              >= report['serving_accuracy'])
+        if not report['accepted']:
+            logger.warning(f"Wake word model update rejected: accuracy "
+                           f"{report['candidate_accuracy']:.3f} vs "
+                           f"{report['serving_accuracy']:.3f} on held-out data")
+            return report
+
+        # Warm and persist before the swap so the first detection is not slowed
+        self._warm_up(candidate_score)
+        incoming = _ServingModel(version + 1, candidate, candidate_score, engine)
+        self._persist(incoming)
+        with self.lock:
+            self._previous = _ServingModel(self.model_version, self.model, self._score, None)
+            self._activate(incoming)
+        logger.info(f"Wake word model version {incoming.version} is now serving")
+        return report
+
+    def _load_training_base(self) -> "models.Model":
+        """
+        Keras copy of the serving model for the NumPy and int8 backends: the
+        .h5 if deployed, else the architecture with the exported .npz weights.
+        Never falls back to a randomly initialized model.
+        """
+        if os.path.exists(self.model_path):
+            return self._load_model()
+        if not os.path.exists(self.weights_path):
+            raise FileNotFoundError(f"No trained wake word model to update: neither "
+                                    f"{self.model_path} nor {self.weights_path} exists")
+
+        exported = NumpyWakeWordModel.load(self.weights_path)
+        model = self._load_model()
+        try:
+            model.set_weights([array for layer in zip(exported.kernels, exported.biases)
+                               for array in layer])
+        except ValueError as e:
+            raise ValueError(f"Weights in {self.weights_path} do not fit the wake word "
+                             f"model architecture: {e}") from e
+        return model
+
+    def _hold_out(self, features: np.ndarray, targets: np.ndarray):
+        """Split off a random validation_split share of the samples"""
+        n_validation = int(len(features) * self.config.validation_split)
+        if n_validation == 0 or n_validation == len(features):
+            raise ValueError("Not enough samples to hold out validation data; "
+                             "pass validation_data explicitly")
+        order = np.random.default_rng().permutation(len(features))
+        held_out, kept = order[:n_validation], order[n_validation:]
+        return features[kept], targets[kept], features[held_out], targets[held_out]
+
+    def _accuracy(self, score: Callable[[np.ndarray], np.ndarray],
+                  features: np.ndarray, labels: np.ndarray) -> float:
+        """Detection accuracy at the current threshold"""
+        threshold = self.get_detection_threshold()
+        return float(np.mean((score(features) >= threshold) == (labels >= 0.5)))
+
+    def _clone_model(self, model):
+        """Independent copy of a Keras model, compiled like a new one"""
+        from tensorflow.keras import models
+
+        candidate = models.clone_model(model)
+        candidate.set_weights(model.get_weights())
+        candidate.compile(optimizer='adam',
+                          loss='binary_crossentropy',
+                          metrics=['accuracy'])
+        return candidate
+
+    def _prepare_serving(self, model) -> Tuple[Callable[[np.ndarray], np.ndarray], Any]:
+        """Serving function and backend artifact for a trained Keras model"""
+        if self.config.backend == "numpy":
+            engine = NumpyWakeWordModel.from_keras(model)
+            return engine.predict, engine
+        if self.config.backend == "int8":
+            if not self.config.calibration_features:
+                raise ValueError("The int8 backend needs calibration_features to serve an updated model")
+            engine = QuantizedWakeWordModel.from_float(NumpyWakeWordModel.from_keras(model),
+                                                       np.load(self.config.calibration_features),
+                                                       self.get_detection_threshold())
+            return engine.predict, engine
+        infer = self._build_inference_fn(model)
+        return (lambda features: infer(features).numpy()[:, 0]), infer
+
+    def _persist(self, serving: _ServingModel) -> None:
+        """
+        Write a model version's files under versioned names, then rename them
+        over the canonical ones, so a crash never leaves a half-written model
+        """
+        staged = []
+        h5_path = _versioned_path(self.model_path, serving.version)
+        serving.model.save(h5_path)
+        staged.append((h5_path, self.model_path))
+
+        if self.config.backend in ("numpy", "int8"):
+            weights_path = _versioned_path(self.weights_path, serving.version)
+            NumpyWakeWordModel.from_keras(serving.model).save(weights_path)
+            staged.append((weights_path, self.weights_path))
+        if self.config.backend == "int8":
+            quantized_path = _versioned_path(self.quantized_path, serving.version)
+            serving.engine.save(quantized_path)
+            staged.append((quantized_path, self.quantized_path))
+
+        for source, target in staged:
+            os.replace(source, target)
+        if self.config.backend == "tensorflow" and self.config.cache_inference_artifact:
+            self._export_inference_artifact(serving.engine, serving.model)
+
+    def _activate(self, serving: _ServingModel) -> None:
+        """Make a model version the one being served; caller holds self.lock"""
+        self.model = serving.model
+        self._score = serving.score
+        self.model_version = serving.version
+
+    def rollback(self) -> bool:
+        """
+        Serve the previous model version again, e.g. after a bad update was
+        noticed in production; calling it twice rolls forward again
+        Returns: False if there is no previous version
+        """
+        with self._update_lock:
+            with self.lock:
+                previous = self._previous
+            if previous is None or previous.model is None:
+                return False
+
+            if self.config.backend == "tensorflow":
+                # The traced function of the restored model is rebuilt for the cache
+                previous.engine = self._build_inference_fn(previous.model)
+            elif self.config.backend == "int8":
+                previous.engine = QuantizedWakeWordModel.from_float(
+                    NumpyWakeWordModel.from_keras(previous.model),
+                    np.load(self.config.calibration_features),
+                    self.get_detection_threshold())
+            # Persisted before the version changes, so detector worker
+            # processes reloading on that change read the restored files
+            self._persist(previous)
+            with self.lock:
+                self._previous = _ServingModel(self.model_version, self.model, self._score, None)
+                self._activate(previous)
+        logger.info(f"Rolled back to wake word model version {previous.version}")
+        return True
+
+    def get_update_status(self) -> Dict:
+        """Serving version, whether training is running and the last update report"""
         with self.lock:
-            self.model.fit(training_data, labels,
-                         epochs=self.config.TRAINING_EPOCHS,
-                         batch_size=self.config.BATCH_SIZE,
-                         verbose=0)
-            
-            # Save updated model
-            model_path = os.path.join(self.config.MODEL_DIR, 
-                                    "wake_word_model.h5")
-            self.model.save(model_path)
+            status = {
+                'version': self.model_version,
+                'previous_version': self._previous.version if self._previous else None
+            }
+        status['updating'] = self._update_lock.locked()
+        status['last_update'] = self._last_update
+        return status
 
     def get_current_sensitivity(self) -> int:
         """Get current sensitivity level"""
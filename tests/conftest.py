@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules import each other from the repository root (from utils.audio_utils import ...)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Session factory on a scratch SQLite database with every model table"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from models.base import Base
+    import models.command_history  # noqa: F401
+    import models.command_rollup  # noqa: F401
+    import models.user_preferences  # noqa: F401
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'history.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
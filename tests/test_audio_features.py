@@ -0,0 +1,55 @@
+import numpy as np
+
+from utils.audio_utils import (FRAME_LENGTH, HOP_LENGTH, StreamingFeatureExtractor,
+                               preprocess_audio)
+
+WINDOW = 16000
+
+
+def _feature_stream():
+    # Same context as WakeWordDetector.create_feature_stream(WINDOW)
+    return StreamingFeatureExtractor(context_frames=1 + (WINDOW - FRAME_LENGTH) // HOP_LENGTH)
+
+
+def test_streaming_features_match_preprocess_audio():
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(WINDOW) * 0.1).astype(np.float32)
+    stream = _feature_stream()
+    for start in range(0, WINDOW, 1000):
+        stream.process(audio[start:start + 1000])
+
+    np.testing.assert_allclose(stream.context_features(), preprocess_audio(audio),
+                               rtol=1e-4, atol=1e-3)
+
+
+def test_streaming_features_follow_a_sliding_window():
+    rng = np.random.default_rng(1)
+    hop = 4000
+    audio = (rng.standard_normal(WINDOW + 2 * hop) * 0.1).astype(np.float32)
+    stream = _feature_stream()
+    stream.process(audio[:WINDOW])
+    for end in (WINDOW + hop, WINDOW + 2 * hop):
+        stream.process(audio[end - hop:end])
+        np.testing.assert_allclose(stream.context_features(),
+                                   preprocess_audio(audio[end - WINDOW:end]),
+                                   rtol=1e-4, atol=1e-3)
+
+
+def test_preprocess_audio_batches_like_single_windows():
+    rng = np.random.default_rng(2)
+    windows = (rng.standard_normal((3, WINDOW)) * 0.1).astype(np.float32)
+    batch = preprocess_audio(windows)
+    for window, features in zip(windows, batch):
+        np.testing.assert_allclose(features, preprocess_audio(window), rtol=1e-5, atol=1e-5)
+
+
+def test_consecutive_windows_share_their_frames():
+    rng = np.random.default_rng(3)
+    hop = 4000
+    audio = (rng.standard_normal(WINDOW + 5 * hop) * 0.1).astype(np.float32)
+    windows = np.stack([audio[start:start + WINDOW] for start in range(0, 6 * hop, hop)])
+    # A gap (as the VAD gate leaves) splits the batch into two runs
+    windows = np.delete(windows, 3, axis=0)
+
+    shared = preprocess_audio(windows, hop_size=hop)
+    np.testing.assert_allclose(shared, preprocess_audio(windows), rtol=1e-4, atol=1e-4)
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from config.config import PipelineConfig
+from modules.command_pipeline import CommandPipeline
+
+
+class _Utterance:
+    pass
+
+
+def test_submit_utterance_rejects_at_once_when_saturated():
+    # Not started, so the one-slot recognition queue stays full
+    pipeline = CommandPipeline(None, PipelineConfig(queue_size=1, submit_timeout=0.5))
+    pipeline.submit_utterance(_Utterance())
+
+    started = time.perf_counter()
+    future = pipeline.submit_utterance(_Utterance())
+    assert time.perf_counter() - started < 0.1
+    assert future.result(timeout=0) is False
+    assert pipeline.get_stats()['rejected'] == 1
+
+
+class _Notifier:
+    def show_processing(self):
+        pass
+
+    def hide_processing(self):
+        pass
+
+
+class _History:
+    def __init__(self):
+        self.rows = []
+
+    def start(self):
+        pass
+
+    def log(self, command, **fields):
+        self.rows.append((command, fields))
+
+    def close(self):
+        pass
+
+
+def _processor(transcript):
+    from modules.command_processor import CommandProcessor
+    from modules.recognizer_backends import OfflineRecognizerBackend
+
+    history = _History()
+    processor = CommandProcessor(_Notifier(), OfflineRecognizerBackend(transcript, words_per_second=100),
+                                 history_writer=history, preferences=object())
+    return processor, history
+
+
+def test_partials_run_commands_on_a_pipeline_worker():
+    processor, _ = _processor("lights on please now")
+    threads = []
+    original = processor._handle_lights_command
+    processor.intent_matcher.intents['lights'].handler = \
+        lambda slots: threads.append(threading.current_thread().name) or original(slots)
+
+    pipeline = CommandPipeline(processor)
+    pipeline.start()
+    try:
+        utterance = pipeline.start_utterance()
+        for _ in range(10):
+            utterance.push(b'\0' * 320)  # one word of audio per push
+        # Partials still queued at submission are dropped; let the worker get to them
+        deadline = time.monotonic() + 5
+        while not utterance.executed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        future = pipeline.submit_utterance(utterance)
+        assert future.result(timeout=5) is True
+    finally:
+        pipeline.stop()
+    assert threads == ['command-partials-0']
+
+
+def test_history_rows_carry_outcome_and_latency():
+    processor, history = _processor(None)
+    pipeline = CommandPipeline(processor)
+    pipeline.start()
+    try:
+        for transcript in ("lights on", "lights please"):
+            processor.recognizer_backend.transcript = transcript
+            pipeline.submit(b'\0' * 64).result(timeout=5)
+    finally:
+        pipeline.stop()
+
+    assert [(command, fields['success']) for command, fields in history.rows] == \
+        [("lights on", True), ("lights please", False)]
+    assert all(fields['execution_time_ms'] is not None for _, fields in history.rows)
@@ -0,0 +1,82 @@
+import os
+import threading
+
+import numpy as np
+
+from config.config import WakeWordConfig
+from modules.detector_pool import DetectorPool
+from modules.inference_engine import NumpyWakeWordModel
+from modules.wake_word_detector import WakeWordDetector
+
+WINDOW = 16000
+HOP = 4000
+
+
+def _config(tmp_path):
+    rng = np.random.default_rng(0)
+    dims = [40, 16, 1]
+    NumpyWakeWordModel([rng.normal(0, 0.3, (a, b)) for a, b in zip(dims, dims[1:])],
+                       [rng.normal(0, 0.1, b) for b in dims[1:]],
+                       ['relu', 'sigmoid']).save(os.path.join(tmp_path, 'wake_word_model.npz'))
+    return WakeWordConfig(backend='numpy', model_dir=str(tmp_path))
+
+
+def _windows(n):
+    audio = (np.random.default_rng(1).standard_normal(WINDOW + (n - 1) * HOP) * 0.1).astype(np.float32)
+    return [audio[start:start + WINDOW] for start in range(0, n * HOP, HOP)]
+
+
+class _Results:
+    def __init__(self):
+        self.scores = []
+        self.ready = threading.Event()
+
+    def __call__(self, detections, scores):
+        self.scores.extend(scores)
+        self.ready.set()
+
+    def wait(self):
+        assert self.ready.wait(60)
+        self.ready.clear()
+        return self.scores
+
+
+def test_pool_scores_match_the_in_process_detector(tmp_path):
+    config = _config(tmp_path)
+    windows = _windows(6)
+    expected = WakeWordDetector(config).detect_batch(windows)[1]
+
+    results = _Results()
+    pool = DetectorPool(config, WINDOW, on_result=results, n_workers=1, n_slots=8, hop_size=HOP)
+    try:
+        assert pool.submit(windows) == 6
+        np.testing.assert_allclose(results.wait(), expected, rtol=1e-5, atol=1e-6)
+    finally:
+        pool.close()
+
+
+def test_dead_worker_is_reclaimed_and_restarted(tmp_path):
+    config = _config(tmp_path)
+    windows = _windows(4)
+    results = _Results()
+    pool = DetectorPool(config, WINDOW, on_result=results, n_workers=1, n_slots=4, hop_size=HOP)
+    try:
+        # The worker dies holding a batch; its slots would otherwise never come back
+        pool._current[0] = 0
+        pool._pending[0] = (0, 1, 2, 3)
+        pool.batches_in_flight = 1
+        for _ in range(4):
+            pool._free_slots.get_nowait()
+        pool.workers[0].kill()
+        pool.workers[0].join()
+
+        stats = pool.get_stats()
+        assert stats['restarts'] == 1
+        assert stats['free_slots'] == 4
+        assert stats['batches_in_flight'] == 0
+        assert stats['dropped_windows'] == 4
+
+        assert pool.submit(windows) == 4
+        assert len(results.wait()) == 4
+    finally:
+        pool.close()
@@ -0,0 +1,68 @@
+import numpy as np
+
+from config.config import FeatureStoreConfig
+from modules.feature_store import FeatureStore
+
+
+def _store(tmp_path, capacity=8, positive_fraction=0.25):
+    config = FeatureStoreConfig(enabled=True, capacity=capacity,
+                                positive_fraction=positive_fraction, flush_every=4)
+    return FeatureStore(3, config, store_dir=str(tmp_path))
+
+
+def _vectors(start, n):
+    return np.arange(start, start + n, dtype=np.float32)[:, None].repeat(3, axis=1)
+
+
+def test_reservoir_stays_bounded_and_keeps_offered_records(tmp_path):
+    store = _store(tmp_path)
+    store.add(_vectors(0, 100), 0.0, 'rejected')
+
+    stats = store.get_stats()
+    assert stats['negative'] == {'filled': 6, 'seen': 100}
+    assert len(store) == 6
+    features, labels = store.read(store.indices())
+    assert len(set(features[:, 0].tolist())) == 6
+    assert set(features[:, 0].tolist()) <= set(range(100))
+    assert (labels == 0.0).all()
+
+
+def test_reservoir_evicts_uniformly(tmp_path):
+    # Each of 20 offered records should survive in a 6-slot reservoir with p = 6 / 20
+    kept = np.zeros(20)
+    for trial in range(300):
+        store = _store(tmp_path / str(trial))
+        store._rng = np.random.default_rng(trial)
+        store.add(_vectors(0, 20), 0.0, 'rejected')
+        features, _ = store.read(store.indices())
+        kept[features[:, 0].astype(int)] += 1
+        store.close()
+    assert np.allclose(kept / 300, 6 / 20, atol=0.1)
+
+
+def test_negatives_never_evict_positives(tmp_path):
+    store = _store(tmp_path)
+    store.add(_vectors(1000, 2), 1.0, 'confirmed')
+    store.add(_vectors(0, 500), 0.0, 'near_threshold')
+
+    features, labels = store.read(store.indices())
+    assert sorted(features[labels == 1.0, 0].tolist()) == [1000, 1001]
+    assert store.get_stats()['kinds'] == {'near_threshold': 6, 'confirmed': 2, 'rejected': 0}
+
+
+def test_counts_survive_reopening(tmp_path):
+    store = _store(tmp_path)
+    store.add(_vectors(0, 10), 0.0, 'rejected')
+    store.close()
+
+    reopened = _store(tmp_path)
+    assert reopened.get_stats()['negative'] == {'filled': 6, 'seen': 10}
+    assert len(reopened) == 6
+
+
+def test_only_scores_just_below_the_threshold_are_kept(tmp_path):
+    store = _store(tmp_path)
+    scores = np.array([0.2, 0.5, 0.55, 0.7])  # default margin 0.15
+    assert store.add_near_threshold(_vectors(0, 4), scores, threshold=0.6) == 2
+    features, _ = store.read(store.indices())
+    assert sorted(features[:, 0].tolist()) == [1, 2]
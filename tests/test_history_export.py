@@ -0,0 +1,55 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+from models.command_history import CommandHistory
+from utils.history_export import iter_history, write_history
+
+START = datetime(2026, 1, 1)
+
+
+def _insert(session_factory, n=10):
+    """n rows, two per timestamp, so pages must break ties on id"""
+    session = session_factory()
+    try:
+        session.execute(CommandHistory.__table__.insert(), [
+            {'command': f"command {i}", 'timestamp': START + timedelta(minutes=i // 2), 'success': 1}
+            for i in range(n)
+        ])
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_pages_walk_every_row_once_in_order(session_factory):
+    _insert(session_factory)
+    ascending = [row.command for row in iter_history(session_factory, page_size=3)]
+    assert ascending == [f"command {i}" for i in range(10)]
+
+    descending = [row.command for row in iter_history(session_factory, page_size=3, descending=True)]
+    assert descending == ascending[::-1]
+
+    # Page size dividing the row count ends on an empty page, not a repeat
+    assert len(list(iter_history(session_factory, page_size=5))) == 10
+
+
+def test_time_range_and_resume_after_a_row(session_factory):
+    _insert(session_factory)
+    in_range = list(iter_history(session_factory, start=START + timedelta(minutes=1),
+                                 end=START + timedelta(minutes=4), page_size=2))
+    assert [row.command for row in in_range] == [f"command {i}" for i in range(2, 8)]
+
+    # A tie on timestamp resumes at the row after the cursor, not the next timestamp
+    resumed = iter_history(session_factory, page_size=2, after=(in_range[0].timestamp, in_range[0].id))
+    assert [row.command for row in resumed] == [f"command {i}" for i in range(3, 10)]
+
+
+def test_export_writes_header_and_rows(session_factory):
+    _insert(session_factory, n=4)
+    out = io.StringIO()
+    assert write_history(iter_history(session_factory, page_size=3), out, 'csv') == 4
+
+    lines = list(csv.reader(io.StringIO(out.getvalue())))
+    assert lines[0][:3] == ['id', 'command', 'timestamp']
+    assert [line[1] for line in lines[1:]] == [f"command {i}" for i in range(4)]
+    assert lines[1][2] == START.isoformat()
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from config.config import RetentionConfig
+from models.command_history import CommandHistory
+from models.command_rollup import CommandRollup
+from modules.history_retention import HistoryRetention, iter_archive
+from modules.history_writer import HistoryWriter
+
+
+def _row(command, timestamp, success=True, execution_time_ms=20):
+    return {'command': command, 'timestamp': timestamp, 'wake_word': None,
+            'success': int(success), 'sensitivity_level': None,
+            'execution_time_ms': execution_time_ms, 'error_message': None}
+
+
+def _write_history(session_factory, old=5, recent=2):
+    """old rows 40 days back (every other one failed) and recent rows from now"""
+    now = datetime.now()
+    rows = [_row(f"old {i}", now - timedelta(days=40, minutes=i), success=i % 2 == 0)
+            for i in range(old)]
+    rows += [_row(f"new {i}", now - timedelta(minutes=i)) for i in range(recent)]
+    HistoryWriter(session_factory)._write(rows)
+    return rows
+
+
+def _retention(session_factory, tmp_path, **overrides):
+    config = RetentionConfig(retention_days=30, batch_size=2, pause_seconds=0.0,
+                             max_rows_per_second=0, archive_dir=str(tmp_path / 'archive'))
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return HistoryRetention(session_factory, config)
+
+
+def test_purged_rows_are_taken_out_of_the_rollups(session_factory, tmp_path):
+    _write_history(session_factory)
+    assert _retention(session_factory, tmp_path, archive=False).run_once() == 5
+
+    session = session_factory()
+    try:
+        stats = CommandRollup.get_stats(session)
+        assert stats['total_commands'] == session.query(CommandHistory).count() == 2
+        assert stats['failed_commands'] == 0
+        assert stats['mean_execution_time_ms'] == 20
+        # Emptied hour and day buckets are gone; the all-time row stays
+        cutoff = datetime.now() - timedelta(days=30)
+        assert session.query(CommandRollup).filter(
+            CommandRollup.period != 'all', CommandRollup.bucket_start < cutoff).count() == 0
+        assert CommandHistory.get_stats(session)['total_commands'] == 2
+    finally:
+        session.close()
+
+
+def test_expired_rows_are_archived_batch_by_batch_and_read_back(session_factory, tmp_path):
+    rows = _write_history(session_factory)
+    retention = _retention(session_factory, tmp_path)
+    assert retention.run_once() == 5
+    # batch_size 2: two full batches and a partial one, each appended as its own gzip member
+    assert retention.get_stats() == {'runs': 1, 'deleted': 5, 'archived': 5, 'batches': 3, 'errors': 0}
+
+    archived = list(iter_archive(tmp_path / 'archive'))
+    assert sorted(row['command'] for row in archived) == [f"old {i}" for i in range(5)]
+    assert [row['success'] for row in sorted(archived, key=lambda row: row['command'])] == \
+        [1, 0, 1, 0, 1]
+
+    # Time range filter: only the two newest expired rows
+    newest = sorted(row['timestamp'] for row in rows[:5])[-2]
+    assert sorted(row['command'] for row in iter_archive(tmp_path / 'archive', start=newest)) == \
+        ["old 0", "old 1"]
+
+    session = session_factory()
+    try:
+        assert sorted(row.command for row in session.query(CommandHistory)) == ["new 0", "new 1"]
+    finally:
+        session.close()
+
+    # Nothing left to expire
+    assert retention.run_once() == 0
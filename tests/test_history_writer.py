@@ -0,0 +1,46 @@
+from config.config import HistoryConfig
+from models.command_history import CommandHistory
+from models.command_rollup import CommandRollup
+from modules.history_writer import HistoryWriter
+
+
+def test_rows_are_written_in_batches_with_their_rollups(session_factory):
+    writer = HistoryWriter(session_factory, HistoryConfig(batch_size=4, flush_interval=60.0))
+    writer.start()
+    try:
+        for i in range(10):
+            writer.log(f"command {i}", success=i % 3 != 0, execution_time_ms=10 * (i + 1))
+        assert writer.flush()
+    finally:
+        writer.close()
+
+    # Two full batches, then the flush writes the remaining two rows
+    stats = writer.get_stats()
+    assert (stats['written'], stats['batches'], stats['dropped'], stats['failed']) == (10, 3, 0, 0)
+
+    session = session_factory()
+    try:
+        rows = session.query(CommandHistory).order_by(CommandHistory.id).all()
+        assert [row.command for row in rows] == [f"command {i}" for i in range(10)]
+        assert [row.success for row in rows].count(0) == 4
+
+        summary = CommandRollup.get_stats(session)
+        assert (summary['total_commands'], summary['failed_commands']) == (10, 4)
+        assert summary['mean_execution_time_ms'] == 55
+        assert sum(bucket['total_commands'] for bucket in CommandRollup.series(session, 'hour')) == 10
+    finally:
+        session.close()
+
+
+def test_full_buffer_drops_rows_instead_of_blocking(session_factory):
+    # Not started, so nothing drains the two-row buffer until close
+    writer = HistoryWriter(session_factory, HistoryConfig(max_pending=2))
+    assert [writer.log(f"command {i}") for i in range(3)] == [True, True, False]
+    writer.close()
+
+    assert writer.get_stats()['dropped'] == 1
+    session = session_factory()
+    try:
+        assert session.query(CommandHistory).count() == 2
+    finally:
+        session.close()
@@ -0,0 +1,36 @@
+import numpy as np
+
+from modules.inference_engine import NumpyWakeWordModel, QuantizedWakeWordModel
+
+
+def _float_model(seed=0):
+    rng = np.random.default_rng(seed)
+    dims = [40, 64, 32, 1]
+    return NumpyWakeWordModel([rng.normal(0, 0.2, (a, b)) for a, b in zip(dims, dims[1:])],
+                              [rng.normal(0, 0.05, b) for b in dims[1:]],
+                              ['relu', 'relu', 'sigmoid'])
+
+
+def test_int8_scores_track_the_float_model():
+    model = _float_model()
+    held_out = np.random.default_rng(1).normal(0, 1, (500, 40)).astype(np.float32)
+    quantized = QuantizedWakeWordModel.from_float(model, held_out, threshold=0.56)
+
+    assert quantized.report['threshold'] == 0.56
+    assert quantized.report['samples'] == 500
+    assert quantized.report['max_abs_error'] < 0.05
+    assert quantized.report['decision_agreement'] > 0.95
+    np.testing.assert_allclose(quantized.predict(held_out[0]), model.predict(held_out[:1]), atol=0.05)
+
+
+def test_int8_round_trip_keeps_weights_and_report(tmp_path):
+    model = _float_model()
+    features = np.random.default_rng(2).normal(0, 1, (64, 40)).astype(np.float32)
+    quantized = QuantizedWakeWordModel.from_float(model, features)
+    path = tmp_path / 'model.int8.npz'
+    quantized.save(path)
+
+    loaded = QuantizedWakeWordModel.load(path)
+    assert all(k.dtype == np.int8 for k in loaded.kernels)
+    assert loaded.report == quantized.report
+    np.testing.assert_array_equal(loaded.predict(features), quantized.predict(features))
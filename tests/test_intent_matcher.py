@@ -0,0 +1,85 @@
+from modules.command_processor import CommandProcessor, StreamingCommand
+from modules.intent_matcher import Intent, IntentMatcher
+from modules.recognizer_backends import Hypothesis, OfflineRecognizerBackend
+
+
+def _intent(name, keywords, slots=None, priority=0):
+    return Intent(name, lambda slots: True, keywords=keywords, slots=slots or {}, priority=priority)
+
+
+def test_longest_phrase_wins_and_consumes_its_words():
+    matcher = IntentMatcher([
+        _intent('lights', ['light', 'light bulb'],
+                slots={'state': {'on': 'on', 'off': 'off', 'switch off': 'off'}})
+    ])
+    # "switch off" is one phrase, so its "off" is not matched again on its own
+    match = matcher.match("switch off the light bulb please")
+    assert match.name == 'lights'
+    assert match.slots == {'state': 'off'}
+    assert match.position == 3
+
+
+def test_first_slot_phrase_fills_the_slot():
+    matcher = IntentMatcher([_intent('lights', ['lights'], slots={'state': {'on': 'on', 'off': 'off'}})])
+    assert matcher.match("lights on no off").slots == {'state': 'on'}
+
+
+def test_phrases_match_whole_words_only():
+    matcher = IntentMatcher([_intent('music', ['song'])])
+    assert matcher.match("songbird") is None
+    assert matcher.match("Play that SONG!").name == 'music'
+
+
+def test_priority_beats_position_and_ties_go_to_the_earliest_keyword():
+    matcher = IntentMatcher([
+        _intent('volume', ['volume'], priority=2),
+        _intent('lights', ['lights'], priority=1),
+        _intent('music', ['music'], priority=1),
+    ])
+    assert matcher.match("lights and volume").name == 'volume'
+    assert matcher.match("music then lights").name == 'music'
+    assert matcher.match("lights then music").name == 'lights'
+
+
+class _Notifier:
+    def show_processing(self):
+        pass
+
+    def hide_processing(self):
+        pass
+
+
+class _History:
+    def start(self):
+        pass
+
+    def log(self, text):
+        pass
+
+    def close(self):
+        pass
+
+
+class _Preferences:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, user_id):
+        return dict(self.values)
+
+    def update(self, user_id, **changes):
+        self.values.update(changes)
+
+
+def test_sensitivity_without_a_direction_keeps_a_streaming_command_open():
+    preferences = _Preferences()
+    processor = CommandProcessor(_Notifier(), OfflineRecognizerBackend(),
+                                 history_writer=_History(), preferences=preferences)
+    assert processor._handle_sensitivity_command({}) is False
+
+    command = StreamingCommand(processor, stability=2)
+    # A stable "sensitivity" partial must not close the command before its direction
+    for text in ("sensitivity", "sensitivity", "sensitivity up", "sensitivity up"):
+        command._on_hypothesis(Hypothesis(text))
+    assert command.executed
+    assert preferences.values['wake_word_sensitivity'] > 0.5
@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+
+from config.config import WakeWordConfig
+from modules.inference_engine import NumpyWakeWordModel
+from modules.wake_word_detector import WakeWordDetector
+
+N_FEATURES = 40
+
+
+class _Dense:
+    def __init__(self, kernel, bias, activation):
+        self.weights = [np.array(kernel, dtype=np.float32), np.array(bias, dtype=np.float32)]
+        self.activation = activation
+
+    def get_weights(self):
+        return [w.copy() for w in self.weights]
+
+    def get_config(self):
+        return {'activation': self.activation}
+
+
+class _Model:
+    """Keras stand-in: one sigmoid Dense layer whose fit learns how feature 0 predicts the label"""
+
+    def __init__(self, kernel=None, bias=None):
+        self.layers = [_Dense(np.zeros((N_FEATURES, 1)) if kernel is None else kernel,
+                              np.zeros(1) if bias is None else bias, 'sigmoid')]
+
+    def get_weights(self):
+        return self.layers[0].get_weights()
+
+    def set_weights(self, weights):
+        kernel, bias = weights
+        self.layers[0] = _Dense(kernel, bias, 'sigmoid')
+
+    def fit(self, features, targets, **kwargs):
+        kernel = np.zeros((N_FEATURES, 1))
+        kernel[0] = 10.0 if np.corrcoef(features[:, 0], targets)[0, 1] > 0 else -10.0
+        self.set_weights([kernel, np.zeros(1)])
+
+    def save(self, path):
+        np.save(path, self.get_weights()[0])
+        os.replace(path + '.npy', path)
+
+
+class _Detector(WakeWordDetector):
+    def _load_model(self):
+        return _Model()
+
+    def _clone_model(self, model):
+        return _Model(*model.get_weights())
+
+
+def _data(n, seed):
+    features = np.random.default_rng(seed).normal(0, 1, (n, N_FEATURES)).astype(np.float32)
+    return features, (features[:, 0] > 0).astype(np.float32)
+
+
+def test_update_swaps_in_the_better_model_and_rollback_restores_it(tmp_path):
+    # Serving model: weights unrelated to the label
+    kernel = np.random.default_rng(0).normal(0, 1, (N_FEATURES, 1))
+    kernel[0] = -2.0
+    weights_path = os.path.join(tmp_path, 'wake_word_model.npz')
+    NumpyWakeWordModel([kernel], [np.zeros(1)], ['sigmoid']).save(weights_path)
+
+    detector = _Detector(WakeWordConfig(backend='numpy', model_dir=str(tmp_path)))
+    features, labels = _data(200, seed=1)
+    held_out, held_out_labels = _data(100, seed=2)
+    before = detector.detect_features(held_out)[1]
+
+    report = detector.update_model(features, labels, held_out, held_out_labels).result(timeout=30)
+    assert report['accepted'] and report['version'] == 2
+    assert report['candidate_accuracy'] > report['serving_accuracy']
+    status = detector.get_update_status()
+    assert (status['version'], status['previous_version']) == (2, 1)
+
+    updated = detector.detect_features(held_out)[1]
+    assert np.mean((updated >= 0.5) == (held_out_labels == 1)) > 0.95
+    # Persisted by rename over the canonical file, with no staged copies left behind
+    np.testing.assert_allclose(NumpyWakeWordModel.load(weights_path).predict(held_out), updated, rtol=1e-5)
+    assert not [name for name in os.listdir(tmp_path) if '.v' in name]
+
+    assert detector.rollback()
+    assert detector.model_version == 1
+    np.testing.assert_allclose(detector.detect_features(held_out)[1], before, rtol=1e-5)
+    np.testing.assert_allclose(NumpyWakeWordModel.load(weights_path).predict(held_out), before, rtol=1e-5)
+
+    # A second rollback rolls forward to the update again
+    assert detector.rollback()
+    assert detector.model_version == 2
+    np.testing.assert_allclose(detector.detect_features(held_out)[1], updated, rtol=1e-5)
+
+
+def test_worse_candidate_is_rejected_and_never_served(tmp_path):
+    kernel = np.zeros((N_FEATURES, 1))
+    kernel[0] = 10.0
+    weights_path = os.path.join(tmp_path, 'wake_word_model.npz')
+    NumpyWakeWordModel([kernel], [np.zeros(1)], ['sigmoid']).save(weights_path)
+    detector = _Detector(WakeWordConfig(backend='numpy', model_dir=str(tmp_path)))
+
+    features, labels = _data(200, seed=3)
+    held_out, held_out_labels = _data(100, seed=4)
+    before = detector.detect_features(held_out)[1]
+    # Mislabelled training data yields a candidate that is wrong on held-out data
+    report = detector.update_model(features, 1 - labels, held_out, held_out_labels).result(timeout=30)
+
+    assert not report['accepted']
+    assert report['candidate_accuracy'] < report['serving_accuracy']
+    assert detector.model_version == 1
+    assert not detector.rollback()
+    np.testing.assert_allclose(detector.detect_features(held_out)[1], before)
+    np.testing.assert_allclose(NumpyWakeWordModel.load(weights_path).predict(held_out), before, rtol=1e-5)
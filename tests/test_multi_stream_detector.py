@@ -0,0 +1,64 @@
+from concurrent.futures import Future
+
+import numpy as np
+
+from config.config import Config
+from modules.multi_stream_detector import MultiStreamDetector
+from utils.audio_utils import StreamingFeatureExtractor
+
+
+class _Detector:
+    """Shared model stand-in; only what add_stream needs"""
+
+    def threshold_for(self, level):
+        return 0.5
+
+    def get_current_sensitivity(self):
+        return 5
+
+    def create_feature_stream(self, window_size):
+        return StreamingFeatureExtractor(context_frames=4)
+
+
+class _Utterance:
+    def __init__(self):
+        self.audio = b''
+
+    def push(self, chunk):
+        self.audio += chunk
+
+
+class _Pipeline:
+    def __init__(self):
+        self.submitted = []
+
+    def start_utterance(self):
+        return _Utterance()
+
+    def submit_utterance(self, utterance, stream_id=None):
+        self.submitted.append((stream_id, len(utterance.audio)))
+        future = Future()
+        future.set_result(True)
+        return future
+
+
+def test_detection_streams_its_own_input_to_the_pipeline():
+    config = Config()
+    config.vad.enabled = False
+    config.recognizer.max_utterance_seconds = 0.25
+    pipeline = _Pipeline()
+    detector = MultiStreamDetector(config, _Detector(), command_pipeline=pipeline)
+    heard = []
+    for stream_id in ("kitchen", "hall"):
+        detector.add_stream(stream_id, lambda stream_id, score: heard.append(stream_id))
+
+    detector._on_detection("hall", 0.9)
+    samples = np.zeros(1000, dtype=np.float32)
+    for _ in range(5):
+        detector.feed("kitchen", samples)
+        detector.feed("hall", samples)
+
+    assert heard == ["hall"]
+    # 0.25 s at 16 kHz of 16-bit PCM, from the hall microphone only
+    assert pipeline.submitted == [("hall", 4000 * 2)]
+    assert not detector.streams["hall"].capture.is_open
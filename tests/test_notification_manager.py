@@ -0,0 +1,51 @@
+import time
+
+from config.config import NotificationConfig
+from modules.notification_manager import NotificationManager
+
+
+class _Channel:
+    """Mixer channel stand-in whose sound plays for a fixed time"""
+
+    def __init__(self, length):
+        self.length = length
+        self.ends = None
+        self.stopped_early = False
+
+    def play(self, sound):
+        self.ends = time.monotonic() + self.length
+
+    def get_busy(self):
+        return self.ends is not None and time.monotonic() < self.ends
+
+    def stop(self):
+        if self.get_busy():
+            self.stopped_early = True
+        self.ends = None
+
+
+def _manager(completion_length, drain):
+    manager = NotificationManager(NotificationConfig(shutdown_drain_seconds=drain))
+    manager.wait_ready(5.0)
+    manager._channels = {name: _Channel(completion_length if name == 'completion' else 10.0)
+                         for name in ('activation', 'processing', 'completion')}
+    manager._sounds = {name: object() for name in manager._channels}
+    return manager
+
+
+def test_shutdown_lets_the_completion_sound_finish():
+    manager = _manager(completion_length=0.2, drain=2.0)
+    manager.show_processing()
+    manager.notify_shutdown()
+    channels = manager._channels
+    assert not manager._scheduler.is_alive()
+    assert not channels['completion'].stopped_early
+    assert channels['processing'].stopped_early
+
+
+def test_shutdown_wait_for_the_completion_sound_is_bounded():
+    manager = _manager(completion_length=30.0, drain=0.1)
+    started = time.monotonic()
+    manager.notify_shutdown()
+    assert time.monotonic() - started < 2.0
+    assert manager._channels['completion'].stopped_early
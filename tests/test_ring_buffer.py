@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from utils.ring_buffer import AudioRingBuffer
+
+
+def _ramp(start, n):
+    return np.arange(start, start + n, dtype=np.float32)
+
+
+def test_windows_are_contiguous_across_the_wrap():
+    buffer = AudioRingBuffer(capacity=10, window_size=4, hop_size=2)
+    buffer.write(_ramp(0, 8))
+    assert [w.tolist() for w in buffer.windows()] == [[0, 1, 2, 3], [2, 3, 4, 5], [4, 5, 6, 7]]
+
+    buffer.write(_ramp(8, 4))  # wraps past the end of the storage
+    assert [w.tolist() for w in buffer.windows()] == [[6, 7, 8, 9], [8, 9, 10, 11]]
+    assert buffer.overruns == 0
+
+
+def test_overrun_skips_overwritten_windows_on_the_hop_grid():
+    buffer = AudioRingBuffer(capacity=10, window_size=4, hop_size=2)
+    buffer.write(_ramp(0, 4))
+    buffer.write(_ramp(4, 16))  # reader fell behind by more than the capacity
+
+    windows = [w.tolist() for w in buffer.windows()]
+    assert buffer.overruns > 0
+    # Everything handed out is intact, newest data, still aligned to the hop
+    for window in windows:
+        assert window == list(range(int(window[0]), int(window[0]) + 4))
+        assert window[0] >= 20 - 10
+        assert int(window[0]) % 2 == 0
+    assert windows[-1] == [16, 17, 18, 19]
+
+
+def test_write_larger_than_capacity_keeps_newest_samples():
+    buffer = AudioRingBuffer(capacity=10, window_size=4, hop_size=2)
+    buffer.write(_ramp(0, 25))
+    windows = [w.tolist() for w in buffer.windows()]
+    assert windows[-1] == [20, 21, 22, 23]  # last window ending on the hop grid
+    assert all(w[0] >= 15 for w in windows)
+
+
+def test_windows_are_read_only_views():
+    buffer = AudioRingBuffer(capacity=10, window_size=4, hop_size=2)
+    buffer.write(_ramp(0, 4))
+    window = next(buffer.windows())
+    with pytest.raises(ValueError):
+        window[0] = 1.0
+
+
+def test_reset_clears_overruns_and_pending_windows():
+    buffer = AudioRingBuffer(capacity=10, window_size=4, hop_size=2)
+    buffer.write(_ramp(0, 30))
+    list(buffer.windows())
+    buffer.reset()
+    assert buffer.overruns == 0
+    assert buffer.pending() == 0
@@ -0,0 +1,27 @@
+import numpy as np
+
+from config.config import VadConfig
+from modules.voice_activity_detector import VoiceActivityGate
+
+HOP = 4000
+
+
+def _frames(levels, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.standard_normal(HOP).astype(np.float32) * level for level in levels])
+
+
+def test_stream_that_opens_with_speech_is_not_gated():
+    gate = VoiceActivityGate(VadConfig(hangover_windows=0))
+    active = gate.update(_frames([0.1] * 6 + [0.002] * 20 + [0.1] * 3))
+    assert active[:6].all()
+    # The floor settles on the background, which is then skipped
+    assert not active[10:26].any()
+    assert active[26:].all()
+
+
+def test_quiet_start_still_passes_later_speech():
+    gate = VoiceActivityGate(VadConfig(hangover_windows=0))
+    active = gate.update(_frames([0.002] * 10 + [0.05] * 3))
+    assert active[-3:].all()
+    assert gate.get_stats()['noise_floor'] < 0.01
@@ -0,0 +1,41 @@
+import wave
+
+import numpy as np
+
+from utils.audio_utils import StreamingWavWriter, float_to_pcm16
+
+
+def test_streamed_header_matches_the_written_audio(tmp_path):
+    path = tmp_path / 'streamed.wav'
+    samples = np.sin(np.linspace(0, 40 * np.pi, 16000)).astype(np.float32) * 0.5
+    with StreamingWavWriter(path, channels=1, rate=16000) as writer:
+        for start in range(0, len(samples), 1024):
+            writer.write_float(samples[start:start + 1024])
+    assert writer.duration == 1.0
+
+    with wave.open(str(path), 'rb') as wav:
+        assert wav.getnchannels() == 1
+        assert wav.getframerate() == 16000
+        assert wav.getsampwidth() == 2
+        assert wav.getnframes() == len(samples)
+        assert wav.readframes(wav.getnframes()) == float_to_pcm16(samples)
+
+
+def test_odd_length_data_is_padded_and_sizes_stay_exact(tmp_path):
+    path = tmp_path / 'odd.wav'
+    with StreamingWavWriter(path, channels=1, rate=8000, sample_width=1) as writer:
+        writer.write(b'\x80' * 3)
+
+    data = path.read_bytes()
+    assert len(data) == StreamingWavWriter.HEADER_SIZE + 4
+    assert int.from_bytes(data[4:8], 'little') == len(data) - 8
+    assert int.from_bytes(data[40:44], 'little') == 3
+    with wave.open(str(path), 'rb') as wav:
+        assert wav.getnframes() == 3
+
+
+def test_empty_recording_is_a_valid_file(tmp_path):
+    path = tmp_path / 'empty.wav'
+    StreamingWavWriter(path).close()
+    with wave.open(str(path), 'rb') as wav:
+        assert wav.getnframes() == 0
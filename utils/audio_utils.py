@@ -1,25 +1,307 @@
-import pyaudio
-import wave
+import time
+import struct
+import threading
 import numpy as np
-from typing import Optional, Tuple
+from collections import deque
+from functools import lru_cache
+from typing import TYPE_CHECKING, Deque, List, Optional, Tuple
 import logging
 from pathlib import Path
+from numpy.lib.stride_tricks import sliding_window_view
+
+if TYPE_CHECKING:
+    import pyaudio
 
 logger = logging.getLogger(__name__)
 
+FRAME_LENGTH = 400  # 25 ms at 16 kHz
+HOP_LENGTH = 160  # 10 ms at 16 kHz
+N_FFT = 512
+N_MELS = 40
+LOG_EPSILON = 1e-10
+
+
+def _hz_to_mel(hz):
+    return 2595.0 * np.log10(1.0 + np.asarray(hz) / 700.0)
+
+
+def _mel_to_hz(mel):
+    return 700.0 * (10.0 ** (np.asarray(mel) / 2595.0) - 1.0)
+
+
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Triangular mel filterbank as a (n_fft // 2 + 1, n_mels) matrix"""
+    edges = _mel_to_hz(np.linspace(0.0, _hz_to_mel(sample_rate / 2), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, d=1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).T.astype(np.float32)
+
+
+def dct_matrix(n_inputs: int, n_outputs: int) -> np.ndarray:
+    """Orthonormal DCT-II as a (n_inputs, n_outputs) matrix"""
+    n = np.arange(n_inputs)
+    k = np.arange(n_outputs)[:, None]
+    basis = np.cos(np.pi / n_inputs * (n + 0.5) * k) * np.sqrt(2.0 / n_inputs)
+    basis[0] /= np.sqrt(2.0)
+    return basis.T.astype(np.float32)
+
+
+class StreamingFeatureExtractor:
+    """
+    Incremental MFCC front end.
+    The analysis window, mel filterbank and DCT are precomputed once; audio
+    pushed through ``process`` is framed together with the samples carried
+    over from the previous call, so every STFT frame is computed exactly
+    once. The newest ``context_frames`` frame features are kept in a
+    preallocated ring for window-level features.
+    """
+
+    def __init__(self, sample_rate: int = 16000, n_features: int = 40,
+                 context_frames: int = 98, frame_length: int = FRAME_LENGTH,
+                 hop_length: int = HOP_LENGTH, n_fft: int = N_FFT,
+                 n_mels: int = N_MELS):
+        self.sample_rate = sample_rate
+        self.n_features = n_features
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.n_fft = n_fft
+
+        n_mels = max(n_mels, n_features)
+        n = np.arange(frame_length)
+        self._window = (0.5 - 0.5 * np.cos(2 * np.pi * n / frame_length)).astype(np.float32)
+        self._mel = mel_filterbank(sample_rate, n_fft, n_mels)
+        self._dct = dct_matrix(n_mels, n_features)
+
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._context = np.zeros((context_frames, n_features), dtype=np.float32)
+        self._context_pos = 0
+        self._context_filled = 0
+
+    def frames_for(self, n_samples: int) -> int:
+        """Number of complete frames in a block of n_samples"""
+        if n_samples < self.frame_length:
+            return 0
+        return 1 + (n_samples - self.frame_length) // self.hop_length
+
+    def transform(self, frames: np.ndarray) -> np.ndarray:
+        """MFCCs for an (..., frame_length) array of frames"""
+        spectrum = np.fft.rfft(frames * self._window, n=self.n_fft)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        log_mel = np.log(power @ self._mel + LOG_EPSILON)
+        return (log_mel @ self._dct).astype(np.float32)
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Extract features for the new frames completed by these samples"""
+        buffer = np.concatenate((self._carry, np.asarray(samples, dtype=np.float32)))
+        n_frames = self.frames_for(len(buffer))
+        if n_frames == 0:
+            self._carry = buffer
+            return np.zeros((0, self.n_features), dtype=np.float32)
+
+        frames = sliding_window_view(buffer, self.frame_length)[::self.hop_length][:n_frames]
+        features = self.transform(frames)
+
+        # Keep the overlap needed by the next frame
+        self._carry = buffer[n_frames * self.hop_length:].copy()
+        self._push_context(features)
+        return features
+
+    def _push_context(self, features: np.ndarray) -> None:
+        size = len(self._context)
+        features = features[-size:]
+        idx = (self._context_pos + np.arange(len(features))) % size
+        self._context[idx] = features
+        self._context_pos = (self._context_pos + len(features)) % size
+        self._context_filled = min(size, self._context_filled + len(features))
+
+    def context_features(self) -> np.ndarray:
+        """Mean of the most recent context frames"""
+        if self._context_filled == 0:
+            return np.zeros(self.n_features, dtype=np.float32)
+        if self._context_filled < len(self._context):
+            return self._context[:self._context_filled].mean(axis=0)
+        return self._context.mean(axis=0)
+
+    def window_features(self, windows: np.ndarray, hop: int = None) -> np.ndarray:
+        """
+        Mean MFCC vector for each window in a (batch, samples) array.
+        With hop, runs of consecutive windows (each starting hop samples after
+        the previous one, as read from a stream) share their STFT frames: every
+        frame of the run's audio is computed once, not once per window.
+        """
+        windows = np.asarray(windows, dtype=np.float32)
+        if (windows.ndim != 2 or len(windows) < 2 or not hop
+                or hop % self.hop_length or hop >= windows.shape[1]):
+            frames = sliding_window_view(windows, self.frame_length, axis=-1)[..., ::self.hop_length, :]
+            return self.transform(frames).mean(axis=-2)
+
+        # A window continues the previous one when their overlap is identical
+        follows = (windows[1:, :-hop] == windows[:-1, hop:]).all(axis=1)
+        starts = np.flatnonzero(np.concatenate(([True], ~follows)))
+        ends = np.append(starts[1:], len(windows))
+        return np.concatenate([self._run_features(windows[start:end], hop)
+                               for start, end in zip(starts, ends)])
+
+    def _run_features(self, windows: np.ndarray, hop: int) -> np.ndarray:
+        """Window features of consecutive windows from the frames of their joined audio"""
+        signal = np.concatenate((windows[0], windows[1:, -hop:].ravel()))
+        frames = sliding_window_view(signal, self.frame_length)[::self.hop_length]
+        features = self.transform(frames[:self.frames_for(len(signal))])
+        # Window i covers frames [i * step, i * step + per_window)
+        per_window = self.frames_for(windows.shape[1])
+        first = np.arange(len(windows)) * (hop // self.hop_length)
+        totals = np.concatenate((np.zeros((1, self.n_features)),
+                                 np.cumsum(features, axis=0, dtype=np.float64)))
+        return ((totals[first + per_window] - totals[first]) / per_window).astype(np.float32)
+
+    def reset(self) -> None:
+        """Forget carried samples and context"""
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._context_pos = 0
+        self._context_filled = 0
+
+
+def frame_rms(frames: np.ndarray) -> np.ndarray:
+    """RMS energy along the last axis of one frame or a batch of frames"""
+    frames = np.asarray(frames, dtype=np.float32)
+    return np.sqrt(np.mean(np.square(frames), axis=-1))
+
+
+@lru_cache(maxsize=8)
+def _get_extractor(sample_rate: int, n_features: int) -> StreamingFeatureExtractor:
+    return StreamingFeatureExtractor(sample_rate=sample_rate, n_features=n_features)
+
+
+def preprocess_audio(audio_data: np.ndarray, sample_rate: int = 16000,
+                     n_features: int = 40, hop_size: int = None) -> np.ndarray:
+    """
+    Convert raw audio into wake word model features.
+    Accepts one window (samples,) or a batch (batch, samples) and returns
+    (n_features,) or (batch, n_features) mean MFCC vectors. hop_size is the
+    stride between consecutive windows of a batch read from a stream; their
+    shared frames are then transformed once.
+    """
+    audio = np.asarray(audio_data, dtype=np.float32)
+    extractor = _get_extractor(sample_rate, n_features)
+    if audio.shape[-1] < extractor.frame_length:
+        # Too short for a single frame; zero-pad up to one frame
+        pad = [(0, 0)] * (audio.ndim - 1) + [(0, extractor.frame_length - audio.shape[-1])]
+        audio = np.pad(audio, pad)
+    return extractor.window_features(audio, hop=hop_size)
+
+
+class StreamingWavWriter:
+    """
+    Writes a PCM WAV file chunk by chunk as audio arrives. The header is
+    written up front with placeholder sizes and patched once on close, so
+    memory use does not depend on the recording length and no chunk is
+    ever buffered or rewritten.
+    """
+
+    HEADER_SIZE = 44
+
+    def __init__(self, path: str, channels: int = 1, rate: int = 16000, sample_width: int = 2):
+        self.path = str(path)
+        self.channels = channels
+        self.rate = rate
+        self.sample_width = sample_width
+        self.data_bytes = 0
+        self._file = open(self.path, 'wb')
+        self._file.write(self._header(0))
+
+    def _header(self, data_bytes: int) -> bytes:
+        block_align = self.channels * self.sample_width
+        return b''.join([
+            b'RIFF', struct.pack('<I', 36 + data_bytes + (data_bytes & 1)), b'WAVE',
+            b'fmt ', struct.pack('<IHHIIHH', 16, 1, self.channels, self.rate,
+                                 self.rate * block_align, block_align, self.sample_width * 8),
+            b'data', struct.pack('<I', data_bytes)
+        ])
+
+    def write(self, frames: bytes) -> None:
+        """Append raw PCM frames in the file's sample width"""
+        if self.data_bytes + len(frames) > 0xFFFFFFFF - self.HEADER_SIZE:
+            raise ValueError("WAV files cannot hold more than 4 GiB of audio")
+        self._file.write(frames)
+        self.data_bytes += len(frames)
+
+    def write_float(self, samples: np.ndarray) -> None:
+        """Append float32 samples in [-1, 1] as 16-bit PCM"""
+        if self.sample_width != 2:
+            raise ValueError("write_float needs a 16-bit writer")
+        self.write(float_to_pcm16(samples))
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio written so far"""
+        return self.data_bytes / (self.channels * self.sample_width * self.rate)
+
+    def close(self) -> None:
+        """Pad to an even length and patch the sizes into the header"""
+        if self._file.closed:
+            return
+        if self.data_bytes & 1:
+            self._file.write(b'\x00')
+        self._file.seek(0)
+        self._file.write(self._header(self.data_bytes))
+        self._file.close()
+
+    def __enter__(self) -> "StreamingWavWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def import_pyaudio():
+    """
+    PyAudio, imported when the first stream opens rather than at module
+    load, so feature extraction and offline use never load PortAudio
+    """
+    try:
+        import pyaudio
+    except ImportError as e:  # offline replay and CI machines have no audio stack
+        raise RuntimeError("PyAudio is required for live capture") from e
+    return pyaudio
+
+
+def float_to_pcm16(samples) -> bytes:
+    """float32 samples (array or raw bytes) in [-1, 1] as little-endian 16-bit PCM"""
+    if isinstance(samples, (bytes, bytearray, memoryview)):
+        samples = np.frombuffer(samples, dtype=np.float32)
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+
 class AudioUtils:
     def __init__(self):
-        self.audio = pyaudio.PyAudio()
+        # PortAudio scans every device when initialized; defer that to first use
+        self._audio: Optional["pyaudio.PyAudio"] = None
+        # One input stream reused by every recording; reopened only if its settings change
+        self._input_stream: Optional["pyaudio.Stream"] = None
+        self._input_settings: Optional[Tuple[int, int, int, int]] = None
         self.DEFAULT_CHUNK = 1024
-        self.DEFAULT_FORMAT = pyaudio.paFloat32
         self.DEFAULT_CHANNELS = 1
         self.DEFAULT_RATE = 16000
+
+    @property
+    def DEFAULT_FORMAT(self) -> int:
+        """32-bit float samples; resolving it imports PyAudio"""
+        return import_pyaudio().paFloat32
+
+    @property
+    def audio(self) -> "pyaudio.PyAudio":
+        """PyAudio instance, created on first use"""
+        if self._audio is None:
+            self._audio = import_pyaudio().PyAudio()
+        return self._audio
         
     def open_stream(self, 
                    chunk: int = None,
                    audio_format: int = None, 
                    channels: int = None,
-                   rate: int = None) -> pyaudio.Stream:
+                   rate: int = None) -> "pyaudio.Stream":
         """Opens an audio stream with specified or default parameters"""
         chunk = chunk or self.DEFAULT_CHUNK
         audio_format = audio_format or self.DEFAULT_FORMAT
@@ -39,32 +321,165 @@ class AudioUtils:
             logger.error(f"Error opening audio stream: {str(e)}")
             raise
 
+    def input_stream(self,
+                     chunk: int = None,
+                     audio_format: int = None,
+                     channels: int = None,
+                     rate: int = None) -> "pyaudio.Stream":
+        """The shared long-lived input stream, opened on first use; owned by AudioUtils"""
+        settings = (chunk or self.DEFAULT_CHUNK, audio_format or self.DEFAULT_FORMAT,
+                    channels or self.DEFAULT_CHANNELS, rate or self.DEFAULT_RATE)
+        if self._input_stream is not None and self._input_settings != settings:
+            self._close_input_stream()
+        if self._input_stream is None:
+            self._input_stream = self.open_stream(*settings)
+            self._input_settings = settings
+        elif self._input_stream.is_stopped():
+            self._input_stream.start_stream()
+        return self._input_stream
+
+    def _close_input_stream(self) -> None:
+        stream, self._input_stream = self._input_stream, None
+        self._input_settings = None
+        if stream is not None:
+            try:
+                stream.stop_stream()
+                stream.close()
+            except Exception as e:
+                logger.error(f"Error closing audio stream: {str(e)}")
+
+    def _pause_input_stream(self) -> None:
+        """
+        Stop the shared stream between recordings so audio from the idle gap
+        is not buffered and read by the next one; input_stream restarts it
+        """
+        stream = self._input_stream
+        if stream is None:
+            return
+        try:
+            if not stream.is_stopped():
+                stream.stop_stream()
+        except Exception as e:
+            logger.error(f"Error stopping audio stream: {str(e)}")
+            self._close_input_stream()
+
+    def _read(self, stream: "pyaudio.Stream", chunk: int) -> bytes:
+        """One chunk from the shared stream; a failed stream is closed so the next call reopens it"""
+        try:
+            # An overrun drops samples rather than aborting a long capture
+            return stream.read(chunk, exception_on_overflow=False)
+        except Exception as e:
+            logger.error(f"Error recording audio: {str(e)}")
+            self._close_input_stream()
+            raise
+
     def record_audio(self, 
                     duration: float,
                     chunk: int = None,
                     audio_format: int = None,
                     channels: int = None, 
-                    rate: int = None) -> Tuple[bytes, pyaudio.Stream]:
-        """Records audio for specified duration and returns the frames"""
+                    rate: int = None) -> Tuple[bytes, "pyaudio.Stream"]:
+        """
+        Records audio for specified duration and returns the frames together
+        with the shared input stream, which is stopped between recordings but
+        stays open for the next one and is closed by close()
+        """
         chunk = chunk or self.DEFAULT_CHUNK
         audio_format = audio_format or self.DEFAULT_FORMAT
         channels = channels or self.DEFAULT_CHANNELS
         rate = rate or self.DEFAULT_RATE
         
-        stream = self.open_stream(chunk, audio_format, channels, rate)
-        frames = []
-        
-        for _ in range(0, int(rate / chunk * duration)):
-            try:
-                data = stream.read(chunk)
-                frames.append(data)
-            except Exception as e:
-                logger.error(f"Error recording audio: {str(e)}")
-                stream.stop_stream()
-                stream.close()
-                raise
-                
-        return b''.join(frames), stream
+        stream = self.input_stream(chunk, audio_format, channels, rate)
+        n_chunks = int(rate / chunk * duration)
+        chunk_bytes = chunk * channels * import_pyaudio().get_sample_size(audio_format)
+        # Filled in place; no per-chunk objects and no final join
+        frames = bytearray(n_chunks * chunk_bytes)
+        view = memoryview(frames)
+        try:
+            for i in range(n_chunks):
+                view[i * chunk_bytes:(i + 1) * chunk_bytes] = self._read(stream, chunk)
+        finally:
+            self._pause_input_stream()
+
+        return bytes(frames), stream
+
+    def record_to_file(self,
+                       filename: str,
+                       duration: float,
+                       chunk: int = None,
+                       channels: int = None,
+                       rate: int = None) -> float:
+        """
+        Record straight to a 16-bit WAV file, one chunk at a time
+        Returns: seconds recorded
+        """
+        chunk = chunk or self.DEFAULT_CHUNK
+        channels = channels or self.DEFAULT_CHANNELS
+        rate = rate or self.DEFAULT_RATE
+
+        stream = self.input_stream(chunk, self.DEFAULT_FORMAT, channels, rate)
+        try:
+            with StreamingWavWriter(filename, channels, rate) as writer:
+                for _ in range(int(rate / chunk * duration)):
+                    writer.write(float_to_pcm16(self._read(stream, chunk)))
+        finally:
+            self._pause_input_stream()
+        return writer.duration
+
+    def record_rolling(self,
+                       directory: str,
+                       segment_seconds: float = 60.0,
+                       max_segments: int = 10,
+                       stop_event: Optional[threading.Event] = None,
+                       duration: float = None,
+                       chunk: int = None,
+                       channels: int = None,
+                       rate: int = None) -> List[Path]:
+        """
+        Record into consecutive WAV segments, deleting the oldest beyond
+        max_segments, so an unbounded capture keeps only the most recent
+        audio in bounded disk space and constant memory. Segments left in
+        directory by earlier runs count toward max_segments. Runs until
+        stop_event is set or duration seconds have been captured.
+        Returns: the segments kept, oldest first
+        """
+        chunk = chunk or self.DEFAULT_CHUNK
+        channels = channels or self.DEFAULT_CHANNELS
+        rate = rate or self.DEFAULT_RATE
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        stream = self.input_stream(chunk, self.DEFAULT_FORMAT, channels, rate)
+        chunks_per_segment = max(1, int(rate / chunk * segment_seconds))
+        remaining = int(rate / chunk * duration) if duration is not None else None
+        # Names start with the capture time, so they sort oldest first
+        segments: Deque[Path] = deque(sorted(directory.glob('segment-*.wav')))
+        index = 0
+
+        try:
+            while remaining is None or remaining > 0:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                path = directory / f"segment-{time.strftime('%Y%m%d-%H%M%S')}-{index:06d}.wav"
+                index += 1
+                if path in segments:
+                    # An earlier run wrote this name in the same second
+                    continue
+                with StreamingWavWriter(path, channels, rate) as writer:
+                    for _ in range(chunks_per_segment):
+                        if (stop_event is not None and stop_event.is_set()) or remaining == 0:
+                            break
+                        writer.write(float_to_pcm16(self._read(stream, chunk)))
+                        if remaining is not None:
+                            remaining -= 1
+
+                segments.append(path)
+                while len(segments) > max_segments:
+                    segments.popleft().unlink(missing_ok=True)
+        finally:
+            self._pause_input_stream()
+
+        return list(segments)
 
     def save_audio(self,
                   frames: bytes,
@@ -72,18 +487,19 @@ class AudioUtils:
                   channels: int = None,
                   rate: int = None,
                   audio_format: int = None) -> None:
-        """Saves recorded audio frames to a WAV file"""
+        """Saves recorded audio frames to a WAV file; float32 frames are stored as 16-bit PCM"""
         channels = channels or self.DEFAULT_CHANNELS
         rate = rate or self.DEFAULT_RATE
         audio_format = audio_format or self.DEFAULT_FORMAT
         
         try:
-            wf = wave.open(filename, 'wb')
-            wf.setnchannels(channels)
-            wf.setsampwidth(self.audio.get_sample_size(audio_format))
-            wf.setframerate(rate)
-            wf.writeframes(frames)
-            wf.close()
+            if audio_format == self.DEFAULT_FORMAT:
+                with StreamingWavWriter(filename, channels, rate) as writer:
+                    writer.write(float_to_pcm16(frames))
+            else:
+                with StreamingWavWriter(filename, channels, rate,
+                                        import_pyaudio().get_sample_size(audio_format)) as writer:
+                    writer.write(frames)
         except Exception as e:
             logger.error(f"Error saving audio file: {str(e)}")
             raise
@@ -92,7 +508,7 @@ class AudioUtils:
         """Calculates the energy level of audio data"""
         try:
             audio_array = np.frombuffer(audio_data, dtype=np.float32)
-            return np.sqrt(np.mean(np.square(audio_array)))
+            return float(frame_rms(audio_array))
         except Exception as e:
             logger.error(f"Error calculating audio energy: {str(e)}")
             raise
@@ -108,9 +524,13 @@ class AudioUtils:
             raise
 
     def close(self) -> None:
-        """Closes the PyAudio instance"""
+        """Closes the shared input stream and the PyAudio instance"""
+        self._close_input_stream()
+        if self._audio is None:
+            return
         try:
-            self.audio.terminate()
+            self._audio.terminate()
+            self._audio = None
         except Exception as e:
             logger.error(f"Error closing audio: {str(e)}")
             raise
@@ -1,34 +1,130 @@
-from sqlalchemy import create_engine, text
+import time
+from sqlalchemy import Index, create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, StaticPool
 import logging
-from typing import Optional, Any
+from threading import Lock
+from typing import Optional, Any, Dict
 
-from config.config import DatabaseConfig
+from config.config import config
+from utils.metrics import LatencyRecorder
 
 logger = logging.getLogger(__name__)
 
+_pool_latency = LatencyRecorder()
+_pool_counters_lock = Lock()
+_pool_counters = {'connects': 0, 'closes': 0, 'checkouts': 0, 'checkins': 0, 'checkout_timeouts': 0}
+
+
+def _count(name: str) -> None:
+    with _pool_counters_lock:
+        _pool_counters[name] += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long every checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            _count('checkout_timeouts')
+            raise
+        finally:
+            _pool_latency.record('checkout_wait', time.perf_counter() - start)
+
+
 class DatabaseUtils:
+    """
+    Process-wide engine and session registry. Every database caller
+    (DatabaseManager, CommandProcessor, the history writer and retention
+    jobs) shares this one engine, so there is a single sized pool instead
+    of one per entry point.
+    """
     _engine = None
     _Session = None
+    _lock = Lock()
 
     @classmethod
-    def initialize_db(cls) -> None:
+    def initialize_db(cls, database_url: Optional[str] = None) -> None:
         """Initialize database connection engine and session factory"""
-        if not cls._engine:
+        with cls._lock:
+            if cls._engine:
+                return
             try:
-                cls._engine = create_engine(
-                    DatabaseConfig.DATABASE_URL,
-                    echo=DatabaseConfig.SQL_ECHO,
-                    pool_pre_ping=True,
-                    pool_recycle=3600
-                )
+                cls._engine = cls._create_engine(database_url or config.get_db_url())
                 cls._Session = sessionmaker(bind=cls._engine)
                 logger.info("Database connection initialized successfully")
             except SQLAlchemyError as e:
                 logger.error(f"Failed to initialize database: {str(e)}")
                 raise
 
+    @staticmethod
+    def _create_engine(database_url: str):
+        url = make_url(database_url)
+        options = {'echo': config.db.echo}
+
+        if url.get_backend_name() == 'sqlite':
+            # Connections move between the command, writer and retention threads
+            options['connect_args'] = {'check_same_thread': False}
+            if url.database in (None, '', ':memory:'):
+                # An in-memory database exists per connection; share exactly one
+                options['poolclass'] = StaticPool
+            else:
+                options.update(poolclass=InstrumentedQueuePool,
+                               pool_size=config.db.pool_size,
+                               max_overflow=config.db.max_overflow,
+                               pool_timeout=config.db.pool_timeout)
+        else:
+            options.update(poolclass=InstrumentedQueuePool,
+                           pool_size=config.db.pool_size,
+                           max_overflow=config.db.max_overflow,
+                           pool_timeout=config.db.pool_timeout,
+                           pool_recycle=config.db.pool_recycle,
+                           pool_pre_ping=True)
+
+        engine = create_engine(url, **options)
+        if url.get_backend_name() == 'sqlite':
+            event.listen(engine, 'connect', _apply_sqlite_pragmas)
+        event.listen(engine.pool, 'connect', lambda *args: _count('connects'))
+        event.listen(engine.pool, 'close', lambda *args: _count('closes'))
+        event.listen(engine.pool, 'checkout', lambda *args: _count('checkouts'))
+        event.listen(engine.pool, 'checkin', lambda *args: _count('checkins'))
+        return engine
+
+    @classmethod
+    def get_engine(cls):
+        """The shared engine, created from config on first use"""
+        if not cls._engine:
+            cls.initialize_db()
+        return cls._engine
+
+    @classmethod
+    def session_factory(cls) -> sessionmaker:
+        """The shared session factory"""
+        if not cls._Session:
+            cls.initialize_db()
+        return cls._Session
+
+    @classmethod
+    def get_pool_stats(cls) -> Dict:
+        """Connection counts, pool occupancy and checkout wait percentiles"""
+        with _pool_counters_lock:
+            stats = dict(_pool_counters)
+        if cls._engine is None:
+            return stats
+
+        pool = cls._engine.pool
+        stats['pool'] = type(pool).__name__
+        if isinstance(pool, QueuePool):
+            stats.update(size=pool.size(), checked_out=pool.checkedout(),
+                         checked_in=pool.checkedin(), overflow=pool.overflow())
+        stats['checkout_wait'] = _pool_latency.summary().get('checkout_wait', {})
+        return stats
+
     @classmethod
     def get_session(cls):
         """Get a new database session"""
@@ -67,11 +163,12 @@ class DatabaseUtils:
     @classmethod
     def cleanup(cls) -> None:
         """Cleanup database connections"""
-        if cls._engine:
-            cls._engine.dispose()
-            cls._engine = None
-            cls._Session = None
-            logger.info("Database connections cleaned up")
+        with cls._lock:
+            if cls._engine:
+                cls._engine.dispose()
+                cls._engine = None
+                cls._Session = None
+                logger.info("Database connections cleaned up")
 
     @staticmethod
     def paginate_query(query, page: int = 1, per_page: int = 10):
@@ -88,3 +185,52 @@ class DatabaseUtils:
             order_col = getattr(query.column_descriptions[0]['type'], sort_by)
             return query.order_by(order_col.desc() if order.lower() == 'desc' else order_col.asc())
         raise ValueError(f"Invalid sort column: {sort_by}")
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """WAL lets readers run alongside the writer; the rest trades fsyncs and I/O for memory"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={config.db.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA cache_size={int(config.db.sqlite_cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size={int(config.db.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(config.db.sqlite_busy_timeout)}")
+    finally:
+        cursor.close()
+
+
+def get_db_session():
+    """Get a new session from the shared DatabaseUtils engine"""
+    return DatabaseUtils.get_session()
+
+
+def init_db(database_url: Optional[str] = None) -> None:
+    """Create all model tables on the shared engine"""
+    from models.base import Base
+    # Importing the models registers their tables on the shared metadata
+    from models.command_history import CommandHistory
+    from models.command_rollup import CommandRollup
+    from models.user_preferences import UserPreferences  # noqa: F401
+
+    DatabaseUtils.initialize_db(database_url)
+    engine = DatabaseUtils.get_engine()
+    Base.metadata.create_all(engine)
+    # create_all skips existing tables; add indexes introduced since they were created
+    for index in CommandHistory.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    # Superseded by the composite (timestamp, id) index; inserts no longer maintain both
+    Index('ix_command_history_timestamp', CommandHistory.timestamp).drop(engine, checkfirst=True)
+
+    # Databases from before the rollup table have history but no rollups yet
+    session = DatabaseUtils.get_session()
+    try:
+        if (session.query(CommandRollup.id).first() is None
+                and session.query(CommandHistory.id).first() is not None):
+            logger.info("Building command history rollups from existing history")
+            CommandRollup.rebuild(session)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,145 @@
+"""
+Streaming export of command history.
+
+Rows are read with keyset pagination on (timestamp, id), each page in its
+own short session, and written out as they arrive, so memory use does not
+depend on the size of the history table.
+
+    python -m utils.history_export history.csv --db-url sqlite:///assistant.db
+"""
+import csv
+import json
+import logging
+import argparse
+from datetime import datetime
+from typing import Callable, IO, Iterator, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.engine import Row
+
+from models.command_history import CommandHistory
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ('id', 'command', 'timestamp', 'wake_word', 'success',
+                  'sensitivity_level', 'execution_time_ms', 'error_message')
+
+
+def iter_history(session_factory: Callable,
+                 start: datetime = None,
+                 end: datetime = None,
+                 page_size: int = 1000,
+                 descending: bool = False,
+                 after: Optional[Tuple[datetime, int]] = None) -> Iterator[Row]:
+    """
+    Yield history rows as lightweight tuples ordered by (timestamp, id).
+    Each page continues strictly after the last (timestamp, id) seen, so
+    every page is an index range scan no matter how deep the export is.
+    ``after`` resumes from a previously returned row's (timestamp, id).
+    """
+    table = CommandHistory.__table__
+    columns = [table.c[name] for name in EXPORT_COLUMNS]
+    timestamp, row_id = table.c.timestamp, table.c.id
+
+    base = select(*columns)
+    if start is not None:
+        base = base.where(timestamp >= start)
+    if end is not None:
+        base = base.where(timestamp < end)
+    if descending:
+        base = base.order_by(timestamp.desc(), row_id.desc())
+    else:
+        base = base.order_by(timestamp, row_id)
+
+    cursor = after
+    while True:
+        query = base
+        if cursor is not None:
+            last_timestamp, last_id = cursor
+            if descending:
+                query = query.where(or_(timestamp < last_timestamp,
+                                        and_(timestamp == last_timestamp, row_id < last_id)))
+            else:
+                query = query.where(or_(timestamp > last_timestamp,
+                                        and_(timestamp == last_timestamp, row_id > last_id)))
+
+        session = session_factory()
+        try:
+            page = session.execute(query.limit(page_size)).all()
+        finally:
+            session.close()
+
+        yield from page
+        if len(page) < page_size:
+            return
+        cursor = (page[-1].timestamp, page[-1].id)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def write_history(rows: Iterator[Row], out: IO[str], fmt: str = 'csv') -> int:
+    """
+    Write rows to an open text file as CSV (with header) or JSON lines.
+    Returns: number of rows written
+    """
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_COLUMNS)
+        for row in rows:
+            writer.writerow(value.isoformat() if isinstance(value, datetime) else value
+                            for value in row)
+            count += 1
+    elif fmt == 'jsonl':
+        for row in rows:
+            out.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default))
+            out.write('\n')
+            count += 1
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return count
+
+
+def export_history(path: str, session_factory: Callable = None, fmt: str = None,
+                   start: datetime = None, end: datetime = None,
+                   page_size: int = 1000) -> int:
+    """
+    Export history to a file in constant memory; the format defaults to the extension.
+    Returns: number of rows written
+    """
+    if session_factory is None:
+        from utils.db_utils import get_db_session
+        session_factory = get_db_session
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+
+    with open(path, 'w', newline='' if fmt == 'csv' else None, encoding='utf-8') as out:
+        count = write_history(iter_history(session_factory, start, end, page_size), out, fmt)
+    logger.info(f"Exported {count} command history rows to {path}")
+    return count
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export command history to CSV or JSON lines")
+    parser.add_argument('path', help="output file (.csv or .jsonl)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="defaults to the file extension")
+    parser.add_argument('--db-url', help="database to export from; defaults to the configured one")
+    parser.add_argument('--since', type=datetime.fromisoformat, help="ISO timestamp, inclusive")
+    parser.add_argument('--until', type=datetime.fromisoformat, help="ISO timestamp, exclusive")
+    parser.add_argument('--page-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from utils.db_utils import DatabaseUtils, get_db_session
+    DatabaseUtils.initialize_db(args.db_url)
+    count = export_history(args.path, get_db_session, args.format,
+                           args.since, args.until, args.page_size)
+    print(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import time
+import numpy as np
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, Sequence
+
+
+class LatencyRecorder:
+    """Keeps the most recent latency samples per pipeline stage"""
+
+    def __init__(self, max_samples: int = 10000):
+        self.lock = Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block and record it under stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record one latency sample in seconds"""
+        with self.lock:
+            self._samples[stage].append(seconds)
+
+    def percentiles(self, stage: str,
+                    quantiles: Sequence[float] = (50, 90, 99)) -> Dict[str, float]:
+        """Latency percentiles for a stage in milliseconds"""
+        with self.lock:
+            samples = np.array(self._samples.get(stage, ()), dtype=np.float64)
+        if len(samples) == 0:
+            return {f'p{q:g}_ms': 0.0 for q in quantiles}
+        values = np.percentile(samples, quantiles) * 1000.0
+        return {f'p{q:g}_ms': float(v) for q, v in zip(quantiles, values)}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean and percentiles for every recorded stage"""
+        with self.lock:
+            stages = {name: np.array(values, dtype=np.float64)
+                      for name, values in self._samples.items()}
+
+        report = {}
+        for name, samples in stages.items():
+            if len(samples) == 0:
+                continue
+            p50, p90, p99 = np.percentile(samples, (50, 90, 99)) * 1000.0
+            report[name] = {
+                'count': int(len(samples)),
+                'mean_ms': float(samples.mean() * 1000.0),
+                'p50_ms': float(p50),
+                'p90_ms': float(p90),
+                'p99_ms': float(p99)
+            }
+        return report
+
+    def reset(self) -> None:
+        """Drop all recorded samples"""
+        with self.lock:
+            self._samples.clear()
+
+
+class StartupTimer:
+    """Wall-clock time spent creating each component, including background warm-up"""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.started = time.perf_counter()
+        self._components: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def measure(self, component: str) -> Iterator[None]:
+        """Time the creation of a component"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self.lock:
+                self._components[component] = {
+                    'start_ms': (start - self.started) * 1000.0,
+                    'duration_ms': (end - start) * 1000.0
+                }
+
+    def mark(self, event: str) -> None:
+        """Record a point in time, e.g. when audio capture began"""
+        now = time.perf_counter()
+        with self.lock:
+            self._components[event] = {'start_ms': (now - self.started) * 1000.0,
+                                       'duration_ms': 0.0}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Offset from construction and duration of every component, in start order"""
+        with self.lock:
+            return dict(sorted(self._components.items(), key=lambda item: item[1]['start_ms']))
+
+    def report(self) -> str:
+        """Human-readable breakdown for the startup log"""
+        lines = ["Startup timing:"]
+        for name, timing in self.summary().items():
+            lines.append(f"  {name:<24} at {timing['start_ms']:8.1f} ms"
+                         f"  took {timing['duration_ms']:8.1f} ms")
+        return '\n'.join(lines)
@@ -0,0 +1,231 @@
+"""
+Offline replay of WAV clips through the listening pipeline.
+
+Clips are fed through SpeechListener -> WakeWordDetector -> CommandProcessor
+faster than real time, with PyAudio fed directly and the Google recognizer
+replaced by OfflineRecognizerBackend. Labels come from the parent directory
+name (``positive`` / ``negative``) and an optional ``<clip>.txt`` holds the
+spoken command, revealed word by word as the command audio is streamed.
+
+    python -m utils.replay path/to/clips --backend numpy
+"""
+import argparse
+import json
+import logging
+import time
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.config import Config
+from modules.speech_listener import SpeechListener
+from modules.wake_word_detector import WakeWordDetector
+from utils.metrics import LatencyRecorder
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_DIRS = {'positive', 'positives', 'wake', 'wake_word'}
+NEGATIVE_DIRS = {'negative', 'negatives', 'background', 'noise'}
+PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+@dataclass
+class Clip:
+    path: Path
+    label: Optional[bool] = None  # True when the clip contains the wake word
+    transcript: Optional[str] = None  # command spoken after the wake word
+
+
+def find_clips(paths: Sequence[str]) -> List[Clip]:
+    """Collect WAV files from files and directories, with labels and transcripts"""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.rglob('*.wav')) if path.is_dir() else [path])
+
+    clips = []
+    for wav_path in files:
+        parent = wav_path.parent.name.lower()
+        label = True if parent in POSITIVE_DIRS else False if parent in NEGATIVE_DIRS else None
+        transcript_path = wav_path.with_suffix('.txt')
+        transcript = transcript_path.read_text().strip().lower() if transcript_path.exists() else None
+        clips.append(Clip(wav_path, label, transcript))
+    return clips
+
+
+def read_wav(path: Path, sample_rate: int) -> np.ndarray:
+    """Read a PCM WAV file as mono float32 at sample_rate"""
+    with wave.open(str(path), 'rb') as wf:
+        width = wf.getsampwidth()
+        if width not in PCM_DTYPES:
+            raise ValueError(f"Unsupported sample width {width} in {path}")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        raw = np.frombuffer(wf.readframes(wf.getnframes()), dtype=PCM_DTYPES[width])
+
+    if width == 1:
+        samples = (raw.astype(np.float32) - 128.0) / 128.0
+    else:
+        samples = raw.astype(np.float32) / float(np.iinfo(raw.dtype).max)
+    samples = samples.reshape(-1, channels).mean(axis=1)
+
+    if rate != sample_rate:
+        # Linear resampling is plenty for benchmarking
+        duration = len(samples) / rate
+        target = np.arange(int(duration * sample_rate)) / sample_rate
+        samples = np.interp(target, np.arange(len(samples)) / rate, samples)
+    return samples.astype(np.float32)
+
+
+class SilentNotifier:
+    """Notification stand-in; the replay has no speakers or display"""
+
+    def show_processing(self) -> None:
+        pass
+
+    def hide_processing(self) -> None:
+        pass
+
+
+class ReplayHarness:
+    def __init__(self,
+                 config: Config,
+                 wake_word_detector: WakeWordDetector,
+                 command_processor=None,
+                 chunk_size: int = None,
+                 command_seconds: float = 3.0,
+                 refractory_seconds: float = 1.0):
+        self.config = config
+        self.sample_rate = config.audio.sample_rate
+        self.chunk_size = chunk_size or config.audio.chunk_size
+        self.command_samples = int(command_seconds * self.sample_rate)
+        self.refractory_samples = int(refractory_seconds * self.sample_rate)
+        self.command_processor = command_processor
+
+        self.latency = LatencyRecorder()
+        self.listener = SpeechListener(
+            wake_word_callback=lambda: None,
+            config=config,
+            audio_utils=None,
+            wake_word_detector=wake_word_detector,
+            latency_recorder=self.latency
+        )
+
+    def run(self, clips: Sequence[Clip]) -> Dict:
+        """Replay every clip and return the benchmark report"""
+        audio_samples = 0
+        negative_samples = 0
+        detections = 0
+        false_accepts = 0
+        false_rejects = 0
+        started = time.perf_counter()
+
+        for clip in clips:
+            samples = read_wav(clip.path, self.sample_rate)
+            events = self.replay_clip(clip, samples)
+
+            audio_samples += len(samples)
+            detections += len(events)
+            if clip.label is False:
+                negative_samples += len(samples)
+                false_accepts += len(events)
+            elif clip.label is True and not events:
+                false_rejects += 1
+
+        elapsed = time.perf_counter() - started
+        audio_hours = audio_samples / self.sample_rate / 3600.0
+        negative_hours = negative_samples / self.sample_rate / 3600.0
+
+        return {
+            'clips': len(clips),
+            'positives': sum(1 for clip in clips if clip.label is True),
+            'negatives': sum(1 for clip in clips if clip.label is False),
+            'audio_seconds': audio_samples / self.sample_rate,
+            'processing_seconds': elapsed,
+            'real_time_factor': elapsed / (audio_hours * 3600.0) if audio_hours else 0.0,
+            'detections': detections,
+            'detections_per_hour': detections / audio_hours if audio_hours else 0.0,
+            'false_accepts': false_accepts,
+            'false_accepts_per_hour': false_accepts / negative_hours if negative_hours else 0.0,
+            'false_rejects': false_rejects,
+            'stage_latency': self.latency.summary(),
+            'vad': self.listener.get_vad_stats()
+        }
+
+    def replay_clip(self, clip: Clip, samples: np.ndarray) -> List[int]:
+        """Feed one clip chunk by chunk; returns detection positions in samples"""
+        self.listener.reset()
+        events = []
+        last_event = -self.refractory_samples
+
+        for start in range(0, len(samples), self.chunk_size):
+            end = min(start + self.chunk_size, len(samples))
+            self.listener.feed(samples[start:end])
+            if not self.listener.process_pending():
+                continue
+            if end - last_event < self.refractory_samples:
+                continue
+
+            events.append(end)
+            last_event = end
+            if self.command_processor is not None:
+                self._run_command(clip, samples[end:end + self.command_samples])
+        return events
+
+    def _run_command(self, clip: Clip, utterance: np.ndarray) -> None:
+        """Stream the audio after the wake word to the command processor"""
+        self.command_processor.recognizer_backend.transcript = clip.transcript
+        pcm = (np.clip(utterance, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        chunk_bytes = self.chunk_size * 2
+        with self.latency.measure('command'):
+            command = self.command_processor.start_utterance()
+            for start in range(0, len(pcm), chunk_bytes):
+                command.push(pcm[start:start + chunk_bytes])
+            command.finish()
+
+
+def build_command_processor(database_url: str):
+    """CommandProcessor wired to local stand-ins and a scratch database"""
+    from modules.command_processor import CommandProcessor
+    from modules.recognizer_backends import OfflineRecognizerBackend
+    from utils.db_utils import init_db
+
+    init_db(database_url)
+    return CommandProcessor(SilentNotifier(), OfflineRecognizerBackend())
+
+
+def main(argv: Sequence[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay WAV clips through the listening pipeline")
+    parser.add_argument('paths', nargs='+', help="WAV files or directories of clips")
+    parser.add_argument('--backend', choices=['tensorflow', 'numpy', 'int8'],
+                        help="wake word inference backend")
+    parser.add_argument('--chunk-size', type=int, help="samples fed per simulated callback")
+    parser.add_argument('--command-seconds', type=float, default=3.0,
+                        help="audio after a detection handed to the command stage")
+    parser.add_argument('--no-commands', action='store_true',
+                        help="stop after wake word detection")
+    parser.add_argument('--db-url', default='sqlite://',
+                        help="database for command logging during the replay")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+
+    config = Config()
+    if args.backend:
+        config.wake_word.backend = args.backend
+    detector = WakeWordDetector(config.wake_word)
+    processor = None if args.no_commands else build_command_processor(args.db_url)
+
+    harness = ReplayHarness(config, detector, processor,
+                            chunk_size=args.chunk_size,
+                            command_seconds=args.command_seconds)
+    report = harness.run(find_clips(args.paths))
+    if processor is not None:
+        processor.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import threading
+import numpy as np
+from typing import Iterator
+
+
+class AudioRingBuffer:
+    """Preallocated float32 ring buffer that hands out sliding-window views
+
+    Every sample is stored twice (at ``i`` and ``i + capacity``) so that any
+    window of up to ``capacity`` samples is one contiguous slice and can be
+    returned without copying. Intended for a single writer (the audio
+    callback) and a single reader (the processing thread).
+    """
+
+    def __init__(self, capacity: int, window_size: int, hop_size: int):
+        if window_size <= 0 or hop_size <= 0:
+            raise ValueError("Window and hop size must be positive")
+        if window_size + hop_size > capacity:
+            raise ValueError("Buffer capacity must hold at least one window plus one hop")
+
+        self.capacity = capacity
+        self.window_size = window_size
+        self.hop_size = hop_size
+
+        self._buffer = np.zeros(2 * capacity, dtype=np.float32)
+        self._written = 0  # total samples ever written
+        self._next_end = window_size  # write count at which the next window ends
+        self._data_ready = threading.Event()
+        self.overruns = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        """Copy samples into the buffer, overwriting the oldest data"""
+        n = len(samples)
+        if n > self.capacity:
+            # Only the newest capacity samples can ever be read back
+            self._written += n - self.capacity
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[start + self.capacity:start + self.capacity + first] = samples[:first]
+
+        rest = n - first
+        if rest:
+            self._buffer[:rest] = samples[first:]
+            self._buffer[self.capacity:self.capacity + rest] = samples[first:]
+
+        self._written += n
+        self._data_ready.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until new samples arrive; returns False on timeout"""
+        ready = self._data_ready.wait(timeout)
+        self._data_ready.clear()
+        return ready
+
+    def windows(self) -> Iterator[np.ndarray]:
+        """
+        Yield every complete window that has not been consumed yet.
+        Views are read-only and stay valid until the writer has produced
+        another ``capacity - window_size`` samples, so use them promptly.
+        """
+        while True:
+            written = self._written
+            end = self._next_end
+            if end > written:
+                return
+
+            if end - self.window_size < written - self.capacity:
+                # Reader fell behind and the window was overwritten; skip ahead
+                skipped = (written - end) // self.hop_size
+                self._next_end = end + skipped * self.hop_size
+                self.overruns += skipped
+                continue
+
+            start = (end - self.window_size) % self.capacity
+            view = self._buffer[start:start + self.window_size]
+            view.flags.writeable = False
+            self._next_end = end + self.hop_size
+            yield view
+
+    def pending(self) -> int:
+        """Number of complete windows waiting to be read"""
+        if self._next_end > self._written:
+            return 0
+        return (self._written - self._next_end) // self.hop_size + 1
+
+    def reset(self) -> None:
+        """Discard buffered audio and start windowing from scratch"""
+        self._written = 0
+        self._next_end = self.window_size
+        self._data_ready.clear()
+        self.overruns = 0